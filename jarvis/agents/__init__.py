@@ -1,4 +1,4 @@
-from .base import AgentProposal, BaseAgent
+from .base import AgentProposal, BaseAgent, lowered_task
 from .logic import LogicAgent
 from .pragmatic import PragmaticAgent
 from .safeguard import SafeguardAgent
@@ -13,4 +13,5 @@ __all__ = [
     "SafeguardAgent",
     "EfficiencyAgent",
     "HumanImpactAgent",
+    "lowered_task",
 ]
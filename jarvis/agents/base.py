@@ -1,10 +1,11 @@
 """Deterministic agent contracts for Jarvis proto v0."""
 
 from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import List, Dict
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class AgentProposal:
     agent: str
     vote: str = "approve"  # approve | block
@@ -14,6 +15,12 @@ class AgentProposal:
     unblock_requirements: List[str] = field(default_factory=list)
 
 
+@lru_cache(maxsize=32)
+def lowered_task(task: str) -> str:
+    """Lower-cased task text, computed once per task and shared by every agent."""
+    return task.lower()
+
+
 class BaseAgent:
     name = "Base"
 
@@ -1,4 +1,4 @@
-from .base import BaseAgent, AgentProposal
+from .base import BaseAgent, AgentProposal, lowered_task
 
 
 class LogicAgent(BaseAgent):
@@ -9,7 +9,8 @@ class LogicAgent(BaseAgent):
             {"type": "command", "name": "Inspect repository", "command": "git status --short"},
             {"type": "command", "name": "Locate relevant files", "command": "rg --files"},
         ]
-        if "test" in task.lower() or "verify" in task.lower():
+        lowered = lowered_task(task)
+        if "test" in lowered or "verify" in lowered:
             actions.append({"type": "run_tests", "name": "Run project tests"})
         return AgentProposal(
             agent=self.name,
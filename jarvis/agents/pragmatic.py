@@ -1,4 +1,4 @@
-from .base import BaseAgent, AgentProposal
+from .base import BaseAgent, AgentProposal, lowered_task
 
 
 class PragmaticAgent(BaseAgent):
@@ -6,7 +6,7 @@ class PragmaticAgent(BaseAgent):
 
     def propose(self, task: str, repo_context: str, memory_summary: str) -> AgentProposal:
         actions = []
-        if "next" in task.lower():
+        if "next" in lowered_task(task):
             actions.append({
                 "type": "scaffold_nextjs",
                 "name": "Scaffold Next.js app",
@@ -1,4 +1,6 @@
-from .base import BaseAgent, AgentProposal
+import re
+
+from .base import BaseAgent, AgentProposal, lowered_task
 
 
 class SafeguardAgent(BaseAgent):
@@ -10,21 +12,22 @@ class SafeguardAgent(BaseAgent):
         "exfiltrate",
         "malware",
     ]
+    # All patterns in one alternation, so the task is scanned once
+    BLOCK_RE = re.compile("|".join(map(re.escape, BLOCK_PATTERNS)))
 
     def propose(self, task: str, repo_context: str, memory_summary: str) -> AgentProposal:
-        lowered = task.lower()
-        for pattern in self.BLOCK_PATTERNS:
-            if pattern in lowered:
-                return AgentProposal(
-                    agent=self.name,
-                    vote="block",
-                    rationale=f"Blocked due to dangerous instruction pattern: '{pattern}'.",
-                    unblock_requirements=[
-                        "Clarify safe environment and target scope.",
-                        "Provide explicit approval for destructive operations.",
-                        "Provide rollback/backup strategy.",
-                    ],
-                )
+        match = self.BLOCK_RE.search(lowered_task(task))
+        if match:
+            return AgentProposal(
+                agent=self.name,
+                vote="block",
+                rationale=f"Blocked due to dangerous instruction pattern: '{match.group(0)}'.",
+                unblock_requirements=[
+                    "Clarify safe environment and target scope.",
+                    "Provide explicit approval for destructive operations.",
+                    "Provide rollback/backup strategy.",
+                ],
+            )
         return AgentProposal(
             agent=self.name,
             rationale="No critical safety violations detected.",
@@ -2,7 +2,14 @@ import uvicorn
 
 
 def main() -> None:
-    uvicorn.run("jarvis.gateway.server:app", host="127.0.0.1", port=8787, reload=False)
+    # permessage-deflate shrinks large plan/stdout replies; browsers negotiate it transparently
+    uvicorn.run(
+        "jarvis.gateway.server:app",
+        host="127.0.0.1",
+        port=8787,
+        reload=False,
+        ws_per_message_deflate=True,
+    )
 
 
 if __name__ == "__main__":
@@ -2,71 +2,210 @@
 
 from __future__ import annotations
 
+import os
+import queue
 import sqlite3
-from datetime import datetime, timezone
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
+
+# Upper bound on pooled read-only connections
+MAX_READERS = 8
+
+# Per-connection prepared-statement cache size
+STATEMENT_CACHE_SIZE = 256
+
+# WAL pages written before the writer checkpoints on its own
+WAL_AUTOCHECKPOINT = 1000
+
+# Free pages returned to the filesystem per maintenance pass
+INCREMENTAL_VACUUM_PAGES = 200
+
+_AUTO_VACUUM_INCREMENTAL = 2
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+_CREATE_SQL = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        created_at INTEGER,
+        workspace TEXT,
+        channel TEXT,
+        mode TEXT,
+        status TEXT,
+        user_text TEXT,
+        response_text TEXT NULL,
+        error_text TEXT NULL
+    )
+"""
+
+# Statements are module constants so every call hits the connection's statement cache
+_INSERT_SQL = """
+    INSERT INTO inbox_messages (created_at, workspace, channel, mode, status, user_text)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+_UPDATE_SQL = """
+    UPDATE inbox_messages
+    SET status = ?, response_text = ?, error_text = ?
+    WHERE id = ?
+"""
+_GET_SQL = "SELECT * FROM inbox_messages WHERE id = ?"
+
+
+def _iso_to_ns(value: Optional[str]) -> Optional[int]:
+    """ISO-8601 timestamp (as stored before created_at became INTEGER) to epoch nanoseconds."""
+    if value is None:
+        return None
+    dt = datetime.fromisoformat(value)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return (dt - _EPOCH) // timedelta(microseconds=1) * 1000
+
+
+def _ns_to_iso(ns: int) -> str:
+    return (_EPOCH + timedelta(microseconds=ns // 1000)).isoformat()
 
 
 class InboxStore:
-    def __init__(self, db_path: Path) -> None:
+    def __init__(self, db_path: Path, readers: Optional[int] = None) -> None:
         self.db_path = db_path
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # One writer connection, serialized by the lock; WAL lets the readers run alongside it
+        self._lock = threading.Lock()
+        self._writer = self._connect()
         self._init_db()
 
-    def _connect(self):
-        conn = sqlite3.connect(self.db_path)
+        self._readers: queue.Queue = queue.Queue()
+        for _ in range(readers or min(os.cpu_count() or 1, MAX_READERS)):
+            self._readers.put(self._connect(read_only=True))
+
+    def _connect(self, read_only: bool = False):
+        if read_only:
+            uri = f"{self.db_path.resolve().as_uri()}?mode=ro"
+            conn = sqlite3.connect(
+                uri, uri=True, check_same_thread=False, isolation_level=None, cached_statements=STATEMENT_CACHE_SIZE
+            )
+        else:
+            conn = sqlite3.connect(
+                self.db_path, check_same_thread=False, isolation_level=None, cached_statements=STATEMENT_CACHE_SIZE
+            )
         conn.row_factory = sqlite3.Row
+        # Per-connection settings; journal_mode=WAL is persisted by _init_db
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-20000")
+        conn.execute("PRAGMA foreign_keys=ON")
+        if not read_only:
+            conn.execute(f"PRAGMA wal_autocheckpoint={WAL_AUTOCHECKPOINT}")
         return conn
 
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run writes in one BEGIN IMMEDIATE transaction, so the write lock is taken up front."""
+        with self._lock:
+            self._writer.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._writer
+            except BaseException:
+                self._writer.execute("ROLLBACK")
+                raise
+            self._writer.execute("COMMIT")
+
+    @contextmanager
+    def _reader(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a read-only connection from the pool."""
+        conn = self._readers.get()
+        try:
+            yield conn
+        finally:
+            self._readers.put(conn)
+
     def _init_db(self) -> None:
-        with self._connect() as conn:
-            conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS inbox_messages (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    created_at TEXT,
-                    workspace TEXT,
-                    channel TEXT,
-                    mode TEXT,
-                    status TEXT,
-                    user_text TEXT,
-                    response_text TEXT NULL,
-                    error_text TEXT NULL
-                )
-                """
-            )
-            conn.commit()
+        with self._lock:
+            self._writer.execute("PRAGMA journal_mode=WAL")
+            # auto_vacuum only takes effect after a VACUUM, so convert once and then leave it
+            if self._writer.execute("PRAGMA auto_vacuum").fetchone()[0] != _AUTO_VACUUM_INCREMENTAL:
+                self._writer.execute("PRAGMA auto_vacuum=INCREMENTAL")
+                self._writer.execute("VACUUM")
+        with self._transaction() as conn:
+            conn.execute(_CREATE_SQL.format(table="inbox_messages"))
+            self._migrate_created_at(conn)
+
+    @staticmethod
+    def _migrate_created_at(conn: sqlite3.Connection) -> None:
+        """Rebuild an inbox created with TEXT created_at so it holds INTEGER epoch nanoseconds."""
+        columns = {row["name"]: row["type"] for row in conn.execute("PRAGMA table_info(inbox_messages)")}
+        if columns.get("created_at", "").upper() != "TEXT":
+            return
+        conn.create_function("iso_to_ns", 1, _iso_to_ns, deterministic=True)
+        conn.execute(_CREATE_SQL.format(table="inbox_messages_new"))
+        conn.execute(
+            """
+            INSERT INTO inbox_messages_new
+            SELECT id, iso_to_ns(created_at), workspace, channel, mode, status, user_text, response_text, error_text
+            FROM inbox_messages
+            """
+        )
+        conn.execute("DROP TABLE inbox_messages")
+        conn.execute("ALTER TABLE inbox_messages_new RENAME TO inbox_messages")
+
+    def checkpoint(self) -> None:
+        """Fold the WAL back into the database and release some free pages."""
+        with self._lock:
+            self._writer.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+            self._writer.execute(f"PRAGMA incremental_vacuum({INCREMENTAL_VACUUM_PAGES})").fetchall()
+
+    def close(self) -> None:
+        with self._lock:
+            self._writer.close()
+        while not self._readers.empty():
+            self._readers.get_nowait().close()
 
     @staticmethod
-    def _now_iso() -> str:
-        return datetime.now(timezone.utc).isoformat()
+    def _now_ns() -> int:
+        return time.time_ns()
+
+    def _insert(self, workspace: str, channel: str, mode: str, user_text: str, status: str) -> int:
+        with self._transaction() as conn:
+            cur = conn.execute(_INSERT_SQL, (self._now_ns(), workspace, channel, mode, status, user_text))
+            return int(cur.lastrowid)
 
     def insert_pending(self, workspace: str, channel: str, mode: str, user_text: str) -> int:
-        with self._connect() as conn:
-            cur = conn.execute(
-                """
-                INSERT INTO inbox_messages (created_at, workspace, channel, mode, status, user_text)
-                VALUES (?, ?, ?, ?, 'pending', ?)
-                """,
-                (self._now_iso(), workspace, channel, mode, user_text),
+        return self._insert(workspace, channel, mode, user_text, "pending")
+
+    def insert_running(self, workspace: str, channel: str, mode: str, user_text: str) -> int:
+        """Insert a message that is being handled right away, skipping the pending state."""
+        return self._insert(workspace, channel, mode, user_text, "running")
+
+    def insert_pending_many(self, rows: list[tuple[str, str, str, str]]) -> list[int]:
+        """Insert (workspace, channel, mode, user_text) rows as pending in one transaction."""
+        if not rows:
+            return []
+        now = self._now_ns()
+        with self._transaction() as conn:
+            conn.executemany(
+                _INSERT_SQL,
+                [(now, workspace, channel, mode, "pending", user_text) for workspace, channel, mode, user_text in rows],
             )
-            conn.commit()
-            return int(cur.lastrowid)
+            # The write lock is held, so the new ids are consecutive and end at the last rowid
+            last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+        return list(range(last_id - len(rows) + 1, last_id + 1))
 
     def set_status(self, inbox_id: int, status: str, response_text: Optional[str] = None, error_text: Optional[str] = None) -> None:
-        with self._connect() as conn:
-            conn.execute(
-                """
-                UPDATE inbox_messages
-                SET status = ?, response_text = ?, error_text = ?
-                WHERE id = ?
-                """,
-                (status, response_text, error_text, inbox_id),
-            )
-            conn.commit()
+        with self._transaction() as conn:
+            conn.execute(_UPDATE_SQL, (status, response_text, error_text, inbox_id))
 
     def get(self, inbox_id: int):
-        with self._connect() as conn:
-            row = conn.execute("SELECT * FROM inbox_messages WHERE id = ?", (inbox_id,)).fetchone()
-            return dict(row) if row else None
+        with self._reader() as conn:
+            row = conn.execute(_GET_SQL, (inbox_id,)).fetchone()
+        if row is None:
+            return None
+        message = dict(row)
+        # Stored as epoch nanoseconds; format only on read
+        if message["created_at"] is not None:
+            message["created_at"] = _ns_to_iso(message["created_at"])
+        return message
@@ -2,51 +2,69 @@
 
 from __future__ import annotations
 
-import json
-import subprocess
+import os
+from datetime import date
 from pathlib import Path
+from typing import Iterator
 
-from jarvis.runtime import build_plan, execute_plan, format_plan
+from jarvis.runtime import build_plan, format_plan, format_result, iter_execute_plan, load_memory_summary, memory_paths
 
 
 class GatewayRouter:
-    def __init__(self, repo_root: Path) -> None:
+    def __init__(self, repo_root: Path, plan_needs_memory: bool = False) -> None:
         self.repo_root = Path(repo_root)
+        # Plan mode is side-effect free and rarely depends on memory, so skip loading it by default
+        self.plan_needs_memory = plan_needs_memory
+        self._memo: tuple | None = None  # (memory state, summary JSON)
 
     @staticmethod
-    def _extract_json(stdout: str) -> dict:
-        start = stdout.find("{")
-        if start == -1:
-            return {}
-        return json.loads(stdout[start:])
+    def _mtime(path: Path) -> int | None:
+        try:
+            return path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
 
-    def load_memory_summary(self) -> str:
-        proc = subprocess.run(
-            ["python", "tools/memory/memory_read.py", "--format", "summary"],
-            cwd=self.repo_root,
-            check=True,
-            capture_output=True,
-            text=True,
+    def _memory_state(self) -> tuple:
+        """Today's date plus the mtimes of everything the memory summary reads."""
+        memory_dir, db_path = memory_paths(self.repo_root)
+        logs_dir = memory_dir / "logs"
+        try:
+            with os.scandir(logs_dir) as it:
+                newest_log = max((entry.stat().st_mtime_ns for entry in it), default=None)
+        except FileNotFoundError:
+            newest_log = None
+        return (
+            date.today().isoformat(),
+            self._mtime(memory_dir / "MEMORY.md"),
+            self._mtime(logs_dir),
+            newest_log,
+            # Daily logs missing on disk fall back to the database
+            self._mtime(db_path),
+            self._mtime(db_path.with_name(db_path.name + "-wal")),
         )
-        return json.dumps(self._extract_json(proc.stdout))
+
+    def load_memory_summary(self) -> str:
+        """Memory summary JSON, rebuilt only when the memory files change."""
+        state = self._memory_state()
+        memo = self._memo
+        if memo is not None and memo[0] == state:
+            return memo[1]
+        summary = load_memory_summary(self.repo_root)
+        self._memo = (state, summary)
+        return summary
 
     def handle(self, workspace: str, text: str, mode: str) -> str:
-        memory_summary = self.load_memory_summary()
+        return "\n".join(self.handle_stream(workspace, text, mode))
+
+    def handle_stream(self, workspace: str, text: str, mode: str) -> Iterator[str]:
+        """Yield the plan, then each action's output as soon as that action finishes."""
+        memory_summary = self.load_memory_summary() if (mode == "exec" or self.plan_needs_memory) else ""
         plan = build_plan(text, self.repo_root, memory_summary=memory_summary)
+        yield format_plan(plan)
+
+        # Plan mode is the strict side-effect free path: no execution, no memory writes
+        if mode == "plan" or plan.blocked:
+            return
 
-        if mode == "plan":
-            # strict side-effect free path: no execution, no memory writes
-            return format_plan(plan)
-
-        if plan.blocked:
-            return format_plan(plan)
-
-        results = execute_plan(plan, self.repo_root)
-        lines = [format_plan(plan)]
-        for action, code, stdout, stderr in results:
-            lines.append(f"\n[{action.get('type')}] {action.get('name','')} => rc={code}")
-            if stdout.strip():
-                lines.append(stdout.strip())
-            if stderr.strip():
-                lines.append(stderr.strip())
-        return "\n".join(lines)
+        for result in iter_execute_plan(plan, self.repo_root):
+            yield format_result(result)
@@ -2,23 +2,74 @@
 
 from __future__ import annotations
 
+import asyncio
+import json
+import sys
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.responses import HTMLResponse, JSONResponse
+from starlette.concurrency import run_in_threadpool
 
 from .inbox import InboxStore
 from .router import GatewayRouter
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# Messages a single websocket client may have waiting before new ones are rejected
+WS_QUEUE_SIZE = 16
+
+# Seconds between inbox WAL checkpoints / incremental vacuums
+CHECKPOINT_INTERVAL = 60
+
+
+def _loads(raw: str):
+    return orjson.loads(raw) if HAS_ORJSON else json.loads(raw)
+
+
+def _dumps(obj) -> str:
+    return orjson.dumps(obj).decode() if HAS_ORJSON else json.dumps(obj)
+
+
+async def _send(websocket: WebSocket, message: dict) -> None:
+    await websocket.send_text(_dumps(message))
+
+
+def _reply(inbox_id: int | None, status: str, mode: str, text: str = "", error: str | None = None) -> dict:
+    return {"inbox_id": inbox_id, "status": status, "mode": mode, "text": text, "error": error}
+
+
+async def _periodic_checkpoint(store: InboxStore) -> None:
+    while True:
+        await asyncio.sleep(CHECKPOINT_INTERVAL)
+        await run_in_threadpool(store.checkpoint)
+
 
 def create_app(repo_root: Path | None = None, db_path: Path | None = None) -> FastAPI:
     base = Path(repo_root or Path(__file__).resolve().parents[2])
     inbox_db = Path(db_path or (base / "data" / "inbox.db"))
 
-    app = FastAPI()
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        # Keep the -wal file from growing unbounded on a busy gateway
+        task = asyncio.create_task(_periodic_checkpoint(app.state.inbox))
+        try:
+            yield
+        finally:
+            task.cancel()
+
+    app = FastAPI(lifespan=lifespan)
     app.state.inbox = InboxStore(inbox_db)
     app.state.router = GatewayRouter(base)
     app.state.ui_path = Path(__file__).resolve().parent / "ui" / "index.html"
+    # UI assets are static; read them once instead of on every request
+    app.state.index_html = app.state.ui_path.read_text(encoding="utf-8")
+    app.state.app_js = (app.state.ui_path.parent / "app.js").read_text(encoding="utf-8")
 
     @app.get("/health")
     def health():
@@ -26,63 +77,110 @@ def create_app(repo_root: Path | None = None, db_path: Path | None = None) -> Fa
 
     @app.get("/")
     def index():
-        return HTMLResponse(app.state.ui_path.read_text(encoding="utf-8"))
+        return HTMLResponse(app.state.index_html)
 
     @app.get("/app.js")
     def app_js():
-        js_path = Path(__file__).resolve().parent / "ui" / "app.js"
-        return HTMLResponse(js_path.read_text(encoding="utf-8"), media_type="application/javascript")
+        return HTMLResponse(app.state.app_js, media_type="application/javascript")
+
+    def handle_message(workspace: str, text: str, mode: str, publish=None) -> dict:
+        """Run one message to completion; publish(frame), if given, receives each chunk as it is produced."""
+        inbox_id = None
+        chunks: list[str] = []
+        try:
+            inbox_id = app.state.inbox.insert_running(workspace, "web", mode, text)
+            for chunk in app.state.router.handle_stream(workspace, text, mode):
+                chunks.append(chunk)
+                if publish is not None:
+                    publish(_reply(inbox_id, "running", mode, chunk))
+            response_text = "\n".join(chunks)
+            app.state.inbox.set_status(inbox_id, "done", response_text=response_text, error_text=None)
+            return _reply(inbox_id, "done", mode, response_text)
+        except Exception as exc:
+            if inbox_id is None:
+                # The inbox itself failed (locked, read-only, ...); let the caller report it
+                raise
+            app.state.inbox.set_status(inbox_id, "failed", response_text=None, error_text=str(exc))
+            return _reply(inbox_id, "failed", mode, error=str(exc))
+
+    async def stream_message(websocket: WebSocket, workspace: str, text: str, mode: str) -> None:
+        """Send each chunk of an exec run as a "running" frame, then the final reply."""
+        loop = asyncio.get_running_loop()
+        frames: asyncio.Queue = asyncio.Queue()
+
+        def publish(frame: dict) -> None:
+            # Called from the worker thread; hand the frame over to the event loop
+            loop.call_soon_threadsafe(frames.put_nowait, frame)
+
+        worker = asyncio.ensure_future(run_in_threadpool(handle_message, workspace, text, mode, publish))
+        # Queued after every frame the worker published, since those were scheduled before it returned
+        worker.add_done_callback(lambda _: frames.put_nowait(None))
+        while (frame := await frames.get()) is not None:
+            await _send(websocket, frame)
+        await _send(websocket, worker.result())
+
+    async def handle_payload(websocket: WebSocket, workspace: str, text: str, mode: str) -> None:
+        """Reply to one validated message."""
+        if mode == "exec":
+            # Actions can take seconds each; stream their output instead of waiting for the whole plan
+            await stream_message(websocket, workspace, text, mode)
+        else:
+            # Inbox writes and planning block, so keep them off the event loop
+            reply = await run_in_threadpool(handle_message, workspace, text, mode)
+            await _send(websocket, reply)
+
+    async def consume(websocket: WebSocket, pending: asyncio.Queue) -> None:
+        """Handle queued messages for one connection, in arrival order."""
+        while True:
+            payload = await pending.get()
+            workspace = payload.get("workspace", "default")
+            text = payload.get("text", "")
+            mode = payload.get("mode", "plan")
+
+            if not all(isinstance(value, str) for value in (workspace, text, mode)):
+                await _send(websocket, _reply(None, "failed", str(mode), error="workspace, text and mode must be strings"))
+                continue
+            text = text.strip()
+
+            if mode not in {"plan", "exec"}:
+                await _send(websocket, _reply(None, "failed", mode, error="mode must be 'plan' or 'exec'"))
+                continue
+
+            try:
+                await handle_payload(websocket, workspace, text, mode)
+            except Exception as exc:
+                # An error here would otherwise end this task and leave the connection without replies
+                print(f"Warning: gateway message failed: {exc!r}", file=sys.stderr)
+                await _send(websocket, _reply(None, "failed", mode, error=str(exc)))
 
     @app.websocket("/ws")
     async def ws_endpoint(websocket: WebSocket):
         await websocket.accept()
+        # Receiving continues while a consumer task works through earlier messages
+        pending: asyncio.Queue = asyncio.Queue(maxsize=WS_QUEUE_SIZE)
+        consumer = asyncio.create_task(consume(websocket, pending))
         try:
             while True:
-                payload = await websocket.receive_json()
-                workspace = payload.get("workspace", "default")
-                text = payload.get("text", "").strip()
-                mode = payload.get("mode", "plan")
-
-                if mode not in {"plan", "exec"}:
-                    await websocket.send_json(
-                        {
-                            "inbox_id": None,
-                            "status": "failed",
-                            "mode": mode,
-                            "text": "",
-                            "error": "mode must be 'plan' or 'exec'",
-                        }
-                    )
+                # The UI sends JSON objects in text frames; reject anything else here, since
+                # an exception in the consumer task would end it and stall the connection
+                try:
+                    payload = _loads(await websocket.receive_text())
+                except ValueError:
+                    payload = None
+                if not isinstance(payload, dict):
+                    await _send(websocket, _reply(None, "failed", "plan", error="message must be a JSON object"))
                     continue
-
-                inbox_id = app.state.inbox.insert_pending(workspace, "web", mode, text)
-                app.state.inbox.set_status(inbox_id, "running")
-
                 try:
-                    response_text = app.state.router.handle(workspace, text, mode)
-                    app.state.inbox.set_status(inbox_id, "done", response_text=response_text, error_text=None)
-                    await websocket.send_json(
-                        {
-                            "inbox_id": inbox_id,
-                            "status": "done",
-                            "mode": mode,
-                            "text": response_text,
-                            "error": None,
-                        }
-                    )
-                except Exception as exc:
-                    app.state.inbox.set_status(inbox_id, "failed", response_text=None, error_text=str(exc))
-                    await websocket.send_json(
-                        {
-                            "inbox_id": inbox_id,
-                            "status": "failed",
-                            "mode": mode,
-                            "text": "",
-                            "error": str(exc),
-                        }
+                    pending.put_nowait(payload)
+                except asyncio.QueueFull:
+                    await _send(
+                        websocket,
+                        _reply(None, "failed", payload.get("mode", "plan"), error=f"too many pending messages (limit {WS_QUEUE_SIZE})"),
                     )
         except WebSocketDisconnect:
             return
+        finally:
+            consumer.cancel()
 
     return app
 
@@ -10,10 +10,22 @@ function append(text) {
   log.scrollTop = log.scrollHeight;
 }
 
+// Exec replies arrive as "running" chunks first; the final frame then repeats the whole text
+const streamed = new Set();
+
 ws.onopen = () => append('Connected.');
 ws.onmessage = (evt) => {
   const data = JSON.parse(evt.data);
-  append(`[${data.status}] #${data.inbox_id} (${data.mode})\n${data.text || ''}${data.error ? '\nERROR: ' + data.error : ''}`);
+  if (data.status === 'running') {
+    if (!streamed.has(data.inbox_id)) {
+      streamed.add(data.inbox_id);
+      append(`[running] #${data.inbox_id} (${data.mode})`);
+    }
+    append(data.text || '');
+    return;
+  }
+  const text = streamed.delete(data.inbox_id) ? '' : (data.text || '');
+  append(`[${data.status}] #${data.inbox_id} (${data.mode})\n${text}${data.error ? '\nERROR: ' + data.error : ''}`);
 };
 ws.onerror = () => append('WebSocket error');
 
@@ -13,8 +13,15 @@ from jarvis.agents import (
     AgentProposal,
 )
 
+# Actions that agree on these fields are the same step
+ACTION_KEY_FIELDS = ("type", "command", "app_name", "name")
 
-@dataclass
+
+def _action_key(action: dict) -> tuple:
+    return tuple(map(action.get, ACTION_KEY_FIELDS))
+
+
+@dataclass(slots=True)
 class ExecutionPlan:
     task: str
     blocked: bool
@@ -47,13 +54,10 @@ class Orchestrator:
                 proposals=proposals,
             )
 
-        actions: List[dict] = []
-        seen = set()
-        for proposal in proposals:
-            for action in proposal.actions:
-                key = (action.get("type"), action.get("command"), action.get("app_name"), action.get("name"))
-                if key not in seen:
-                    seen.add(key)
-                    actions.append(action)
+        # Insertion-ordered dict: first occurrence of each action wins and keeps its position
+        unique: dict = {}
+        for action in (a for p in proposals for a in p.actions):
+            unique.setdefault(_action_key(action), action)
+        actions: List[dict] = list(unique.values())
 
         return ExecutionPlan(task=task, blocked=False, actions=actions, proposals=proposals)
@@ -5,31 +5,73 @@ from __future__ import annotations
 import json
 import os
 import subprocess
+import sys
 from pathlib import Path
-from typing import List, Tuple
+from typing import Iterator, List, Tuple
 
 from jarvis.orchestrator import Orchestrator
 from jarvis.tools import ToolRunner, ScaffoldNextJS, RunTests
 
+# Call the memory tools in-process; fall back to their CLIs if they can't be imported
+try:
+    from tools.memory import memory_db, memory_read
+    from tools.memory.memory_read import load_all_memory, format_as_summary
+    from tools.memory.memory_write import write_to_memory
+    HAS_MEMORY_TOOLS = True
+except ImportError:
+    HAS_MEMORY_TOOLS = False
+
+# The checkout the in-process memory tools belong to
+PACKAGE_ROOT = Path(__file__).resolve().parents[1]
+
 ActionResult = Tuple[dict, int, str, str]
 
 
+_DECODER = json.JSONDecoder()
+
+
 def extract_json(stdout: str) -> dict:
     start = stdout.find("{")
     if start == -1:
         return {}
-    return json.loads(stdout[start:])
+    # Parse only the first object, not everything after it
+    try:
+        obj, _ = _DECODER.raw_decode(stdout, start)
+    except ValueError:
+        return {}
+    return obj
+
+
+def _in_process(repo_root: Path) -> bool:
+    """Whether repo_root's memory can be used through the imported tools rather than its own CLIs."""
+    return HAS_MEMORY_TOOLS and Path(repo_root).resolve() == PACKAGE_ROOT
 
 
-def run_preflight(repo_root: Path) -> None:
+def run_preflight(repo_root: Path) -> str | None:
+    """Run the start script or load memory; returns the memory summary JSON if one was loaded."""
     start_script = repo_root / "scripts" / "start.sh"
     if start_script.exists():
         subprocess.run(["bash", str(start_script)], cwd=repo_root, check=True)
+    elif _in_process(repo_root):
+        summary = format_as_summary(load_all_memory())
+        print(json.dumps(summary, indent=2))
+        return json.dumps(summary)
     else:
         subprocess.run(["python", "tools/memory/memory_read.py", "--format", "summary"], cwd=repo_root, check=True)
+    return None
+
+
+def memory_paths(repo_root: Path) -> Tuple[Path, Path]:
+    """(memory directory, memory database) that load_memory_summary(repo_root) reads."""
+    if _in_process(repo_root):
+        return memory_read.MEMORY_DIR, memory_db.DB_PATH
+    return repo_root / "memory", repo_root / "data" / "memory.db"
 
 
 def load_memory_summary(repo_root: Path) -> str:
+    if _in_process(repo_root):
+        return json.dumps(format_as_summary(load_all_memory()))
+
     proc = subprocess.run(
         ["python", "tools/memory/memory_read.py", "--format", "summary"],
         cwd=repo_root,
@@ -62,11 +104,11 @@ def format_plan(plan) -> str:
     return "\n".join(lines)
 
 
-def execute_plan(plan, repo_root: Path) -> List[ActionResult]:
+def iter_execute_plan(plan, repo_root: Path) -> Iterator[ActionResult]:
+    """Run the plan's actions in order, yielding each result as soon as it completes."""
     runner = ToolRunner()
     test_tool = RunTests(runner)
     next_tool = ScaffoldNextJS(runner)
-    results: List[ActionResult] = []
 
     for action in plan.actions:
         kind = action.get("type")
@@ -79,11 +121,23 @@ def execute_plan(plan, repo_root: Path) -> List[ActionResult]:
         else:
             continue
 
-        results.append((action, result.returncode, result.stdout, result.stderr))
+        yield action, result.returncode, result.stdout, result.stderr
         if result.returncode != 0:
             break
 
-    return results
+
+def execute_plan(plan, repo_root: Path) -> List[ActionResult]:
+    return list(iter_execute_plan(plan, repo_root))
+
+
+def format_result(result: ActionResult) -> str:
+    action, code, stdout, stderr = result
+    lines = [f"\n[{action.get('type')}] {action.get('name','')} => rc={code}"]
+    if stdout.strip():
+        lines.append(stdout.strip())
+    if stderr.strip():
+        lines.append(stderr.strip())
+    return "\n".join(lines)
 
 
 def log_outcome(repo_root: Path, task: str, blocked: bool, execution_results: List[ActionResult]) -> None:
@@ -97,6 +151,15 @@ def log_outcome(repo_root: Path, task: str, blocked: bool, execution_results: Li
     else:
         summary = f"Jarvis completed task: {task}"
 
+    if _in_process(repo_root):
+        # Best effort, as the CLI call below is: a locked database or full disk
+        # must not fail the task whose outcome is being logged
+        try:
+            write_to_memory(content=summary, entry_type="event", importance=6)
+        except Exception as exc:
+            print(f"Warning: could not log task outcome to memory: {exc}", file=sys.stderr)
+        return
+
     subprocess.run(
         [
             "python",
@@ -131,13 +194,7 @@ def run_task(task: str, repo_root: Path, plan_only: bool = False, dry_run: bool
 
     try:
         results = execute_plan(plan, repo_root)
-        output_lines = [plan_text]
-        for action, code, stdout, stderr in results:
-            output_lines.append(f"\n[{action.get('type')}] {action.get('name','')} => rc={code}")
-            if stdout.strip():
-                output_lines.append(stdout.strip())
-            if stderr.strip():
-                output_lines.append(stderr.strip())
+        output_lines = [plan_text, *map(format_result, results)]
 
         log_outcome(repo_root, task, False, results)
         code = 0 if not results or results[-1][1] == 0 else 1
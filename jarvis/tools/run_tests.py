@@ -1,19 +1,34 @@
 """Tool for running project tests based on repository type."""
 
 from pathlib import Path
+from typing import List, Optional
+
 from .tool_runner import ToolRunner, ToolResult
 
 
 class RunTests:
     def __init__(self, runner: ToolRunner | None = None) -> None:
         self.runner = runner or ToolRunner()
+        # Detected test command per repo root (None when no tests were found)
+        self._cache: dict[str, Optional[List[str]]] = {}
 
-    def detect_and_run(self, repo_root: str) -> ToolResult:
-        root = Path(repo_root)
+    @staticmethod
+    def _detect(root: Path) -> Optional[List[str]]:
         if (root / "package.json").exists():
-            return self.runner.run("npm test", cwd=repo_root)
-        if list(root.glob("*.csproj")) or list(root.rglob("*.sln")):
-            return self.runner.run("dotnet test", cwd=repo_root)
+            return ["npm", "test"]
+        # next() stops at the first match instead of walking the whole tree
+        if next(root.glob("*.csproj"), None) or next(root.rglob("*.sln"), None):
+            return ["dotnet", "test"]
         if (root / "tests").exists():
-            return self.runner.run("python -m unittest", cwd=repo_root)
-        return ToolResult(command="noop", returncode=0, stdout="No tests detected", stderr="")
+            return ["python", "-m", "unittest"]
+        return None
+
+    def detect_and_run(self, repo_root: str) -> ToolResult:
+        key = str(Path(repo_root).resolve())
+        if key not in self._cache:
+            self._cache[key] = self._detect(Path(repo_root))
+
+        cmd = self._cache[key]
+        if cmd is None:
+            return ToolResult(command="noop", returncode=0, stdout="No tests detected", stderr="")
+        return self.runner.run(cmd, cwd=repo_root)
@@ -11,5 +11,5 @@ class ScaffoldNextJS:
     def run(self, repo_root: str, app_name: str) -> ToolResult:
         apps_dir = Path(repo_root) / "apps"
         apps_dir.mkdir(parents=True, exist_ok=True)
-        cmd = f"npx create-next-app@latest {app_name} --yes"
+        cmd = ["npx", "create-next-app@latest", app_name, "--yes"]
         return self.runner.run(cmd, cwd=str(apps_dir))
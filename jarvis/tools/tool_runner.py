@@ -1,8 +1,25 @@
 """Deterministic shell tool runner."""
 
+import re
+import shlex
 import subprocess
 from dataclasses import dataclass
-from typing import Optional, Dict
+from typing import Optional, Dict, Sequence
+
+# Characters that need a real shell (pipes, redirection, chaining, expansion, globs, comments)
+SHELL_METACHARS = frozenset("|&;<>()$`*?[]{}~#\n")
+
+# Commands that only exist inside a shell (builtins and keywords), so strings starting
+# with them still go through /bin/sh
+SHELL_BUILTINS = frozenset({
+    ".", ":", "alias", "bg", "break", "case", "cd", "command", "continue", "eval", "exec", "exit",
+    "export", "fg", "for", "getopts", "hash", "if", "jobs", "read", "readonly", "return", "set",
+    "shift", "source", "times", "trap", "type", "ulimit", "umask", "unalias", "unset", "until",
+    "wait", "while", "!",
+})
+
+# A leading NAME=value word is an environment assignment for the command that follows
+_ENV_ASSIGNMENT = re.compile(r"[A-Za-z_][A-Za-z0-9_]*=")
 
 
 @dataclass
@@ -13,7 +30,44 @@ class ToolResult:
     stderr: str
 
 
+def _split_command(cmd: str) -> str | list[str]:
+    """Argument list to exec a command string directly, or the string itself when it needs /bin/sh."""
+    if SHELL_METACHARS.intersection(cmd):
+        return cmd
+    try:
+        args = shlex.split(cmd)
+    except ValueError:
+        # Unbalanced quotes: let the shell report its own syntax error
+        return cmd
+    if not args or args[0] in SHELL_BUILTINS or _ENV_ASSIGNMENT.match(args[0]):
+        return cmd
+    return args
+
+
 class ToolRunner:
-    def run(self, cmd: str, cwd: Optional[str] = None, env: Optional[Dict[str, str]] = None) -> ToolResult:
-        proc = subprocess.run(cmd, cwd=cwd, env=env, shell=True, text=True, capture_output=True)
-        return ToolResult(command=cmd, returncode=proc.returncode, stdout=proc.stdout, stderr=proc.stderr)
+    def run(self, cmd: str | Sequence[str], cwd: Optional[str] = None, env: Optional[Dict[str, str]] = None) -> ToolResult:
+        """
+        Run a command and capture its output.
+
+        Argument lists and plain command strings are executed directly,
+        without spawning /bin/sh; strings using shell syntax, builtins or
+        leading VAR=value assignments still go through the shell.
+        """
+        if isinstance(cmd, str):
+            command = cmd
+            args = _split_command(cmd)
+        else:
+            args = list(cmd)
+            command = shlex.join(args)
+            if not args:
+                return ToolResult(command=command, returncode=127, stdout="", stderr="empty command")
+
+        try:
+            proc = subprocess.run(args, cwd=cwd, env=env, shell=isinstance(args, str), text=True, capture_output=True)
+        except FileNotFoundError as exc:
+            # Same exit status the shell reports for an unknown command
+            return ToolResult(command=command, returncode=127, stdout="", stderr=str(exc))
+        except PermissionError as exc:
+            # ... and for one that is not executable
+            return ToolResult(command=command, returncode=126, stdout="", stderr=str(exc))
+        return ToolResult(command=command, returncode=proc.returncode, stdout=proc.stdout, stderr=proc.stderr)
@@ -0,0 +1,186 @@
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools" / "memory"))
+
+import embed_memory  # noqa: E402
+import memory_db  # noqa: E402
+import semantic_search  # noqa: E402
+
+
+def unit_vectors(count, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((count, embed_memory.EMBEDDING_DIMENSIONS)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+class TestStorageRoundTrip(unittest.TestCase):
+    def setUp(self):
+        self.vector = unit_vectors(1)[0]
+
+    def round_trip(self, dtype):
+        blob, q8 = embed_memory.encode_for_storage(self.vector, dtype)
+        return blob, q8, np.asarray(embed_memory.decode_embedding(blob, dtype), dtype=np.float32)
+
+    def test_float32_is_exact(self):
+        blob, q8, decoded = self.round_trip("float32")
+        self.assertEqual(len(blob), 4 * embed_memory.EMBEDDING_DIMENSIONS)
+        np.testing.assert_array_equal(decoded, self.vector)
+        self.assertIsNotNone(q8)
+
+    def test_float16_halves_storage(self):
+        blob, q8, decoded = self.round_trip("float16")
+        self.assertEqual(len(blob), 2 * embed_memory.EMBEDDING_DIMENSIONS)
+        np.testing.assert_allclose(decoded, self.vector, atol=1e-3)
+        self.assertIsNotNone(q8)
+
+    def test_int8_keeps_only_the_quantized_form(self):
+        blob, q8, decoded = self.round_trip("int8")
+        self.assertIsNone(q8)
+        self.assertEqual(len(blob), 4 + embed_memory.EMBEDDING_DIMENSIONS)
+        # Each value is off by at most half a quantization step
+        step = np.max(np.abs(self.vector)) / 127
+        self.assertLessEqual(np.max(np.abs(decoded - self.vector)), step / 2 + 1e-6)
+        self.assertGreater(float(decoded @ self.vector), 0.999)
+
+    def test_int8_copy_matches_int8_row(self):
+        _, q8, _ = self.round_trip("float32")
+        int8_row, _ = embed_memory.encode_for_storage(self.vector, "int8")
+        self.assertEqual(q8, int8_row)
+
+    def test_zero_vector_quantizes_to_zeros(self):
+        blob = embed_memory.embedding_to_bytes_q8(np.zeros(8, dtype=np.float32))
+        scale, q = embed_memory.bytes_to_embedding_q8(blob)
+        self.assertEqual(scale, 0.0)
+        self.assertFalse(q.any())
+
+    def test_vector_index_blob_matches_decoded_row(self):
+        for dtype in ("float32", "float16", "int8"):
+            with self.subTest(dtype=dtype):
+                blob, _, decoded = self.round_trip(dtype)
+                widened = np.frombuffer(memory_db._vec_blob(blob, dtype), dtype=np.float32)
+                np.testing.assert_allclose(widened, decoded, atol=1e-6)
+        self.assertIsNone(memory_db._vec_blob(b"\0" * 8, "float16"))
+
+
+class StoredEmbeddingsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.saved_path = memory_db.DB_PATH
+        memory_db.DB_PATH = Path(self.tmp.name) / "memory.db"
+
+    def tearDown(self):
+        memory_db.close_connection()
+        memory_db.DB_PATH = self.saved_path
+        self.tmp.cleanup()
+
+    def add(self, content):
+        result = memory_db.add_entry(content)
+        self.assertTrue(result["success"], result)
+        return result["entry"]["id"]
+
+
+class TestMixedStorageSearch(StoredEmbeddingsTestCase):
+    def test_rows_of_every_dtype_rank_alike(self):
+        vectors = unit_vectors(3, seed=1)
+        ids = []
+        for content, vector, dtype in zip(("a", "b", "c"), vectors, ("float32", "float16", "int8")):
+            entry_id = self.add(content)
+            blob, q8 = embed_memory.encode_for_storage(vector, dtype)
+            memory_db.store_embedding(entry_id, blob, normalized=True, embedding_q8=q8, dtype=dtype)
+            ids.append(entry_id)
+
+        for query, expected in zip(vectors, ids):
+            for quantized in (False, True):
+                with self.subTest(expected=expected, quantized=quantized):
+                    result = semantic_search._search_embedding(
+                        "query", query, 0, None, 1, 0.5, quantized, False
+                    )
+                    self.assertEqual(result["total_searched"], 3)
+                    self.assertEqual([r["id"] for r in result["results"]], [expected])
+                    self.assertGreater(result["results"][0]["similarity"], 0.99)
+
+
+class TestRenormalize(StoredEmbeddingsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.entry_id = self.add("stored before normalization on write")
+        raw = unit_vectors(1, seed=2)[0] * 3
+        memory_db.store_embedding(self.entry_id, embed_memory.embedding_to_bytes(raw))
+
+    def stored(self):
+        return memory_db.get_connection().execute(
+            "SELECT embedding, embedding_q8, embedding_normalized FROM memory_entries WHERE id = ?",
+            (self.entry_id,),
+        ).fetchone()
+
+    def test_normalizes_once(self):
+        self.assertEqual(embed_memory.renormalize_embeddings()["renormalized"], 1)
+        self.assertEqual(embed_memory.renormalize_embeddings()["renormalized"], 0)
+
+        row = self.stored()
+        self.assertEqual(row["embedding_normalized"], 1)
+        self.assertIsNotNone(row["embedding_q8"])
+        self.assertAlmostEqual(float(np.linalg.norm(embed_memory.bytes_to_embedding(row["embedding"]))), 1.0, places=5)
+
+    def test_without_numpy_rows_are_not_rewritten_every_run(self):
+        with patch.object(embed_memory, "HAS_NUMPY", False):
+            self.assertEqual(embed_memory.renormalize_embeddings()["renormalized"], 1)
+            self.assertEqual(embed_memory.renormalize_embeddings()["renormalized"], 0)
+        self.assertIsNone(self.stored()["embedding_q8"])
+
+        # The int8 copy is filled in once NumPy is back
+        self.assertEqual(embed_memory.renormalize_embeddings()["renormalized"], 1)
+        self.assertIsNotNone(self.stored()["embedding_q8"])
+
+
+class FakeEmbeddingsClient:
+    """Stands in for the OpenAI client: embeds every text as the same unnormalized vector."""
+
+    def __init__(self, vector):
+        self.vector = [float(x) for x in vector]
+        self.calls = 0
+        self.embeddings = self
+
+    def create(self, model, input, encoding_format):
+        self.calls += 1
+        texts = [input] if isinstance(input, str) else input
+        return SimpleNamespace(
+            data=[SimpleNamespace(index=i, embedding=self.vector) for i in range(len(texts))],
+            usage=SimpleNamespace(prompt_tokens=len(texts), total_tokens=len(texts)),
+        )
+
+
+@unittest.skipUnless(embed_memory.HAS_OPENAI, "openai package not installed")
+class TestGenerateEmbedding(StoredEmbeddingsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.expected = unit_vectors(1, seed=3)[0]
+        self.client = FakeEmbeddingsClient(self.expected * 5)
+
+    def test_api_and_cache_return_the_same_unit_vector(self):
+        fresh = embed_memory.generate_embedding("what tools", self.client)
+        cached = embed_memory.generate_embedding("what tools", self.client)
+
+        self.assertEqual(self.client.calls, 1)
+        self.assertTrue(cached["cached"])
+        np.testing.assert_allclose(fresh["embedding"], self.expected, atol=1e-6)
+        np.testing.assert_array_equal(np.asarray(fresh["embedding"], dtype=np.float32), cached["embedding"])
+
+    def test_query_batches_return_unit_vectors(self):
+        embed_memory.generate_embedding("first", self.client)
+        result = embed_memory.generate_query_embeddings(["first", "second"], self.client)
+
+        self.assertEqual(result["cached"], 1)
+        for embedding in result["embeddings"]:
+            np.testing.assert_allclose(embedding, self.expected, atol=1e-6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -20,6 +20,7 @@ class TestGateway(unittest.TestCase):
 
     def tearDown(self):
         self.client.close()
+        self.app.state.inbox.close()
         self.tmp.cleanup()
 
     def test_health(self):
@@ -43,6 +44,59 @@ class TestGateway(unittest.TestCase):
         self.assertEqual(row[1], "plan")
         self.assertEqual(row[2], "default")
 
+    def test_non_object_frames_get_an_error_and_keep_the_connection_usable(self):
+        with self.client.websocket_connect("/ws") as ws:
+            ws.send_json(["not", "an", "object"])
+            not_object = ws.receive_json()
+            ws.send_text("{not json")
+            not_json = ws.receive_json()
+            ws.send_json({"text": 5})
+            bad_field = ws.receive_json()
+            ws.send_json({"workspace": "default", "text": "check repo", "mode": "plan"})
+            data = ws.receive_json()
+
+        self.assertEqual([f["status"] for f in (not_object, not_json, bad_field)], ["failed"] * 3)
+        self.assertEqual(not_object["error"], "message must be a JSON object")
+        self.assertEqual(data["status"], "done")
+
+    def test_inbox_failure_is_reported_and_later_messages_get_replies(self):
+        inbox = self.app.state.inbox
+        insert_running = inbox.insert_running
+        calls = []
+
+        def flaky_insert(*args):
+            calls.append(args)
+            if len(calls) == 1:
+                raise sqlite3.OperationalError("database is locked")
+            return insert_running(*args)
+
+        with patch.object(inbox, "insert_running", side_effect=flaky_insert):
+            with self.client.websocket_connect("/ws") as ws:
+                ws.send_json({"workspace": "default", "text": "check repo", "mode": "plan"})
+                failed = ws.receive_json()
+                ws.send_json({"workspace": "default", "text": "check repo", "mode": "plan"})
+                data = ws.receive_json()
+
+        self.assertEqual(failed["status"], "failed")
+        self.assertIsNone(failed["inbox_id"])
+        self.assertEqual(failed["error"], "database is locked")
+        self.assertEqual(data["status"], "done")
+        self.assertIsInstance(data["inbox_id"], int)
+
+    def test_exec_mode_streams_chunks_before_done(self):
+        def fake_stream(workspace, text, mode):
+            yield "plan"
+            yield "step 1"
+
+        with patch.object(self.app.state.router, "handle_stream", side_effect=fake_stream):
+            with self.client.websocket_connect("/ws") as ws:
+                ws.send_json({"workspace": "default", "text": "run it", "mode": "exec"})
+                frames = [ws.receive_json() for _ in range(3)]
+
+        self.assertEqual([f["status"] for f in frames], ["running", "running", "done"])
+        self.assertEqual([f["text"] for f in frames[:2]], ["plan", "step 1"])
+        self.assertEqual(frames[2]["text"], "plan\nstep 1")
+
     def test_plan_mode_does_not_call_memory_write(self):
         def fake_run(cmd, **kwargs):
             cmd_str = " ".join(cmd) if isinstance(cmd, list) else str(cmd)
@@ -54,8 +108,18 @@ class TestGateway(unittest.TestCase):
                 return Res()
             raise AssertionError(f"unexpected subprocess call: {cmd_str}")
 
+        def fake_write(*args, **kwargs):
+            raise AssertionError("plan mode must not call memory_write")
+
+        router = GatewayRouter(self.repo_root)
+        with patch("jarvis.runtime.subprocess.run", side_effect=fake_run), \
+                patch("jarvis.runtime.write_to_memory", side_effect=fake_write, create=True):
+            text = router.handle("default", "Create plan only", "plan")
+        self.assertIn("Execution Plan", text)
+
+    def test_plan_mode_skips_memory_summary(self):
         router = GatewayRouter(self.repo_root)
-        with patch("jarvis.gateway.router.subprocess.run", side_effect=fake_run):
+        with patch.object(router, "load_memory_summary", side_effect=AssertionError("plan mode must not load memory")):
             text = router.handle("default", "Create plan only", "plan")
         self.assertIn("Execution Plan", text)
 
@@ -0,0 +1,135 @@
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools" / "memory"))
+
+import hybrid_search  # noqa: E402
+import memory_db  # noqa: E402
+
+
+class TestRankFusion(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.saved_path = memory_db.DB_PATH
+        memory_db.DB_PATH = Path(self.tmp.name) / "memory.db"
+
+        self.both = self.add("alpha deploy pipeline")
+        self.keyword = self.add("alpha release notes")
+        self.semantic = self.add("gardening schedule for spring")
+        self.other_type = self.add("shipping checklist", entry_type="task")
+        self.deleted = self.add("archived runbook")
+        memory_db.delete_entry(self.deleted)
+        for filler in ("beta review", "gamma metrics", "delta backlog", "epsilon budget"):
+            self.add(filler)
+
+        # Best first, as _semantic_candidates() returns them
+        self.semantic_hits = {self.both: 0.9, self.semantic: 0.8, self.other_type: 0.7, self.deleted: 0.6}
+
+    def tearDown(self):
+        memory_db.close_connection()
+        memory_db.DB_PATH = self.saved_path
+        self.tmp.cleanup()
+
+    def add(self, content, entry_type="fact"):
+        result = memory_db.add_entry(content, entry_type=entry_type)
+        self.assertTrue(result["success"], result)
+        return result["entry"]["id"]
+
+    def search(self, **kwargs):
+        with patch.object(hybrid_search, "_semantic_candidates", return_value=self.semantic_hits):
+            result = hybrid_search.hybrid_search("alpha deploy", no_cache=True, min_score=0, **kwargs)
+        self.assertTrue(result["success"], result)
+        return {r["id"]: r for r in result["results"]}, result
+
+    def test_scores_follow_reciprocal_ranks(self):
+        results, _ = self.search()
+
+        k = hybrid_search.RRF_K
+        best = (0.7 + 0.3) / (k + 1)
+        self.assertEqual(results[self.both]["score"], 1.0)
+        self.assertAlmostEqual(results[self.keyword]["score"], 0.7 / (k + 2) / best, places=4)
+        self.assertAlmostEqual(results[self.semantic]["score"], 0.3 / (k + 2) / best, places=4)
+        self.assertIsNone(results[self.semantic]["bm25_score"])
+        self.assertIsNone(results[self.keyword]["semantic_score"])
+
+    def test_ordering_and_weights(self):
+        results, _ = self.search()
+        ranked = sorted(results, key=lambda entry_id: results[entry_id]["score"], reverse=True)
+        self.assertEqual(ranked[:3], [self.both, self.keyword, self.semantic])
+
+        # With the weights swapped the semantic-only match overtakes the keyword-only one
+        results, _ = self.search(bm25_weight=0.3, semantic_weight=0.7)
+        self.assertGreater(results[self.semantic]["score"], results[self.keyword]["score"])
+
+    def test_semantic_matches_must_pass_corpus_filters(self):
+        results, _ = self.search()
+        self.assertNotIn(self.deleted, results)
+        self.assertIn(self.other_type, results)
+
+        results, _ = self.search(entry_type="fact")
+        self.assertNotIn(self.other_type, results)
+        self.assertIn(self.semantic, results)
+
+    def test_min_score_and_limit(self):
+        with patch.object(hybrid_search, "_semantic_candidates", return_value=self.semantic_hits):
+            result = hybrid_search.hybrid_search("alpha deploy", no_cache=True, min_score=0.5, limit=1)
+        self.assertEqual([r["id"] for r in result["results"]], [self.both])
+        self.assertEqual(result["above_threshold"], 2)
+
+    def test_semantic_side_reuses_its_worker_thread(self):
+        threads = []
+
+        def candidates(*args):
+            threads.append(threading.current_thread())
+            return self.semantic_hits
+
+        with patch.object(hybrid_search, "_semantic_candidates", side_effect=candidates):
+            for _ in range(3):
+                hybrid_search.hybrid_search("alpha deploy", no_cache=True)
+
+        self.assertEqual(len(set(threads)), 1)
+        self.assertIsNot(threads[0], threading.current_thread())
+
+
+class TestQueryCache(unittest.TestCase):
+    def setUp(self):
+        hybrid_search._QCACHE.clear()
+        self.embedding = np.zeros(8, dtype=np.float32)
+        self.embedding[0] = 1.0
+        self.options = (None, 10, 0.7, 0.3, 0.1, False, "corpus")
+
+    def tearDown(self):
+        hybrid_search._QCACHE.clear()
+
+    def test_cached_results_are_not_shared_with_callers(self):
+        results = {"success": True, "weights": {"bm25": 0.7, "semantic": 0.3},
+                   "results": [{"id": 1, "score": 1.0}, {"id": 2, "score": 0.5}]}
+        hybrid_search._cache_query("query", self.embedding, self.options, results)
+        results["results"][0]["score"] = -1
+
+        hit = hybrid_search._cached_query(self.embedding, self.options)
+        self.assertTrue(hit["cache_hit"])
+        self.assertEqual(hit["results"][0]["score"], 1.0)
+
+        hit["results"].pop()
+        hit["results"][0]["annotated"] = True
+        hit["weights"]["bm25"] = 0
+
+        again = hybrid_search._cached_query(self.embedding, self.options)
+        self.assertEqual(again["results"], [{"id": 1, "score": 1.0}, {"id": 2, "score": 0.5}])
+        self.assertEqual(again["weights"], {"bm25": 0.7, "semantic": 0.3})
+
+    def test_different_options_miss(self):
+        hybrid_search._cache_query("query", self.embedding, self.options,
+                                   {"weights": {}, "results": []})
+        self.assertIsNone(hybrid_search._cached_query(self.embedding, self.options[:-1] + ("other",)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,8 @@
 import json
+import os
 import subprocess
 import sys
+import tempfile
 import time
 import unittest
 from pathlib import Path
@@ -51,16 +53,21 @@ class TestHybridSearchKeywordOnly(unittest.TestCase):
             "--limit",
             "5",
         ]
+        # Keep the BM25 index files out of the repository's data/ directory
+        index_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(index_dir.cleanup)
         search = subprocess.run(
             search_cmd,
             cwd=REPO_ROOT,
             check=True,
             capture_output=True,
             text=True,
+            env={**os.environ, "MEMORY_INDEX_DIR": index_dir.name},
         )
         search_json = _extract_json(search.stdout)
         self.assertTrue(search_json.get("success"), search.stdout)
         self.assertGreaterEqual(len(search_json.get("results", [])), 1, search.stdout)
+        self.assertTrue((Path(index_dir.name) / "bm25_postings").is_dir())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,128 @@
+import sqlite3
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from jarvis.gateway.inbox import InboxStore
+
+
+class TestInboxStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmp.name) / "inbox.db"
+        self.stores = []
+
+    def tearDown(self):
+        for store in self.stores:
+            store.close()
+        self.tmp.cleanup()
+
+    def open(self):
+        store = InboxStore(self.db_path, readers=2)
+        self.stores.append(store)
+        return store
+
+    def column_types(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return {row[1]: row[2] for row in conn.execute("PRAGMA table_info(inbox_messages)")}
+        finally:
+            conn.close()
+
+    def test_text_created_at_is_migrated_to_nanoseconds(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(
+            """
+            CREATE TABLE inbox_messages (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                created_at TEXT,
+                workspace TEXT,
+                channel TEXT,
+                mode TEXT,
+                status TEXT,
+                user_text TEXT,
+                response_text TEXT NULL,
+                error_text TEXT NULL
+            )
+            """
+        )
+        conn.executemany(
+            "INSERT INTO inbox_messages (created_at, workspace, channel, mode, status, user_text, response_text)"
+            " VALUES (?, 'default', 'ws', 'plan', ?, ?, ?)",
+            [
+                ("2025-01-02T03:04:05.123456+00:00", "done", "first", "ok"),
+                ("2025-01-02T03:04:05", "pending", "naive timestamp", None),
+                (None, "failed", "no timestamp", None),
+            ],
+        )
+        conn.commit()
+        conn.close()
+
+        store = self.open()
+
+        self.assertEqual(self.column_types()["created_at"], "INTEGER")
+        first = store.get(1)
+        self.assertEqual(first["created_at"], "2025-01-02T03:04:05.123456+00:00")
+        self.assertEqual((first["status"], first["user_text"], first["response_text"]), ("done", "first", "ok"))
+        # Naive timestamps were written as UTC
+        self.assertEqual(store.get(2)["created_at"], "2025-01-02T03:04:05+00:00")
+        self.assertIsNone(store.get(3)["created_at"])
+
+        # New rows continue after the migrated ones
+        self.assertEqual(store.insert_pending("default", "ws", "plan", "after migration"), 4)
+
+    def test_reopening_keeps_created_at(self):
+        store = self.open()
+        inbox_id = store.insert_pending("default", "ws", "plan", "kept")
+        created_at = store.get(inbox_id)["created_at"]
+        store.close()
+        self.stores.remove(store)
+
+        reopened = self.open()
+        self.assertEqual(reopened.get(inbox_id)["created_at"], created_at)
+
+    def test_insert_pending_many_returns_ids_in_order(self):
+        store = self.open()
+        before = store.insert_pending("default", "ws", "plan", "single")
+        rows = [("default", "ws", "plan", f"batch {i}") for i in range(5)]
+
+        ids = store.insert_pending_many(rows)
+
+        self.assertEqual(len(ids), 5)
+        self.assertEqual(ids[0], before + 1)
+        for inbox_id, row in zip(ids, rows):
+            message = store.get(inbox_id)
+            self.assertEqual(message["user_text"], row[3])
+            self.assertEqual(message["status"], "pending")
+        self.assertEqual(store.insert_pending_many([]), [])
+
+    def test_insert_pending_many_ids_under_concurrent_writers(self):
+        store = self.open()
+        batches = {}
+
+        def insert(worker):
+            rows = [("default", "ws", "plan", f"{worker}:{i}") for i in range(20)]
+            batches[worker] = store.insert_pending_many(rows)
+
+        threads = [threading.Thread(target=insert, args=(worker,)) for worker in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(batches), [0, 1, 2, 3])
+        for worker, ids in batches.items():
+            texts = [store.get(inbox_id)["user_text"] for inbox_id in ids]
+            self.assertEqual(texts, [f"{worker}:{i}" for i in range(20)])
+
+    def test_failed_transaction_rolls_back(self):
+        store = self.open()
+        with self.assertRaises(sqlite3.Error):
+            store.insert_pending_many([("default", "ws", "plan", "ok"), ("default", "ws", "plan", object())])
+        self.assertIsNone(store.get(1))
+        self.assertEqual(store.insert_pending("default", "ws", "plan", "next"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,170 @@
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools" / "memory"))
+
+import memory_db  # noqa: E402
+
+
+class MemoryDbTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.saved_path = memory_db.DB_PATH
+        memory_db.DB_PATH = Path(self.tmp.name) / "memory.db"
+
+    def tearDown(self):
+        memory_db.flush_access_log()
+        memory_db.close_connection()
+        memory_db.DB_PATH = self.saved_path
+        self.tmp.cleanup()
+
+    def add(self, content, **kwargs):
+        result = memory_db.add_entry(content, **kwargs)
+        self.assertTrue(result["success"], result)
+        return result["entry"]["id"]
+
+
+class TestSearchEntries(MemoryDbTestCase):
+    def setUp(self):
+        super().setUp()
+        self.deploy = self.add("Deploys run from the release branch", entry_type="fact")
+        self.tagged = self.add("Prefers short answers", entry_type="preference", tags=["communication"])
+        self.quoted = self.add('Said "ship it" on Friday', entry_type="event")
+        self.gone = self.add("Old release process", entry_type="fact")
+        memory_db.delete_entry(self.gone)
+
+    def search_ids(self, query, entry_type=None):
+        result = memory_db.search_entries(query, entry_type=entry_type)
+        self.assertTrue(result["success"], result)
+        return [entry["id"] for entry in result["entries"]]
+
+    def assert_search_behaviour(self):
+        # Case-insensitive substring match over content and tags, active entries only
+        self.assertEqual(self.search_ids("RELEASE"), [self.deploy])
+        self.assertEqual(self.search_ids("munica"), [self.tagged])
+        self.assertEqual(self.search_ids('"ship it"'), [self.quoted])
+        self.assertEqual(self.search_ids("release", entry_type="preference"), [])
+        self.assertEqual(self.search_ids("no such text"), [])
+
+    def test_trigram_index(self):
+        memory_db.get_connection()
+        if memory_db.DB_PATH not in memory_db._fts_ready:
+            self.skipTest("SQLite without FTS5 trigram tokenizer")
+        self.assert_search_behaviour()
+
+    def test_like_fallback_matches_trigram_results(self):
+        memory_db.get_connection()
+        memory_db._fts_ready.discard(memory_db.DB_PATH)
+        self.assert_search_behaviour()
+
+    def test_short_query_uses_like(self):
+        memory_db.get_connection()
+        self.assertEqual(self.search_ids("iT"), [self.quoted])
+
+    def test_index_follows_updates(self):
+        memory_db.get_connection()
+        memory_db.update_entry(self.deploy, content="Deploys run from main")
+        self.assertEqual(self.search_ids("release branch"), [])
+        self.assertEqual(self.search_ids("from main"), [self.deploy])
+
+
+class TestAddEntry(MemoryDbTestCase):
+    def test_duplicate_content_reports_existing_entry(self):
+        first = self.add("The build uses Python 3.11")
+
+        duplicate = memory_db.add_entry("The build uses Python 3.11", entry_type="insight")
+
+        self.assertFalse(duplicate["success"])
+        self.assertEqual(duplicate["existing_id"], first)
+        self.assertEqual(duplicate["existing_content"], "The build uses Python 3.11")
+        self.assertEqual(memory_db.list_entries()["total"], 1)
+
+    def test_duplicate_inside_bulk_keeps_earlier_writes(self):
+        with memory_db.bulk():
+            first = self.add("one")
+            duplicate = memory_db.add_entry("one")
+            second = self.add("two")
+
+        self.assertEqual(duplicate["existing_id"], first)
+        ids = {entry["id"] for entry in memory_db.list_entries()["entries"]}
+        self.assertEqual(ids, {first, second})
+
+
+class TestBulk(MemoryDbTestCase):
+    def test_exception_rolls_back_every_write(self):
+        kept = self.add("written before the block")
+
+        with self.assertRaises(RuntimeError):
+            with memory_db.bulk():
+                self.add("first in block")
+                with memory_db.bulk():
+                    self.add("nested in block")
+                memory_db.update_entry(kept, importance=9)
+                raise RuntimeError("abort")
+
+        entries = memory_db.list_entries()["entries"]
+        self.assertEqual([entry["id"] for entry in entries], [kept])
+        self.assertEqual(entries[0]["importance"], 5)
+        self.assertFalse(memory_db._in_bulk())
+
+    def test_commits_once_on_exit(self):
+        with memory_db.bulk() as conn:
+            self.add("a")
+            self.add("b")
+            self.assertTrue(conn.in_transaction)
+        self.assertFalse(memory_db.get_connection().in_transaction)
+        self.assertEqual(memory_db.list_entries()["total"], 2)
+
+
+class TestAccessLog(MemoryDbTestCase):
+    def access(self, entry_id):
+        row = memory_db.get_connection().execute(
+            "SELECT access_count, last_accessed FROM memory_entries WHERE id = ?", (entry_id,)
+        ).fetchone()
+        reads = memory_db.get_connection().execute(
+            "SELECT COUNT(*) FROM memory_access_log WHERE memory_id = ? AND access_type = 'read'", (entry_id,)
+        ).fetchone()[0]
+        return row["access_count"], row["last_accessed"], reads
+
+    def test_reads_are_buffered_until_flush(self):
+        entry_id = self.add("buffered")
+        for _ in range(3):
+            self.assertTrue(memory_db.get_entry(entry_id)["success"])
+
+        self.assertEqual(self.access(entry_id), (0, None, 0))
+
+        self.assertEqual(memory_db.flush_access_log(), 3)
+        count, last_accessed, reads = self.access(entry_id)
+        self.assertEqual((count, reads), (3, 3))
+        self.assertIsNotNone(last_accessed)
+        self.assertEqual(memory_db.flush_access_log(), 0)
+
+    def test_buffer_flushes_when_full(self):
+        entry_id = self.add("busy")
+        with patch.object(memory_db, "ACCESS_FLUSH_EVERY", 2):
+            memory_db.get_entry(entry_id)
+            self.assertEqual(self.access(entry_id)[0], 0)
+            memory_db.get_entry(entry_id)
+        self.assertEqual(self.access(entry_id)[0], 2)
+
+    def test_reads_go_to_the_database_they_came_from(self):
+        entry_id = self.add("first database")
+        first_path = memory_db.DB_PATH
+        memory_db.get_entry(entry_id)
+
+        memory_db.DB_PATH = Path(self.tmp.name) / "other.db"
+        memory_db.flush_access_log()
+        memory_db.DB_PATH = first_path
+
+        self.assertEqual(self.access(entry_id)[0], 1)
+
+    def test_missing_entry_is_not_logged(self):
+        self.assertFalse(memory_db.get_entry(404)["success"])
+        self.assertEqual(memory_db.flush_access_log(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from jarvis import runtime
+
+
+class TestMemoryLocation(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.other_root = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_other_repo_uses_its_own_memory_tools(self):
+        class Res:
+            stdout = 'noise {"success": true, "source": "other"} trailing'
+
+        with patch("jarvis.runtime.subprocess.run", return_value=Res()) as run:
+            summary = runtime.load_memory_summary(self.other_root)
+
+        self.assertEqual(summary, '{"success": true, "source": "other"}')
+        self.assertEqual(run.call_args.args[0][1], "tools/memory/memory_read.py")
+        self.assertEqual(run.call_args.kwargs["cwd"], self.other_root)
+        self.assertEqual(
+            runtime.memory_paths(self.other_root),
+            (self.other_root / "memory", self.other_root / "data" / "memory.db"),
+        )
+
+    def test_other_repo_logs_outcome_through_its_cli(self):
+        with patch("jarvis.runtime.subprocess.run") as run, \
+                patch("jarvis.runtime.write_to_memory", side_effect=AssertionError("wrote to Jarvis's memory"), create=True), \
+                patch.dict("os.environ", {"JARVIS_DRY_RUN": "0"}):
+            runtime.log_outcome(self.other_root, "task", False, [])
+
+        self.assertEqual(run.call_args.args[0][1], "tools/memory/memory_write.py")
+        self.assertEqual(run.call_args.kwargs["cwd"], self.other_root)
+
+    @unittest.skipUnless(runtime.HAS_MEMORY_TOOLS, "memory tools not importable")
+    def test_package_root_uses_the_tools_in_process(self):
+        with patch("jarvis.runtime.subprocess.run", side_effect=AssertionError("spawned a subprocess")), \
+                patch("jarvis.runtime.load_all_memory", return_value={}), \
+                patch("jarvis.runtime.format_as_summary", return_value={"source": "jarvis"}):
+            summary = runtime.load_memory_summary(runtime.PACKAGE_ROOT)
+
+        self.assertEqual(summary, '{"source": "jarvis"}')
+        memory_dir, db_path = runtime.memory_paths(runtime.PACKAGE_ROOT)
+        self.assertEqual(memory_dir, runtime.memory_read.MEMORY_DIR)
+        self.assertEqual(db_path, runtime.memory_db.DB_PATH)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,31 @@
+import unittest
+
+from jarvis.tools.tool_runner import ToolRunner, _split_command
+
+
+class TestToolRunner(unittest.TestCase):
+    def setUp(self):
+        self.runner = ToolRunner()
+
+    def test_plain_commands_skip_the_shell(self):
+        self.assertEqual(_split_command("git status --short"), ["git", "status", "--short"])
+        self.assertEqual(_split_command("echo 'a b'"), ["echo", "a b"])
+
+    def test_comments_match_the_shell(self):
+        self.assertEqual(_split_command("echo hi # comment"), "echo hi # comment")
+        result = self.runner.run("echo hi # comment")
+        self.assertEqual((result.returncode, result.stdout), (0, "hi\n"))
+
+    def test_shell_syntax_builtins_and_assignments_use_the_shell(self):
+        for cmd in ("echo a | cat", "cd /tmp", "FOO=1 env", "echo 'unbalanced", ""):
+            with self.subTest(cmd=cmd):
+                self.assertEqual(_split_command(cmd), cmd)
+        self.assertEqual(self.runner.run("FOO=bar sh -c 'echo $FOO'").stdout, "bar\n")
+
+    def test_missing_command_reports_127(self):
+        self.assertEqual(self.runner.run("no-such-command-xyz").returncode, 127)
+        self.assertEqual(self.runner.run([]).returncode, 127)
+
+
+if __name__ == "__main__":
+    unittest.main()
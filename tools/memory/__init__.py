@@ -14,12 +14,31 @@ Components:
     - memory_write.py: Write to daily logs and database
     - embed_memory.py: Generate vector embeddings
     - semantic_search.py: Vector similarity search
+    - similarity.py: Vectorized cosine-similarity kernels
+    - bm25_scoring.py: Vectorized BM25 scoring kernels
+    - hnsw_index.py: Approximate nearest-neighbour index over embeddings
     - hybrid_search.py: Combined BM25 + vector search
 """
 
-from .memory_db import (
+import sys
+from pathlib import Path
+
+# The tools import one another as top-level modules (each also runs as a script), so
+# load them the same way and register them as this package's submodules too: every
+# import path then shares one memory_db, with one thread-local connection and bulk() state
+sys.path.insert(0, str(Path(__file__).parent))
+import memory_db
+import memory_read
+import memory_write
+
+for _module in (memory_db, memory_read, memory_write):
+    sys.modules[f'{__name__}.{_module.__name__}'] = _module
+del _module
+
+from memory_db import (
     add_entry,
     get_entry,
+    flush_access_log,
     list_entries,
     search_entries,
     update_entry,
@@ -29,20 +48,26 @@ from .memory_db import (
     add_daily_log,
     get_daily_log,
     store_embedding,
-    get_entries_without_embeddings
+    store_embeddings_bulk,
+    vector_search,
+    get_entries_without_embeddings,
+    bulk
 )
 
-from .memory_read import (
+from memory_read import (
     read_memory_file,
     read_daily_log,
     read_recent_logs,
     load_all_memory,
-    format_as_markdown
+    format_as_markdown,
+    format_as_summary
 )
 
-from .memory_write import (
+from memory_write import (
     append_to_daily_log,
+    flush_daily_log,
     write_to_memory,
+    write_to_memory_batch,
     append_to_memory_file,
     sync_log_to_db
 )
@@ -51,6 +76,7 @@ __all__ = [
     # Database operations
     'add_entry',
     'get_entry',
+    'flush_access_log',
     'list_entries',
     'search_entries',
     'update_entry',
@@ -60,16 +86,22 @@ __all__ = [
     'add_daily_log',
     'get_daily_log',
     'store_embedding',
+    'store_embeddings_bulk',
+    'vector_search',
     'get_entries_without_embeddings',
+    'bulk',
     # Read operations
     'read_memory_file',
     'read_daily_log',
     'read_recent_logs',
     'load_all_memory',
     'format_as_markdown',
+    'format_as_summary',
     # Write operations
     'append_to_daily_log',
+    'flush_daily_log',
     'write_to_memory',
+    'write_to_memory_batch',
     'append_to_memory_file',
     'sync_log_to_db',
 ]
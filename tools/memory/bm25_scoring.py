@@ -0,0 +1,80 @@
+"""
+Tool: BM25 Scoring Kernels
+Purpose: Score a tokenized query against a whole corpus of term postings at once
+
+Used by hybrid_search.py for every BM25 query:
+- The corpus is a term-major CSR (indptr, doc_ids, tfs), see hybrid_search.Postings
+- A query only touches the postings of its own terms, never every document
+- idf is computed from the postings, or supplied (e.g. rank_bm25's Okapi idf)
+- A Numba-compiled kernel walks each query term's postings in parallel
+- Falls back to NumPy scatter-adds when Numba is not installed
+
+Dependencies:
+    - numpy
+    - numba (optional, JIT-compiled kernel)
+"""
+
+from typing import Optional
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+
+if HAS_NUMBA:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _bm25_kernel(term_ids, idfs, indptr, doc_ids, tfs, length_norm, k1, out):
+        for t in range(term_ids.shape[0]):
+            idf = idfs[t]
+            # A document appears at most once per posting list, so the writes never collide
+            for p in prange(indptr[term_ids[t]], indptr[term_ids[t] + 1]):
+                tf = tfs[p]
+                d = doc_ids[p]
+                out[d] += idf * (tf * (k1 + 1.0)) / (tf + length_norm[d])
+
+
+def bm25_scores(term_ids: np.ndarray, indptr: np.ndarray, doc_ids: np.ndarray, tfs: np.ndarray,
+                doc_lens: np.ndarray, avg_doc_len: float,
+                k1: float = 1.5, b: float = 0.75, idfs: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    BM25 score of every document for the given query terms.
+
+    Args:
+        term_ids: Vocabulary ids of the query terms (repeats count again)
+        indptr: (V + 1,) offsets of each term's postings
+        doc_ids: Document index of each posting
+        tfs: Term frequency of each posting
+        doc_lens: (N,) document lengths in tokens
+        avg_doc_len: Mean document length
+        k1, b: BM25 parameters
+        idfs: idf of each query term; defaults to log((N - df + 0.5) / (df + 0.5) + 1)
+
+    Returns:
+        float64 array of N scores
+    """
+    term_ids = np.ascontiguousarray(term_ids, dtype=np.int64)
+    out = np.zeros(len(doc_lens), dtype=np.float64)
+    if len(term_ids) == 0 or len(doc_lens) == 0:
+        return out
+
+    if idfs is None:
+        df = (indptr[term_ids + 1] - indptr[term_ids]).astype(np.float64)
+        idfs = np.log((len(doc_lens) - df + 0.5) / (df + 0.5) + 1)
+    else:
+        idfs = np.ascontiguousarray(idfs, dtype=np.float64)
+    length_norm = k1 * (1 - b + b * (doc_lens / avg_doc_len))
+
+    if HAS_NUMBA:
+        _bm25_kernel(term_ids, idfs, indptr, doc_ids, tfs, length_norm, k1, out)
+        return out
+
+    for term_id, idf in zip(term_ids, idfs):
+        start, end = indptr[term_id], indptr[term_id + 1]
+        docs = doc_ids[start:end]
+        tf = tfs[start:end]
+        out[docs] += idf * (tf * (k1 + 1)) / (tf + length_norm[docs])
+    return out
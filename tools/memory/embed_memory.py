@@ -11,6 +11,9 @@ Usage:
     python tools/memory/embed_memory.py --content "text"   # Get embedding for arbitrary text
     python tools/memory/embed_memory.py --stats            # Show embedding statistics
     python tools/memory/embed_memory.py --reindex          # Re-embed all entries
+    python tools/memory/embed_memory.py --renormalize      # L2-normalize embeddings stored before normalization
+    python tools/memory/embed_memory.py --all --dtype float16  # Half-precision rows (2x smaller)
+    python tools/memory/embed_memory.py --all --dtype int8 # Store only the int8 form (~4x smaller)
 
 Dependencies:
     - openai
@@ -20,6 +23,7 @@ Dependencies:
 Env Vars:
     - OPENAI_API_KEY (required)
     - HELICONE_API_KEY (optional, for observability)
+    - MEMORY_EMBEDDING_DTYPE (optional, 'float32', 'float16' or 'int8'; default float32)
 
 Output:
     JSON result with success status and embedding info
@@ -27,9 +31,13 @@ Output:
 
 import os
 import sys
-import json
+import random
+import hashlib
+import asyncio
 import argparse
+import math
 import struct
+import functools
 from pathlib import Path
 from typing import Optional, List, Dict, Any
 from dotenv import load_dotenv
@@ -39,20 +47,32 @@ load_dotenv()
 
 # Check for OpenAI
 try:
-    from openai import OpenAI
+    import httpx
+    from openai import OpenAI, AsyncOpenAI, RateLimitError
     HAS_OPENAI = True
 except ImportError:
     HAS_OPENAI = False
     print("Warning: openai package not installed. Run: pip install openai", file=sys.stderr)
 
+# NumPy makes (de)serialization a single C-level pass; struct is the fallback
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
 # Import memory_db functions
 sys.path.insert(0, str(Path(__file__).parent))
 try:
     from memory_db import (
         get_entries_without_embeddings,
         store_embedding,
+        store_embeddings_bulk,
+        get_cached_embeddings,
+        cache_embeddings,
         get_entry,
-        get_connection
+        get_connection,
+        print_json
     )
 except ImportError:
     print("Error: Could not import memory_db", file=sys.stderr)
@@ -61,10 +81,24 @@ except ImportError:
 # Constants
 EMBEDDING_MODEL = "text-embedding-3-small"
 EMBEDDING_DIMENSIONS = 1536
+API_BATCH_SIZE = 96  # Texts per embeddings request
+MAX_EMBED_CHARS = 32000  # ~8k tokens, the model's input limit
+API_BATCH_MAX_CHARS = 600000  # ~150k tokens, half the per-request token limit
+DEFAULT_CONCURRENCY = 5  # Embedding requests in flight at once
+MAX_RATE_LIMIT_RETRIES = 3
+HTTP_POOL_SIZE = 20  # Keep-alive connections shared by the process-wide client
 
+# Layout new embeddings are stored in: 'float32' or 'float16' (each plus an int8 copy),
+# or 'int8' only
+EMBEDDING_DTYPES = ('float32', 'float16', 'int8')
+EMBEDDING_STORE_DTYPE = os.getenv('MEMORY_EMBEDDING_DTYPE', 'float32')
 
-def get_openai_client():
-    """Get OpenAI client with optional Helicone proxy."""
+# Precompiled codec for the model's fixed dimensionality (struct fallback path)
+_EMBED_STRUCT = struct.Struct(f'{EMBEDDING_DIMENSIONS}f')
+
+
+def _client_kwargs() -> Dict[str, Any]:
+    """Build OpenAI client arguments with optional Helicone proxy."""
     api_key = os.getenv('OPENAI_API_KEY')
     if not api_key:
         raise ValueError("OPENAI_API_KEY environment variable not set")
@@ -72,40 +106,178 @@ def get_openai_client():
     # Check for Helicone
     helicone_key = os.getenv('HELICONE_API_KEY')
     if helicone_key:
-        return OpenAI(
-            api_key=api_key,
-            base_url="https://oai.helicone.ai/v1",
-            default_headers={
+        return {
+            "api_key": api_key,
+            "base_url": "https://oai.helicone.ai/v1",
+            "default_headers": {
                 "Helicone-Auth": f"Bearer {helicone_key}",
                 "Helicone-Property-Tool": "embed_memory"
             }
-        )
-    else:
-        return OpenAI(api_key=api_key)
+        }
+    return {"api_key": api_key}
+
+
+@functools.lru_cache(maxsize=1)
+def get_openai_client():
+    """
+    Get OpenAI client with optional Helicone proxy.
+
+    The client is created once per process and keeps its HTTP connections
+    alive, so repeated calls skip the TLS handshake.
+    """
+    # Before the pool exists, so a missing API key doesn't leak one
+    kwargs = _client_kwargs()
+    http_client = httpx.Client(
+        limits=httpx.Limits(max_keepalive_connections=HTTP_POOL_SIZE, max_connections=HTTP_POOL_SIZE),
+        timeout=60
+    )
+    return OpenAI(http_client=http_client, **kwargs)
+
+
+def get_async_openai_client():
+    """Get async OpenAI client with optional Helicone proxy."""
+    return AsyncOpenAI(**_client_kwargs())
 
 
 def embedding_to_bytes(embedding: List[float]) -> bytes:
     """Convert embedding list to bytes for storage."""
+    if HAS_NUMPY:
+        return np.asarray(embedding, dtype=np.float32).tobytes()
+    if len(embedding) == EMBEDDING_DIMENSIONS:
+        return _EMBED_STRUCT.pack(*embedding)
     return struct.pack(f'{len(embedding)}f', *embedding)
 
 
-def bytes_to_embedding(data: bytes) -> List[float]:
-    """Convert bytes back to embedding list."""
+def normalize_embedding(embedding):
+    """
+    Scale an embedding to unit length.
+
+    Stored embeddings are normalized so query-time cosine similarity is a
+    plain dot product.
+    """
+    if HAS_NUMPY:
+        v = np.array(embedding, dtype=np.float32)
+        v /= (np.linalg.norm(v) + 1e-12)
+        return v
+    norm = math.hypot(*embedding) + 1e-12
+    return [x / norm for x in embedding]
+
+
+def bytes_to_embedding(data: bytes):
+    """
+    Convert bytes back to an embedding.
+
+    Returns a read-only float32 ndarray viewing the buffer when NumPy is
+    available, otherwise a list of floats.
+    """
+    if HAS_NUMPY:
+        return np.frombuffer(data, dtype=np.float32)
+    if len(data) == _EMBED_STRUCT.size:
+        return list(_EMBED_STRUCT.unpack(data))
     count = len(data) // 4  # 4 bytes per float
     return list(struct.unpack(f'{count}f', data))
 
 
-def generate_embedding(text: str, client=None) -> Dict[str, Any]:
+def embedding_to_bytes_q8(embedding) -> Optional[bytes]:
+    """
+    Quantize an embedding to int8 with a per-vector scale.
+
+    Layout is a little-endian float32 scale followed by one int8 per
+    dimension. Returns None when NumPy is not installed.
+    """
+    if not HAS_NUMPY:
+        return None
+    v = np.asarray(embedding, dtype=np.float32)
+    scale = float(np.max(np.abs(v))) if v.size else 0.0
+    if scale == 0.0:
+        q = np.zeros(v.shape, dtype=np.int8)
+    else:
+        q = np.round(v / scale * 127).astype(np.int8)
+    return struct.pack('<f', scale) + q.tobytes()
+
+
+def bytes_to_embedding_q8(data: bytes):
+    """Split an int8 embedding BLOB into (scale, int8 ndarray)."""
+    scale = struct.unpack_from('<f', data)[0]
+    return scale, np.frombuffer(data, dtype=np.int8, offset=4)
+
+
+def decode_embedding(data: bytes, dtype: Optional[str] = 'float32'):
+    """
+    Convert a stored embedding BLOB back to a float32 vector.
+
+    Rows stored as 'int8' are dequantized (needs NumPy) and 'float16' rows
+    widened; anything else is read as float32.
+    """
+    if dtype == 'int8':
+        scale, q = bytes_to_embedding_q8(data)
+        return q.astype(np.float32) * np.float32(scale / 127)
+    if dtype == 'float16':
+        if HAS_NUMPY:
+            return np.frombuffer(data, dtype=np.float16).astype(np.float32)
+        return list(struct.unpack(f'{len(data) // 2}e', data))
+    return bytes_to_embedding(data)
+
+
+def encode_for_storage(embedding, dtype: str = 'float32'):
+    """
+    Serialize a unit-length embedding as (embedding BLOB, int8 copy).
+
+    'int8' rows keep only the quantized form, in the embedding column, so
+    the int8 copy is None; 'float16' rows store half-precision values.
+    Without NumPy there is no int8 form at all.
+    """
+    q8 = embedding_to_bytes_q8(embedding)
+    if dtype == 'int8':
+        return q8, None
+    if dtype == 'float16':
+        return np.asarray(embedding, dtype=np.float16).tobytes(), q8
+    return embedding_to_bytes(embedding), q8
+
+
+def _storage_dtype(dtype: Optional[str]) -> str:
+    """Resolve the storage layout, falling back to float32 without NumPy."""
+    dtype = dtype or EMBEDDING_STORE_DTYPE
+    if dtype not in EMBEDDING_DTYPES or not HAS_NUMPY:
+        return 'float32'
+    return dtype
+
+
+def embedding_cache_key(text: str) -> str:
+    """Cache key for a text's embedding under the current model."""
+    return hashlib.sha256(f"{EMBEDDING_MODEL}:{text}".encode()).hexdigest()
+
+
+def generate_embedding(text: str, client=None, use_cache: bool = True) -> Dict[str, Any]:
     """
     Generate embedding for a text string.
 
+    Embeddings are looked up in the persistent cache first; API results
+    are written back to it. Either way the embedding is L2-normalized.
+
     Args:
         text: Text to embed
         client: Optional OpenAI client (creates one if not provided)
+        use_cache: Read from and write to the embedding cache
 
     Returns:
         dict with embedding and metadata
     """
+    key = embedding_cache_key(text)
+    if use_cache:
+        cached = get_cached_embeddings([key], EMBEDDING_MODEL).get(key)
+        if cached is not None:
+            # A float32 view of the cached BLOB (a list only without NumPy)
+            embedding = bytes_to_embedding(cached)
+            return {
+                "success": True,
+                "embedding": embedding,
+                "model": EMBEDDING_MODEL,
+                "dimensions": len(embedding),
+                "cached": True,
+                "usage": {"prompt_tokens": 0, "total_tokens": 0}
+            }
+
     if not HAS_OPENAI:
         return {"success": False, "error": "openai package not installed"}
 
@@ -119,7 +291,9 @@ def generate_embedding(text: str, client=None) -> Dict[str, Any]:
             encoding_format="float"
         )
 
-        embedding = response.data[0].embedding
+        embedding = normalize_embedding(response.data[0].embedding)
+        if use_cache:
+            cache_embeddings([(key, embedding_to_bytes(embedding))], EMBEDDING_MODEL)
 
         return {
             "success": True,
@@ -135,13 +309,14 @@ def generate_embedding(text: str, client=None) -> Dict[str, Any]:
         return {"success": False, "error": str(e)}
 
 
-def embed_entry(entry_id: int, client=None) -> Dict[str, Any]:
+def embed_entry(entry_id: int, client=None, dtype: Optional[str] = None) -> Dict[str, Any]:
     """
     Generate and store embedding for a memory entry.
 
     Args:
         entry_id: Memory entry ID
         client: Optional OpenAI client
+        dtype: Storage layout, 'float32', 'float16' or 'int8' (default EMBEDDING_STORE_DTYPE)
 
     Returns:
         dict with success status
@@ -158,13 +333,16 @@ def embed_entry(entry_id: int, client=None) -> Dict[str, Any]:
         return {"success": False, "error": f"Entry {entry_id} has no content"}
 
     # Generate embedding
-    embed_result = generate_embedding(content, client)
+    embed_result = generate_embedding(content[:MAX_EMBED_CHARS], client)
     if not embed_result.get('success'):
         return embed_result
 
-    # Store embedding
-    embedding_bytes = embedding_to_bytes(embed_result['embedding'])
-    store_result = store_embedding(entry_id, embedding_bytes, EMBEDDING_MODEL)
+    # Store embedding at unit length, plus its int8 copy (or only that in int8 mode)
+    dtype = _storage_dtype(dtype)
+    blob, q8 = encode_for_storage(normalize_embedding(embed_result['embedding']), dtype)
+    store_result = store_embedding(
+        entry_id, blob, EMBEDDING_MODEL, normalized=True, embedding_q8=q8, dtype=dtype
+    )
 
     return {
         "success": store_result.get('success', False),
@@ -176,19 +354,196 @@ def embed_entry(entry_id: int, client=None) -> Dict[str, Any]:
     }
 
 
-def embed_all_pending(batch_size: int = 50, client=None) -> Dict[str, Any]:
+def chunk_texts_by_length(items: List[Any], length, max_items: int = API_BATCH_SIZE,
+                          max_chars: int = API_BATCH_MAX_CHARS) -> List[List[Any]]:
+    """
+    Pack items into API batches, shortest first.
+
+    Sorting by length keeps each request's token count even, and a batch
+    is closed at max_items items or max_chars characters.
+
+    Args:
+        items: Things to batch
+        length: Function giving an item's text length
+        max_items: Maximum items per batch
+        max_chars: Maximum total characters per batch
+
+    Returns:
+        List of batches
+    """
+    chunks: List[List[Any]] = []
+    current: List[Any] = []
+    current_chars = 0
+    for item in sorted(items, key=length):
+        size = length(item)
+        if current and (len(current) >= max_items or current_chars + size > max_chars):
+            chunks.append(current)
+            current, current_chars = [], 0
+        current.append(item)
+        current_chars += size
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def generate_embeddings_batch(texts: List[str], client=None) -> Dict[str, Any]:
+    """
+    Generate embeddings for several texts with a single API call.
+
+    Args:
+        texts: Texts to embed
+        client: Optional OpenAI client (creates one if not provided)
+
+    Returns:
+        dict with embeddings (in input order) and metadata
+    """
+    if not HAS_OPENAI:
+        return {"success": False, "error": "openai package not installed"}
+
+    if client is None:
+        client = get_openai_client()
+
+    try:
+        response = client.embeddings.create(
+            model=EMBEDDING_MODEL,
+            input=texts,
+            encoding_format="float"
+        )
+
+        # The API may return items out of order; index restores input order
+        embeddings = [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+
+        return {
+            "success": True,
+            "embeddings": embeddings,
+            "model": EMBEDDING_MODEL,
+            "usage": {
+                "prompt_tokens": response.usage.prompt_tokens,
+                "total_tokens": response.usage.total_tokens
+            }
+        }
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+def generate_query_embeddings(texts: List[str], client=None) -> Dict[str, Any]:
+    """
+    Embeddings for several query texts: cache hits first, one API call for the rest.
+
+    Args:
+        texts: Texts to embed
+        client: Optional OpenAI client (the shared process client if not provided)
+
+    Returns:
+        dict with unit-length embeddings (in input order), how many were cached, and usage
+    """
+    keys = [embedding_cache_key(text) for text in texts]
+    cached = get_cached_embeddings(list(set(keys)), EMBEDDING_MODEL)
+    missing = list(dict.fromkeys(text for text, key in zip(texts, keys) if key not in cached))
+
+    usage = {"prompt_tokens": 0, "total_tokens": 0}
+    fresh = {}
+    if missing:
+        batch = generate_embeddings_batch(missing, client)
+        if not batch.get('success'):
+            return batch
+        usage = batch['usage']
+        fresh = {embedding_cache_key(text): normalize_embedding(embedding)
+                 for text, embedding in zip(missing, batch['embeddings'])}
+        cache_embeddings([(key, embedding_to_bytes(embedding)) for key, embedding in fresh.items()], EMBEDDING_MODEL)
+
+    return {
+        "success": True,
+        "embeddings": [fresh[key] if key in fresh else bytes_to_embedding(cached[key]) for key in keys],
+        "model": EMBEDDING_MODEL,
+        "cached": len(texts) - sum(key in fresh for key in keys),
+        "usage": usage
+    }
+
+
+async def _embed_batch_async(client, texts: List[str], sem: asyncio.Semaphore) -> Dict[str, Any]:
+    """Embed one batch on the async client, retrying on rate limits."""
+    async with sem:
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+            # Small jitter so concurrent batches don't hit the API in lockstep
+            await asyncio.sleep(random.uniform(0, 0.05))
+            try:
+                response = await client.embeddings.create(
+                    model=EMBEDDING_MODEL,
+                    input=texts,
+                    encoding_format="float"
+                )
+                return {
+                    "success": True,
+                    "embeddings": [item.embedding for item in sorted(response.data, key=lambda d: d.index)],
+                    "model": EMBEDDING_MODEL,
+                    "usage": {
+                        "prompt_tokens": response.usage.prompt_tokens,
+                        "total_tokens": response.usage.total_tokens
+                    }
+                }
+            except RateLimitError as e:
+                if attempt == MAX_RATE_LIMIT_RETRIES:
+                    return {"success": False, "error": str(e)}
+                retry_after = e.response.headers.get('retry-after') if e.response is not None else None
+                try:
+                    delay = float(retry_after)
+                except (TypeError, ValueError):
+                    delay = 2 ** attempt
+                await asyncio.sleep(delay)
+            except Exception as e:
+                return {"success": False, "error": str(e)}
+
+
+async def _embed_batches_async(batches: List[List[str]], concurrency: int, client=None) -> List[Dict[str, Any]]:
+    """Embed several batches concurrently, returning results in batch order."""
+    sem = asyncio.Semaphore(concurrency)
+    if client is not None:
+        return await asyncio.gather(*(_embed_batch_async(client, texts, sem) for texts in batches))
+    # A client created here is closed here, along with its connection pool
+    async with get_async_openai_client() as client:
+        return await asyncio.gather(*(_embed_batch_async(client, texts, sem) for texts in batches))
+
+
+def _in_event_loop() -> bool:
+    """Whether this thread is already running an asyncio event loop (asyncio.run() would fail)."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def embed_all_pending(
+    batch_size: int = 50,
+    client=None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    async_client=None,
+    dtype: Optional[str] = None
+) -> Dict[str, Any]:
     """
     Embed all entries that don't have embeddings yet.
 
+    Entries are sent to the API in length-sorted chunks of up to
+    API_BATCH_SIZE texts (and API_BATCH_MAX_CHARS characters) per request,
+    with up to `concurrency` requests in flight. If a chunk fails, its
+    entries are retried one at a time. Called from inside a running event
+    loop (e.g. a FastAPI handler), chunks are sent one after another on the
+    sync client instead.
+
     Args:
         batch_size: Number of entries to process
         client: Optional OpenAI client
+        concurrency: Maximum concurrent API requests
+        async_client: Optional AsyncOpenAI client for concurrent requests
+        dtype: Storage layout, 'float32', 'float16' or 'int8' (default EMBEDDING_STORE_DTYPE)
 
     Returns:
         dict with batch results
     """
     if client is None:
         client = get_openai_client()
+    dtype = _storage_dtype(dtype)
 
     # Get entries without embeddings
     pending = get_entries_without_embeddings(limit=batch_size)
@@ -207,21 +562,93 @@ def embed_all_pending(batch_size: int = 50, client=None) -> Dict[str, Any]:
         "entries": []
     }
 
+    # Entries with no content fail up front; the rest are capped to the model's input limit
+    empty = [e for e in entries if not e.get('content')]
+    if empty:
+        results['failed'] += len(empty)
+        results['entries'].extend({
+            "id": e['id'],
+            "success": False,
+            "error": f"Entry {e['id']} has no content"
+        } for e in empty)
+        entries = [e for e in entries if e.get('content')]
+    texts_by_id = {e['id']: e['content'][:MAX_EMBED_CHARS] for e in entries}
+
+    # Serve previously embedded texts from the cache without an API call
+    keys = {entry_id: embedding_cache_key(text) for entry_id, text in texts_by_id.items()}
+    cached = get_cached_embeddings(list(set(keys.values())), EMBEDDING_MODEL)
+    hits = [e for e in entries if keys[e['id']] in cached]
+    if hits:
+        forms = [encode_for_storage(bytes_to_embedding(cached[keys[e['id']]]), dtype) for e in hits]
+        store_result = store_embeddings_bulk(
+            [(e['id'], blob) for e, (blob, _) in zip(hits, forms)], EMBEDDING_MODEL, normalized=True,
+            quantized=[q8 for _, q8 in forms], dtype=dtype
+        )
+        stored = store_result.get('success', False)
+        results['processed' if stored else 'failed'] += len(hits)
+        results['entries'].extend({
+            "id": e['id'],
+            "success": stored,
+            "cached": True,
+            "error": store_result.get('error')
+        } for e in hits)
+        entries = [e for e in entries if keys[e['id']] not in cached]
+
+    # Send each distinct text once; its embedding fans out to every entry that shares it
+    groups: Dict[str, List[Dict[str, Any]]] = {}
     for entry in entries:
-        entry_id = entry['id']
-        result = embed_entry(entry_id, client)
+        groups.setdefault(keys[entry['id']], []).append(entry)
+    chunks = chunk_texts_by_length(list(groups.values()), lambda group: len(texts_by_id[group[0]['id']]))
+    texts = [[texts_by_id[group[0]['id']] for group in chunk] for chunk in chunks]
 
-        if result.get('success'):
-            results['processed'] += 1
-            results['total_tokens'] += result.get('tokens_used', 0)
-        else:
-            results['failed'] += 1
-
-        results['entries'].append({
-            "id": entry_id,
-            "success": result.get('success', False),
-            "error": result.get('error')
-        })
+    if concurrency > 1 and len(chunks) > 1 and not _in_event_loop():
+        batches = asyncio.run(_embed_batches_async(texts, concurrency, async_client))
+    else:
+        batches = [generate_embeddings_batch(chunk_texts, client) for chunk_texts in texts]
+
+    for chunk, batch in zip(chunks, batches):
+        members = [entry for group in chunk for entry in group]
+
+        if not batch.get('success'):
+            # Fall back to per-entry calls so one bad input doesn't sink the chunk
+            for entry in members:
+                result = embed_entry(entry['id'], client, dtype=dtype)
+                if result.get('success'):
+                    results['processed'] += 1
+                    results['total_tokens'] += result.get('tokens_used', 0)
+                else:
+                    results['failed'] += 1
+                results['entries'].append({
+                    "id": entry['id'],
+                    "success": result.get('success', False),
+                    "error": result.get('error')
+                })
+            continue
+
+        results['total_tokens'] += batch['usage']['total_tokens']
+
+        # One transaction per API batch instead of a commit per row
+        vectors = [normalize_embedding(embedding) for embedding in batch['embeddings']]
+        forms = [encode_for_storage(v, dtype) for v in vectors]
+        store_result = store_embeddings_bulk(
+            [(entry['id'], blob) for group, (blob, _) in zip(chunk, forms) for entry in group],
+            EMBEDDING_MODEL,
+            normalized=True,
+            quantized=[q8 for group, (_, q8) in zip(chunk, forms) for _ in group],
+            dtype=dtype
+        )
+        # The cache always holds float32 so either layout can be served from it
+        cache_embeddings([
+            (keys[group[0]['id']], blob if dtype == 'float32' else embedding_to_bytes(v))
+            for group, (blob, _), v in zip(chunk, forms, vectors)
+        ], EMBEDDING_MODEL)
+        stored = store_result.get('success', False)
+        results['processed' if stored else 'failed'] += len(members)
+        results['entries'].extend({
+            "id": entry['id'],
+            "success": stored,
+            "error": store_result.get('error')
+        } for entry in members)
 
     # Calculate cost (~$0.02 per 1M tokens)
     results['estimated_cost'] = f"${results['total_tokens'] * 0.00002:.6f}"
@@ -229,13 +656,20 @@ def embed_all_pending(batch_size: int = 50, client=None) -> Dict[str, Any]:
     return results
 
 
-def reindex_all(batch_size: int = 100, client=None) -> Dict[str, Any]:
+def reindex_all(
+    batch_size: int = 100,
+    client=None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    dtype: Optional[str] = None
+) -> Dict[str, Any]:
     """
     Re-embed all entries (regenerate all embeddings).
 
     Args:
         batch_size: Number of entries to process per batch
         client: Optional OpenAI client
+        concurrency: Maximum concurrent API requests
+        dtype: Storage layout, 'float32', 'float16' or 'int8' (default EMBEDDING_STORE_DTYPE)
 
     Returns:
         dict with reindex results
@@ -247,47 +681,87 @@ def reindex_all(batch_size: int = 100, client=None) -> Dict[str, Any]:
     cursor = conn.cursor()
 
     # Clear existing embeddings
-    cursor.execute('UPDATE memory_entries SET embedding = NULL, embedding_model = NULL')
+    cursor.execute('''
+        UPDATE memory_entries
+        SET embedding = NULL, embedding_model = NULL, embedding_normalized = 0, embedding_q8 = NULL
+    ''')
     conn.commit()
     conn.close()
 
     # Now embed all
-    return embed_all_pending(batch_size=batch_size, client=client)
+    return embed_all_pending(batch_size=batch_size, client=client, concurrency=concurrency, dtype=dtype)
 
 
-def get_embedding_stats() -> Dict[str, Any]:
-    """Get statistics about embeddings in the database."""
+def renormalize_embeddings() -> Dict[str, Any]:
+    """
+    L2-normalize embeddings stored before normalization on write.
+
+    Rewrites every float32 embedding not flagged as normalized, or missing
+    its int8 copy, in a single transaction; no API calls are made. int8-only
+    rows are always stored normalized. Without NumPy no int8 copy can be
+    built, so only the normalized flag is checked.
+
+    Returns:
+        dict with number of rows rewritten
+    """
     conn = get_connection()
     cursor = conn.cursor()
 
-    # Total entries
-    cursor.execute('SELECT COUNT(*) as total FROM memory_entries WHERE is_active = 1')
-    total = cursor.fetchone()['total']
+    missing_q8 = ' OR embedding_q8 IS NULL' if HAS_NUMPY else ''
+    cursor.execute(f'''
+        SELECT id, embedding FROM memory_entries
+        WHERE embedding IS NOT NULL
+          AND COALESCE(embedding_dtype, 'float32') = 'float32'
+          AND (COALESCE(embedding_normalized, 0) = 0{missing_q8})
+    ''')
+    updates = []
+    for row in cursor.fetchall():
+        v = normalize_embedding(bytes_to_embedding(row['embedding']))
+        updates.append((embedding_to_bytes(v), embedding_to_bytes_q8(v), row['id']))
+
+    cursor.executemany('''
+        UPDATE memory_entries
+        SET embedding = ?, embedding_q8 = ?, embedding_normalized = 1
+        WHERE id = ?
+    ''', updates)
+    conn.commit()
+    conn.close()
 
-    # With embeddings
-    cursor.execute('SELECT COUNT(*) as count FROM memory_entries WHERE embedding IS NOT NULL AND is_active = 1')
-    with_embeddings = cursor.fetchone()['count']
+    return {
+        "success": True,
+        "renormalized": len(updates),
+        "message": f"Normalized {len(updates)} embeddings"
+    }
 
-    # Without embeddings
-    cursor.execute('SELECT COUNT(*) as count FROM memory_entries WHERE embedding IS NULL AND is_active = 1')
-    without_embeddings = cursor.fetchone()['count']
 
-    # By model
+def get_embedding_stats() -> Dict[str, Any]:
+    """Get statistics about embeddings in the database."""
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    # Totals, embedding coverage and average length in a single scan
     cursor.execute('''
-        SELECT embedding_model, COUNT(*) as count
+        SELECT
+            COUNT(*) as total,
+            SUM(CASE WHEN embedding IS NOT NULL THEN 1 ELSE 0 END) as with_embeddings,
+            AVG(CASE WHEN embedding IS NOT NULL THEN LENGTH(content) END) as avg_length
         FROM memory_entries
-        WHERE embedding IS NOT NULL AND is_active = 1
-        GROUP BY embedding_model
+        WHERE is_active = 1
     ''')
-    by_model = {row['embedding_model']: row['count'] for row in cursor.fetchall()}
+    row = cursor.fetchone()
+    total = row['total']
+    with_embeddings = row['with_embeddings'] or 0
+    without_embeddings = total - with_embeddings
+    avg_length = row['avg_length'] or 0
 
-    # Average content length for entries with embeddings
+    # By model
     cursor.execute('''
-        SELECT AVG(LENGTH(content)) as avg_length
+        SELECT embedding_model, COUNT(*) as count
         FROM memory_entries
         WHERE embedding IS NOT NULL AND is_active = 1
+        GROUP BY embedding_model
     ''')
-    avg_length = cursor.fetchone()['avg_length'] or 0
+    by_model = {row['embedding_model']: row['count'] for row in cursor.fetchall()}
 
     conn.close()
 
@@ -311,7 +785,13 @@ def main():
     parser.add_argument('--content', help='Get embedding for arbitrary text (returns JSON)')
     parser.add_argument('--reindex', action='store_true', help='Re-embed all entries')
     parser.add_argument('--stats', action='store_true', help='Show embedding statistics')
+    parser.add_argument('--renormalize', action='store_true',
+                       help='L2-normalize embeddings stored before normalization')
+    parser.add_argument('--dtype', choices=EMBEDDING_DTYPES, default=None,
+                       help='Storage layout for new embeddings (default: MEMORY_EMBEDDING_DTYPE or float32)')
     parser.add_argument('--batch-size', type=int, default=50, help='Batch size for --all')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                       help='Maximum concurrent embedding requests')
 
     args = parser.parse_args()
 
@@ -328,18 +808,21 @@ def main():
         result = generate_embedding(args.content)
         # Don't print full embedding, just metadata
         if result.get('success'):
-            result['embedding_preview'] = result['embedding'][:5] + ['...']
+            result['embedding_preview'] = [float(x) for x in result['embedding'][:5]] + ['...']
             del result['embedding']
 
     elif args.id:
-        result = embed_entry(args.id)
+        result = embed_entry(args.id, dtype=args.dtype)
+
+    elif args.renormalize:
+        result = renormalize_embeddings()
 
     elif args.reindex:
         print("Re-indexing all entries (this will clear existing embeddings)...")
-        result = reindex_all(batch_size=args.batch_size)
+        result = reindex_all(batch_size=args.batch_size, concurrency=args.concurrency, dtype=args.dtype)
 
     elif args.all:
-        result = embed_all_pending(batch_size=args.batch_size)
+        result = embed_all_pending(batch_size=args.batch_size, concurrency=args.concurrency, dtype=args.dtype)
 
     else:
         parser.print_help()
@@ -352,7 +835,7 @@ def main():
             print(f"ERROR {result.get('error', 'Unknown error')}")
             sys.exit(1)
 
-        print(json.dumps(result, indent=2, default=str))
+        print_json(result)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,224 @@
+"""
+Tool: HNSW Embedding Index
+Purpose: Approximate nearest-neighbour search over memory embeddings
+
+Used by hybrid_search.py in place of scoring every stored embedding:
+- Builds an hnswlib index (cosine space) over all active entries with embeddings
+- Persists it next to the memory database and reloads it while the corpus is unchanged
+- The database's embedding version counter (memory_db.get_embedding_fingerprint) decides when to rebuild
+- Returns None (caller falls back to an exact scan) for small corpora or without hnswlib
+
+Usage:
+    python tools/memory/hnsw_index.py --rebuild
+    python tools/memory/hnsw_index.py --stats
+
+Dependencies:
+    - numpy
+    - hnswlib (optional)
+    - sqlite3 (stdlib)
+
+Output:
+    JSON with index stats
+"""
+
+import os
+import sys
+import json
+import argparse
+import threading
+from pathlib import Path
+from typing import Optional, List, Dict, Any, Tuple
+
+import numpy as np
+
+# Import from sibling modules
+sys.path.insert(0, str(Path(__file__).parent))
+try:
+    import memory_db
+    from memory_db import get_connection, get_embedding_fingerprint, replace_file
+    from similarity import embeddings_to_matrix
+    from embed_memory import decode_embedding
+except ImportError as e:
+    print(f"Error importing modules: {e}", file=sys.stderr)
+    sys.exit(1)
+
+try:
+    import hnswlib
+    HAS_HNSWLIB = True
+except ImportError:
+    HAS_HNSWLIB = False
+
+# Below this many embeddings an exact scan is as fast and exactly right
+ANN_MIN_ENTRIES = 1000
+
+# HNSW build / query parameters
+HNSW_M = 16
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 64
+
+_lock = threading.Lock()
+# In-process index: (fingerprint, hnswlib.Index, {id: type})
+_index: Optional[Tuple[str, Any, Dict[int, str]]] = None
+
+
+def _index_paths() -> Tuple[Path, Path]:
+    """Index file and its metadata sidecar, next to the memory database."""
+    base = memory_db.DB_PATH.parent
+    return base / "memory_hnsw.bin", base / "memory_hnsw.json"
+
+
+def build_index() -> Optional[Tuple[str, Any, Dict[int, str]]]:
+    """Build and persist the index from the database. Returns None without hnswlib or embeddings."""
+    if not HAS_HNSWLIB:
+        return None
+
+    fingerprint, _ = get_embedding_fingerprint()
+    conn = get_connection()
+    rows = conn.execute('''
+        SELECT id, type, embedding, embedding_dtype FROM memory_entries
+        WHERE is_active = 1 AND embedding IS NOT NULL
+        ORDER BY id
+    ''').fetchall()
+    conn.close()
+    if not rows:
+        return None
+
+    vectors = embeddings_to_matrix(decode_embedding(row['embedding'], row['embedding_dtype']) for row in rows)
+    ids = np.array([row['id'] for row in rows], dtype=np.int64)
+    types = {int(row['id']): row['type'] for row in rows}
+
+    index = hnswlib.Index(space='cosine', dim=vectors.shape[1])
+    index.init_index(max_elements=len(rows), ef_construction=HNSW_EF_CONSTRUCTION, M=HNSW_M)
+    index.add_items(vectors, ids)
+
+    # Saved under temporary names and renamed into place, the metadata last, so a
+    # reader never loads a partly written index or pairs it with the wrong metadata
+    index_path, meta_path = _index_paths()
+    meta = json.dumps({
+        "fingerprint": fingerprint,
+        "dim": int(vectors.shape[1]),
+        "count": len(rows),
+        "types": types
+    }).encode('utf-8')
+    tmp_path = index_path.with_name(f".{index_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        meta_path.unlink(missing_ok=True)
+        index.save_index(str(tmp_path))
+        os.replace(tmp_path, index_path)
+        replace_file(meta_path, lambda f: f.write(meta))
+    except (OSError, RuntimeError):
+        # Still usable in this process; the next one rebuilds it
+        pass
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    return fingerprint, index, types
+
+
+def _load_index(fingerprint: str) -> Optional[Tuple[str, Any, Dict[int, str]]]:
+    """Load the persisted index if it was built for this fingerprint."""
+    index_path, meta_path = _index_paths()
+    try:
+        meta_text = meta_path.read_text()
+        meta = json.loads(meta_text)
+        if meta.get("fingerprint") != fingerprint:
+            return None
+        index = hnswlib.Index(space='cosine', dim=meta["dim"])
+        index.load_index(str(index_path), max_elements=meta["count"])
+        # build_index() removes the metadata before replacing the index file
+        if meta_path.read_text() != meta_text:
+            return None
+        return fingerprint, index, {int(k): v for k, v in meta["types"].items()}
+    except (OSError, ValueError, KeyError, TypeError, RuntimeError):
+        # Missing, truncated or corrupt files: the caller rebuilds
+        return None
+
+
+def get_index() -> Optional[Tuple[str, Any, Dict[int, str]]]:
+    """Current index for the corpus, or None when the exact scan should be used."""
+    global _index
+    if not HAS_HNSWLIB:
+        return None
+
+    fingerprint, count = get_embedding_fingerprint()
+    if count < ANN_MIN_ENTRIES:
+        return None
+
+    with _lock:
+        if _index is None or _index[0] != fingerprint:
+            _index = _load_index(fingerprint) or build_index()
+        return _index
+
+
+def ann_search(
+    query_embedding,
+    k: int,
+    entry_type: Optional[str] = None
+) -> Optional[List[Tuple[int, float]]]:
+    """
+    Approximate top-k entries by cosine similarity.
+
+    Args:
+        query_embedding: Query vector
+        k: Number of neighbours
+        entry_type: Optional type filter
+
+    Returns:
+        List of (entry id, similarity) best first, or None when the
+        caller should fall back to an exact scan
+    """
+    current = get_index()
+    if current is None:
+        return None
+    _, index, types = current
+
+    allowed = {i for i, t in types.items() if t == entry_type} if entry_type else None
+    available = len(allowed) if allowed is not None else len(types)
+    k = min(k, available)
+    if k <= 0:
+        return []
+
+    query = np.asarray(query_embedding, dtype=np.float32).reshape(1, -1)
+    try:
+        # ef is state on the shared index, so set it and query under the lock
+        with _lock:
+            index.set_ef(max(HNSW_EF_SEARCH, k))
+            if allowed is not None:
+                labels, distances = index.knn_query(query, k=k, filter=lambda label: label in allowed)
+            else:
+                labels, distances = index.knn_query(query, k=k)
+    except RuntimeError:
+        # hnswlib could not find k neighbours (e.g. a very selective filter)
+        return None
+
+    # Cosine space returns 1 - cosine similarity
+    return [(int(label), float(1.0 - dist)) for label, dist in zip(labels[0], distances[0])]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='HNSW Embedding Index')
+    parser.add_argument('--rebuild', action='store_true', help='Rebuild the index from the database')
+    parser.add_argument('--stats', action='store_true', help='Show index stats')
+
+    args = parser.parse_args()
+
+    if args.rebuild:
+        if not HAS_HNSWLIB:
+            print(json.dumps({"success": False, "error": "hnswlib package not installed"}, indent=2))
+            sys.exit(1)
+        built = build_index()
+        result = {"success": True, "built": built is not None, "count": len(built[2]) if built else 0}
+    else:
+        fingerprint, count = get_embedding_fingerprint()
+        result = {
+            "success": True,
+            "count": count,
+            "fingerprint": fingerprint,
+            "ann_enabled": HAS_HNSWLIB and count >= ANN_MIN_ENTRIES,
+            "index_file": str(_index_paths()[0])
+        }
+
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -5,7 +5,7 @@ Purpose: Combined BM25 (keyword) + Vector (semantic) search for optimal retrieva
 This implements Moltbot's hybrid search approach:
 - BM25 for exact token matching (good for specific terms)
 - Vector search for semantic similarity (good for meaning)
-- Combined scoring: 0.7 * bm25 + 0.3 * cosine (configurable)
+- Combined by weighted Reciprocal Rank Fusion: 0.7 * BM25 rank + 0.3 * vector rank (configurable)
 
 Usage:
     python tools/memory/hybrid_search.py --query "GPT image generation"
@@ -13,14 +13,17 @@ Usage:
     python tools/memory/hybrid_search.py --query "meeting" --bm25-weight 0.5
     python tools/memory/hybrid_search.py --query "learned" --semantic-only
     python tools/memory/hybrid_search.py --query "API key" --keyword-only
+    python tools/memory/hybrid_search.py --query "meeting" --no-cache
 
 Dependencies:
     - openai (for embeddings)
+    - numpy
     - rank_bm25 (optional, falls back to simple TF-IDF)
     - sqlite3 (stdlib)
 
 Env Vars:
     - OPENAI_API_KEY (required for semantic search)
+    - MEMORY_INDEX_DIR (optional; where the BM25 index files are kept, default: next to the database)
 
 Output:
     JSON with ranked results combining both search methods
@@ -31,10 +34,18 @@ import sys
 import json
 import argparse
 import re
-import math
+import hashlib
+import heapq
+import time
+import zipfile
+import pickle
+import shutil
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, List, Dict, Any, Set
-from collections import Counter
+from typing import Optional, List, Dict, Any, Set, Tuple, NamedTuple
+import numpy as np
 from dotenv import load_dotenv
 
 # Load environment
@@ -45,7 +56,12 @@ sys.path.insert(0, str(Path(__file__).parent))
 try:
     from semantic_search import semantic_search, cosine_similarity
     from embed_memory import generate_embedding, bytes_to_embedding
-    from memory_db import get_connection, search_entries
+    import memory_db
+    from memory_db import (
+        get_connection, search_entries, get_embedding_fingerprint, vector_search, print_json, replace_file
+    )
+    from bm25_scoring import bm25_scores
+    from hnsw_index import ann_search
 except ImportError as e:
     print(f"Error importing modules: {e}", file=sys.stderr)
     sys.exit(1)
@@ -57,58 +73,462 @@ try:
 except ImportError:
     HAS_BM25 = False
 
+# Token -> id, shared by every corpus; ids are only ever appended
+_VOCAB: Dict[str, int] = {}
+
+# Per-entry tokenization, reused across queries while the content hash matches
+# id -> (content hash, int32 token ids)
+_TOK_CACHE: Dict[int, Tuple[str, np.ndarray]] = {}
+
+# Entries kept in _TOK_CACHE (and its file); the oldest outside the current corpus go first
+TOKEN_CACHE_SIZE = 50000
+
+# Whether _TOK_CACHE has changed since it was loaded from / saved to disk, and a running
+# hash of the vocabulary's terms in id order: token ids only mean the same thing under
+# the same hash, whichever process built the vocabulary
+_tok_cache_state = {"loaded": False, "dirty": False, "vocab_digest": hashlib.blake2b(digest_size=16)}
+
+# Corpus signature -> term postings used to score BM25 queries
+_POSTINGS_CACHE: Dict[str, 'Postings'] = {}
+
+# Corpus signature -> BM25Okapi index built over it
+_BM25_INDEX_CACHE: Dict[str, Any] = {}
+
+# Corpora remembered per cache, in memory and on disk (e.g. the full corpus plus a
+# few type-filtered ones)
+CORPUS_CACHE_SIZE = 4
+
+# Directory of the persisted BM25 files (token cache, postings, BM25Okapi pickles);
+# None means $MEMORY_INDEX_DIR, or else the memory database's directory
+INDEX_DIR: Optional[Path] = None
+
+# Threads running the semantic half of hybrid searches. They outlive each search, so
+# their per-thread memory_db connections are reused instead of reopened every time
+SEMANTIC_WORKERS = 4
+_SEMANTIC_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_semantic_executor_lock = threading.Lock()
+
+# Reciprocal Rank Fusion constant: a result at rank r (0-based) contributes weight / (RRF_K + r + 1)
+RRF_K = 60
+
+# Semantic query cache: a new query whose embedding is this close to a cached
+# one (same options, same corpus) reuses that query's results
+QUERY_CACHE_SIZE = 256
+QUERY_CACHE_THRESHOLD = 0.95
+QUERY_CACHE_TTL = 300  # seconds
+
+# key -> (unit query embedding, stored at, search options, results)
+_QCACHE: 'OrderedDict[bytes, Tuple[np.ndarray, float, tuple, Dict[str, Any]]]' = OrderedDict()
+
+
+# Tokens are runs of 2+ word characters; everything else separates them
+_TOKEN_RE = re.compile(r'\w{2,}')
+
+# ASCII characters that are neither word characters nor whitespace, mapped to spaces
+_ASCII_PUNCT_TABLE = str.maketrans({c: ' ' for c in map(chr, range(128)) if not re.match(r'[\w\s]', c)})
+
 
 def tokenize(text: str) -> List[str]:
     """Simple tokenizer for BM25."""
-    # Lowercase, remove punctuation, split on whitespace
+    # Lowercase, treat punctuation as whitespace, drop very short tokens
     text = text.lower()
-    text = re.sub(r'[^\w\s]', ' ', text)
-    tokens = text.split()
-    # Remove very short tokens
-    return [t for t in tokens if len(t) > 1]
-
+    if text.isascii():
+        # str.translate + split is several times faster than a regex scan
+        return [t for t in text.translate(_ASCII_PUNCT_TABLE).split() if len(t) > 1]
+    return _TOKEN_RE.findall(text)
+
+
+def _content_hash(content: str) -> str:
+    return hashlib.blake2b((content or '').encode('utf-8'), digest_size=8).hexdigest()
+
+
+def _index_root() -> Path:
+    """Directory the BM25 files are persisted in (see INDEX_DIR)."""
+    configured = INDEX_DIR or os.getenv('MEMORY_INDEX_DIR')
+    return Path(configured) if configured else memory_db.DB_PATH.parent
+
+
+def _token_cache_path() -> Path:
+    """On-disk copy of the tokenization cache."""
+    return _index_root() / "bm25_tokens.npz"
+
+
+def _load_token_cache() -> None:
+    """Fill _VOCAB and _TOK_CACHE from disk, once per process."""
+    if _tok_cache_state["loaded"]:
+        return
+    _tok_cache_state["loaded"] = True
+    try:
+        with np.load(_token_cache_path(), allow_pickle=False) as data:
+            vocab, ids, hashes = data['vocab'], data['ids'], data['hashes']
+            tokens, doc_start = data['tokens'], data['doc_start']
+    except (OSError, KeyError, ValueError, EOFError, zipfile.BadZipFile):
+        return
+    for term in vocab:
+        _term_id(str(term))
+    for i, (entry_id, content_hash) in enumerate(zip(ids, hashes)):
+        _TOK_CACHE[int(entry_id)] = (str(content_hash), tokens[doc_start[i]:doc_start[i + 1]])
+
+
+def _save_token_cache() -> None:
+    """Write _VOCAB and _TOK_CACHE to disk as flat arrays if anything changed."""
+    if not _tok_cache_state["dirty"]:
+        return
+    _tok_cache_state["dirty"] = False
+    items = list(_TOK_CACHE.items())
+    lengths = np.array([len(tokens) for _, (_, tokens) in items], dtype=np.int64)
+    doc_start = np.zeros(len(items) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=doc_start[1:])
+    arrays = {
+        # _VOCAB is in id order: ids are assigned by insertion
+        "vocab": np.array(list(_VOCAB), dtype=str),
+        "ids": np.array([entry_id for entry_id, _ in items], dtype=np.int64),
+        "hashes": np.array([h for _, (h, _) in items], dtype=str),
+        "tokens": np.concatenate([tokens for _, (_, tokens) in items]) if items else np.empty(0, dtype=np.int32),
+        "doc_start": doc_start,
+    }
+    try:
+        path = _token_cache_path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        replace_file(path, lambda f: np.savez(f, **arrays))
+    except OSError:
+        pass
+
+
+def _term_id(term: str) -> int:
+    """Id of a term, appending it to _VOCAB (and the vocabulary hash) if new."""
+    term_id = _VOCAB.get(term)
+    if term_id is None:
+        term_id = _VOCAB[term] = len(_VOCAB)
+        _tok_cache_state["vocab_digest"].update(term.encode('utf-8') + b'\0')
+    return term_id
+
+
+def _trim_token_cache(keep: Set[int]) -> None:
+    """Drop the oldest cached tokenizations beyond TOKEN_CACHE_SIZE, except those of `keep`."""
+    excess = len(_TOK_CACHE) - TOKEN_CACHE_SIZE
+    if excess <= 0:
+        return
+    for entry_id in [entry_id for entry_id in _TOK_CACHE if entry_id not in keep][:excess]:
+        del _TOK_CACHE[entry_id]
+    _tok_cache_state["dirty"] = True
+
+
+def _doc_tokens(entry_id: int, content: str) -> Tuple[str, np.ndarray]:
+    """(content hash, int32 token ids) for an entry, tokenizing only new or changed content."""
+    content_hash = _content_hash(content)
+    cached = _TOK_CACHE.get(entry_id)
+    if cached is None or cached[0] != content_hash:
+        token_ids = [_term_id(t) for t in tokenize(content or '')]
+        cached = (content_hash, np.array(token_ids, dtype=np.int32))
+        _TOK_CACHE[entry_id] = cached
+        _tok_cache_state["dirty"] = True
+    return cached
+
+
+def _corpus_signature(ids: List[int], content_hashes: List[str]) -> str:
+    """
+    Hash of the (id, content hash) pairs making up a corpus.
 
-def simple_bm25_score(query_tokens: List[str], doc_tokens: List[str],
-                      avg_doc_len: float, doc_count: int,
-                      doc_freqs: Dict[str, int], k1: float = 1.5, b: float = 0.75) -> float:
+    Order matters: a BM25 index returns scores by document position.
     """
-    Simple BM25 scoring when rank_bm25 is not available.
+    return hashlib.blake2b(
+        ''.join(f'{entry_id}:{h};' for entry_id, h in zip(ids, content_hashes)).encode('utf-8'),
+        digest_size=16
+    ).hexdigest()
+
+
+def _remember(cache: Dict[str, Any], key: str, value: Any) -> Any:
+    """Store value, evicting the oldest corpora beyond CORPUS_CACHE_SIZE."""
+    cache[key] = value
+    while len(cache) > CORPUS_CACHE_SIZE:
+        del cache[next(iter(cache))]
+    return value
+
+
+class Postings(NamedTuple):
     """
-    score = 0.0
-    doc_len = len(doc_tokens)
-    doc_counter = Counter(doc_tokens)
+    Term-major CSR of term frequencies for a corpus.
 
-    for term in query_tokens:
-        if term in doc_counter:
-            tf = doc_counter[term]
-            df = doc_freqs.get(term, 1)
-            idf = math.log((doc_count - df + 0.5) / (df + 0.5) + 1)
+    Documents containing term t (an id in _VOCAB) are
+    doc_ids[indptr[t]:indptr[t + 1]], with matching counts in tfs.
+    """
+    indptr: np.ndarray
+    doc_ids: np.ndarray
+    tfs: np.ndarray
+    doc_lens: np.ndarray
+    avg_doc_len: float
+
+
+def build_postings(docs: List[Tuple[str, np.ndarray]]) -> Postings:
+    """Build term postings from (content hash, token ids) per document."""
+    doc_count = len(docs)
+    vocab_size = len(_VOCAB)
+    lengths = np.array([len(d[1]) for d in docs], dtype=np.int64)
+    flat = np.concatenate([d[1] for d in docs]).astype(np.int64) if docs else np.empty(0, dtype=np.int64)
+
+    # One key per (term, doc) token occurrence; unique() sorts them term-major and counts them
+    keys, tfs = np.unique(flat * doc_count + np.repeat(np.arange(doc_count), lengths), return_counts=True)
+    term_ids, doc_ids = np.divmod(keys, max(doc_count, 1))
+
+    indptr = np.zeros(vocab_size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(term_ids, minlength=vocab_size), out=indptr[1:])
+
+    doc_lens = lengths.astype(np.float64)
+    avg_doc_len = float(doc_lens.mean()) if doc_count and doc_lens.any() else 1.0
+    return Postings(
+        indptr=indptr,
+        doc_ids=doc_ids,
+        tfs=tfs.astype(np.float64),
+        doc_lens=doc_lens,
+        avg_doc_len=avg_doc_len,
+    )
 
-            numerator = tf * (k1 + 1)
-            denominator = tf + k1 * (1 - b + b * (doc_len / avg_doc_len))
 
-            score += idf * (numerator / denominator)
+def _index_key(signature: str) -> str:
+    """Key for a persisted index: the corpus plus the vocabulary its token ids refer to."""
+    return f'{_tok_cache_state["vocab_digest"].hexdigest()}:{signature}'
+
+
+def _index_file_name(signature: str) -> str:
+    """File name of a persisted index, one per corpus and vocabulary."""
+    return hashlib.blake2b(_index_key(signature).encode('utf-8'), digest_size=8).hexdigest()
+
+
+def _prune_index_files(directory: Path) -> None:
+    """Delete all but the CORPUS_CACHE_SIZE most recently written indexes in a directory."""
+    try:
+        paths = [path for path in directory.iterdir() if not path.name.startswith('.')]
+        paths.sort(key=lambda path: path.stat().st_mtime, reverse=True)
+        for path in paths[CORPUS_CACHE_SIZE:]:
+            if path.is_dir():
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                path.unlink(missing_ok=True)
+    except OSError:
+        pass
+
+
+def _postings_dir() -> Path:
+    """On-disk postings, one subdirectory per indexed corpus."""
+    return _index_root() / "bm25_postings"
+
+
+def _load_postings(signature: str) -> Optional[Postings]:
+    """Memory-map the persisted postings if they were built for this corpus."""
+    base = _postings_dir() / _index_file_name(signature)
+    try:
+        meta_text = (base / "meta.json").read_text()
+        meta = json.loads(meta_text)
+        if meta.get("key") != _index_key(signature):
+            return None
+        arrays = {name: np.asarray(np.load(base / f"{name}.npy", mmap_mode='r'))
+                  for name in ('indptr', 'doc_ids', 'tfs', 'doc_lens')}
+        # _save_postings() removes meta.json before replacing any array
+        if (base / "meta.json").read_text() != meta_text:
+            return None
+    except (OSError, ValueError):
+        return None
+    return Postings(avg_doc_len=meta["avg_doc_len"], **arrays)
+
+
+def _save_postings(signature: str, postings: Postings) -> None:
+    base = _postings_dir() / _index_file_name(signature)
+    try:
+        base.mkdir(parents=True, exist_ok=True)
+        (base / "meta.json").unlink(missing_ok=True)
+        for name in ('indptr', 'doc_ids', 'tfs', 'doc_lens'):
+            replace_file(base / f"{name}.npy", lambda f, name=name: np.save(f, getattr(postings, name)))
+        # Written last: the arrays only count once their metadata is in place
+        meta = json.dumps({"key": _index_key(signature), "avg_doc_len": postings.avg_doc_len}).encode('utf-8')
+        replace_file(base / "meta.json", lambda f: f.write(meta))
+        # Superseded single-corpus postings
+        for name in ('meta.json', 'indptr.npy', 'doc_ids.npy', 'tfs.npy', 'doc_lens.npy'):
+            (_postings_dir() / name).unlink(missing_ok=True)
+    except OSError:
+        return
+    _prune_index_files(_postings_dir())
+
+
+def _corpus_postings(signature: str, docs: List[Tuple[str, np.ndarray]]) -> Postings:
+    """Term postings for a corpus, rebuilt only when the corpus changes (also across processes)."""
+    postings = _POSTINGS_CACHE.get(signature)
+    if postings is None:
+        postings = _load_postings(signature)
+        if postings is None:
+            postings = build_postings(docs)
+            _save_postings(signature, postings)
+        _remember(_POSTINGS_CACHE, signature, postings)
+    return postings
+
+
+def _bm25_index_dir() -> Path:
+    """On-disk BM25Okapi indexes, one pickle per indexed corpus."""
+    return _index_root() / "bm25_okapi"
+
+
+def _bm25_index(signature: str, docs: List[Tuple[str, np.ndarray]]):
+    """BM25Okapi index over token ids for a corpus, built once per corpus signature (also across processes)."""
+    bm25 = _BM25_INDEX_CACHE.get(signature)
+    if bm25 is not None:
+        return bm25
+
+    path = _bm25_index_dir() / f"{_index_file_name(signature)}.pkl"
+    try:
+        with open(path, 'rb') as f:
+            key, bm25 = pickle.load(f)
+        if key != _index_key(signature):
+            bm25 = None
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+        bm25 = None
+
+    if bm25 is None:
+        bm25 = BM25Okapi([d[1].tolist() for d in docs])
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            replace_file(path, lambda f: pickle.dump((_index_key(signature), bm25), f,
+                                                     protocol=pickle.HIGHEST_PROTOCOL))
+            # Superseded single-corpus index
+            (_index_root() / "bm25_okapi.pkl").unlink(missing_ok=True)
+        except OSError:
+            pass
+        else:
+            _prune_index_files(path.parent)
+    return _remember(_BM25_INDEX_CACHE, signature, bm25)
+
+
+def simple_bm25_scores(query_ids: List[int], postings: Postings,
+                       k1: float = 1.5, b: float = 0.75,
+                       idf: Optional[Dict[int, float]] = None) -> np.ndarray:
+    """
+    BM25 scores of every document in a corpus.
 
-    return score
+    Scores every document at once (see bm25_scoring.bm25_scores); each
+    query term touches only the documents in its posting list. idf maps
+    term id -> idf (e.g. BM25Okapi.idf); by default it comes from the postings.
+    """
+    # Terms added to the vocabulary after this corpus was indexed occur in none of its documents
+    vocab_size = len(postings.indptr) - 1
+    term_ids = [t for t in query_ids if t < vocab_size]
+    idfs = None if idf is None else np.array([idf.get(t) or 0 for t in term_ids], dtype=np.float64)
+    return bm25_scores(
+        np.array(term_ids, dtype=np.int64), postings.indptr, postings.doc_ids, postings.tfs,
+        postings.doc_lens, postings.avg_doc_len, k1, b, idfs
+    )
 
 
-def get_all_entries_for_bm25() -> List[Dict[str, Any]]:
-    """Get all active entries for BM25 indexing."""
+def get_bm25_corpus(entry_type: Optional[str] = None) -> List[Tuple[int, str]]:
+    """(id, content) of all active entries (optionally of one type), most important first."""
     conn = get_connection()
+    # Plain tuples: only the text is scored, metadata is loaded later for the survivors
     cursor = conn.cursor()
+    cursor.row_factory = None
+    cursor.arraysize = 1000
 
-    cursor.execute('''
-        SELECT id, type, content, source, importance, tags, created_at
+    query = '''
+        SELECT id, content
         FROM memory_entries
         WHERE is_active = 1
-        ORDER BY importance DESC
-    ''')
+    '''
+    params = []
+    if entry_type:
+        query += ' AND type = ?'
+        params.append(entry_type)
+    query += ' ORDER BY importance DESC'
+
+    cursor.execute(query, params)
+
+    return cursor.fetchall()
 
-    entries = [dict(row) for row in cursor.fetchall()]
-    conn.close()
+
+def get_entries_by_ids(ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    """Metadata for the given entry ids, keyed by id."""
+    ids = list(ids)
+    if not ids:
+        return {}
+    conn = get_connection()
+    entries = {}
+    # Stay well under SQLite's bound-parameter limit
+    for i in range(0, len(ids), 500):
+        chunk = ids[i:i + 500]
+        rows = conn.execute(f'''
+            SELECT id, type, content, source, importance, tags, created_at
+            FROM memory_entries
+            WHERE id IN ({','.join('?' * len(chunk))})
+        ''', chunk).fetchall()
+        entries.update((row['id'], dict(row)) for row in rows)
     return entries
 
 
+def _tokenize_corpus(corpus: List[Tuple[int, str]]) -> Tuple[List[Tuple[str, np.ndarray]], str]:
+    """Per-document (content hash, token ids) and the corpus signature."""
+    # Tokenize all documents (cached per entry, in memory and on disk)
+    _load_token_cache()
+    docs = [_doc_tokens(entry_id, content) for entry_id, content in corpus]
+    _trim_token_cache({entry_id for entry_id, _ in corpus})
+    _save_token_cache()
+    return docs, _corpus_signature([entry_id for entry_id, _ in corpus], [d[0] for d in docs])
+
+
+def bm25_rank(
+    query: str,
+    corpus: List[Tuple[int, str]],
+    limit: int = 20,
+    tokenized: Optional[Tuple[List[Tuple[str, np.ndarray]], str]] = None
+) -> List[Tuple[int, float, float]]:
+    """
+    Rank a corpus of (id, content) pairs against a query with BM25.
+
+    Args:
+        query: Search query
+        corpus: (id, content) pairs, e.g. from get_bm25_corpus()
+        limit: Maximum results
+        tokenized: _tokenize_corpus(corpus), if the caller already has it
+
+    Returns:
+        (id, normalized score, raw score) for matching entries, best first
+    """
+    if not corpus:
+        return []
+
+    query_tokens = tokenize(query)
+    if not query_tokens:
+        return []
+
+    docs, signature = tokenized or _tokenize_corpus(corpus)
+    ids = [entry_id for entry_id, _ in corpus]
+
+    # Query terms missing from the vocabulary occur in no document
+    query_ids = [_VOCAB[t] for t in query_tokens if t in _VOCAB]
+
+    postings = _corpus_postings(signature, docs)
+    if HAS_BM25:
+        # Okapi idf and parameters from rank_bm25 (index reused while the corpus is unchanged);
+        # scoring walks the postings rather than BM25Okapi.get_scores()' scan of every document
+        bm25 = _bm25_index(signature, docs)
+        scores = simple_bm25_scores(query_ids, postings, bm25.k1, bm25.b, bm25.idf)
+    else:
+        # Fall back to simple BM25
+        scores = simple_bm25_scores(query_ids, postings)
+
+    scores = np.asarray(scores, dtype=np.float64)
+    top_score = scores.max() if len(scores) else 0
+    max_score = top_score if top_score > 0 else 1
+
+    # Select the top `limit` matches without sorting the whole corpus;
+    # ties keep corpus order (most important first)
+    top = np.flatnonzero(scores > 0)
+    if limit <= 0:
+        return []
+    if len(top) > limit:
+        top = top[np.argpartition(-scores[top], limit - 1)[:limit]]
+    top = top[np.lexsort((top, -scores[top]))]
+
+    # Normalize scores to 0-1
+    return [(ids[i], round(float(scores[i] / max_score), 4), round(float(scores[i]), 4))
+            for i in top.tolist()]
+
+
 def bm25_search(
     query: str,
     entries: Optional[List[Dict]] = None,
@@ -126,57 +546,116 @@ def bm25_search(
         List of entries with BM25 scores
     """
     if entries is None:
-        entries = get_all_entries_for_bm25()
+        ranked = bm25_rank(query, get_bm25_corpus(), limit)
+        entries_by_id = get_entries_by_ids([entry_id for entry_id, _, _ in ranked])
+    else:
+        ranked = bm25_rank(query, [(e['id'], e['content']) for e in entries], limit)
+        entries_by_id = {e['id']: e for e in entries}
+
+    return [{
+        **entries_by_id[entry_id],
+        "bm25_score": score,
+        "bm25_raw": raw
+    } for entry_id, score, raw in ranked if entry_id in entries_by_id]
+
+
+def _copy_results(results: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of a hybrid_search() response that shares no mutable parts with the original."""
+    return {
+        **results,
+        "weights": dict(results["weights"]),
+        "results": [dict(r) for r in results["results"]],
+    }
 
-    if not entries:
-        return []
 
-    query_tokens = tokenize(query)
-    if not query_tokens:
-        return []
+def _cached_query(query_embedding: np.ndarray, options: tuple) -> Optional[Dict[str, Any]]:
+    """Results of a fresh cached query with the same options and a similar embedding, if any."""
+    now = time.monotonic()
+    for key in [k for k, v in _QCACHE.items() if now - v[1] > QUERY_CACHE_TTL]:
+        del _QCACHE[key]
+
+    candidates = [(k, v) for k, v in _QCACHE.items() if v[2] == options]
+    if not candidates:
+        return None
+    # All cached embeddings are unit length, so one matrix-vector product gives every cosine
+    sims = np.stack([v[0] for _, v in candidates]) @ query_embedding
+    best = int(np.argmax(sims))
+    if sims[best] < QUERY_CACHE_THRESHOLD:
+        return None
+    key, (_, _, _, results) = candidates[best]
+    _QCACHE.move_to_end(key)
+    # Callers own what they get back; edits must not reach the cached entry
+    return {**_copy_results(results), "cache_hit": True, "cache_similarity": round(float(sims[best]), 4)}
+
+
+def _cache_query(query: str, query_embedding: np.ndarray, options: tuple, results: Dict[str, Any]) -> None:
+    key = hashlib.blake2b(repr((query, options)).encode('utf-8'), digest_size=16).digest()
+    _QCACHE[key] = (query_embedding, time.monotonic(), options, _copy_results(results))
+    _QCACHE.move_to_end(key)
+    while len(_QCACHE) > QUERY_CACHE_SIZE:
+        _QCACHE.popitem(last=False)
+
+
+def _semantic_executor() -> ThreadPoolExecutor:
+    """The worker pool semantic searches run on, created on first use."""
+    global _SEMANTIC_EXECUTOR
+    with _semantic_executor_lock:
+        if _SEMANTIC_EXECUTOR is None:
+            _SEMANTIC_EXECUTOR = ThreadPoolExecutor(max_workers=SEMANTIC_WORKERS, thread_name_prefix='hybrid-semantic')
+    return _SEMANTIC_EXECUTOR
+
+
+def _semantic_candidates(
+    query: str,
+    query_embedding: Optional[np.ndarray],
+    entry_type: Optional[str],
+    limit: int,
+    threshold: float
+) -> Optional[Dict[int, float]]:
+    """
+    {id: similarity} of the closest entries, or None if the search failed.
 
-    # Tokenize all documents
-    doc_tokens_list = [tokenize(e['content']) for e in entries]
+    Uses the HNSW index when it applies (see hnsw_index.ann_search), then
+    the sqlite-vec index (memory_db.vector_search), otherwise the exact
+    scan in semantic_search().
+    """
+    if query_embedding is None:
+        embed_result = generate_embedding(query)
+        if embed_result.get("success"):
+            query_embedding = embed_result["embedding"]
+
+    if query_embedding is not None:
+        hits = ann_search(query_embedding, limit, entry_type)
+        if hits is None:
+            hits = vector_search(np.asarray(query_embedding, dtype=np.float32).tobytes(), limit, entry_type)
+        if hits is not None:
+            return {entry_id: round(sim, 4) for entry_id, sim in hits if sim >= threshold}
+
+    sem_results = semantic_search(query, entry_type=entry_type, limit=limit, threshold=threshold)
+    if not sem_results.get("success"):
+        return None
+    return {r["id"]: r["similarity"] for r in sem_results.get("results", [])}
+
+
+def _bm25_only(results: Dict[str, Any], query: str, entry_type: Optional[str], limit: int) -> Dict[str, Any]:
+    """Keyword-only search: one corpus fetch, no embedding or semantic setup."""
+    results["method"] = "keyword_only"
+    corpus = get_bm25_corpus(entry_type)
+    if not corpus:
+        results["message"] = "No entries found"
+        return results
 
-    if HAS_BM25:
-        # Use rank_bm25 library
-        bm25 = BM25Okapi(doc_tokens_list)
-        scores = bm25.get_scores(query_tokens)
-    else:
-        # Fall back to simple BM25
-        avg_doc_len = sum(len(d) for d in doc_tokens_list) / len(doc_tokens_list) if doc_tokens_list else 1
-
-        # Calculate document frequencies
-        doc_freqs = Counter()
-        for doc_tokens in doc_tokens_list:
-            unique_tokens = set(doc_tokens)
-            for token in unique_tokens:
-                doc_freqs[token] += 1
-
-        scores = []
-        for doc_tokens in doc_tokens_list:
-            score = simple_bm25_score(
-                query_tokens, doc_tokens, avg_doc_len,
-                len(entries), doc_freqs
-            )
-            scores.append(score)
-
-    # Combine with entries and sort
-    scored_entries = []
-    max_score = max(scores) if scores and max(scores) > 0 else 1
-
-    for entry, score in zip(entries, scores):
-        if score > 0:
-            # Normalize score to 0-1
-            normalized_score = score / max_score
-            scored_entries.append({
-                **entry,
-                "bm25_score": round(normalized_score, 4),
-                "bm25_raw": round(score, 4)
-            })
-
-    scored_entries.sort(key=lambda x: x['bm25_score'], reverse=True)
-    return scored_entries[:limit]
+    ranked = bm25_rank(query, corpus, limit=limit)
+    entries_by_id = get_entries_by_ids([entry_id for entry_id, _, _ in ranked])
+    results["results"] = [{
+        "id": entry_id,
+        "type": entries_by_id[entry_id]["type"],
+        "content": entries_by_id[entry_id]["content"],
+        "score": score,
+        "bm25_score": score,
+        "semantic_score": None
+    } for entry_id, score, _ in ranked if entry_id in entries_by_id]
+    return results
 
 
 def hybrid_search(
@@ -187,7 +666,8 @@ def hybrid_search(
     semantic_weight: float = 0.3,
     min_score: float = 0.1,
     semantic_only: bool = False,
-    keyword_only: bool = False
+    keyword_only: bool = False,
+    no_cache: bool = False
 ) -> Dict[str, Any]:
     """
     Perform hybrid BM25 + semantic search.
@@ -196,11 +676,12 @@ def hybrid_search(
         query: Search query
         entry_type: Optional type filter
         limit: Maximum results
-        bm25_weight: Weight for BM25 scores (default 0.7)
-        semantic_weight: Weight for semantic scores (default 0.3)
-        min_score: Minimum combined score
+        bm25_weight: Weight of the BM25 ranking (default 0.7)
+        semantic_weight: Weight of the semantic ranking (default 0.3)
+        min_score: Minimum combined (rank fusion) score, 0-1
         semantic_only: Only use semantic search
         keyword_only: Only use keyword search
+        no_cache: Skip the semantic query cache
 
     Returns:
         dict with combined results
@@ -213,30 +694,36 @@ def hybrid_search(
         "results": []
     }
 
-    # Get entries for BM25
-    all_entries = get_all_entries_for_bm25()
-
-    # Filter by type if specified
-    if entry_type:
-        all_entries = [e for e in all_entries if e.get('type') == entry_type]
-
-    if not all_entries:
-        results["message"] = "No entries found"
-        return results
-
-    # Keyword-only search
     if keyword_only:
-        results["method"] = "keyword_only"
-        bm25_results = bm25_search(query, all_entries, limit=limit)
-        results["results"] = [{
-            "id": r["id"],
-            "type": r["type"],
-            "content": r["content"],
-            "score": r["bm25_score"],
-            "bm25_score": r["bm25_score"],
-            "semantic_score": None
-        } for r in bm25_results]
-        return results
+        return _bm25_only(results, query, entry_type, limit)
+
+    # (id, content) for BM25, filtered by type in SQL; metadata is fetched for the results only.
+    # Semantic-only searches never score BM25, and semantic_search() reads the DB itself.
+    corpus = None
+    if not semantic_only:
+        corpus = get_bm25_corpus(entry_type)
+        if not corpus:
+            results["message"] = "No entries found"
+            return results
+        # Hashed (and tokenized) once, for both the cache signature and BM25
+        tokenized = _tokenize_corpus(corpus)
+
+    # Semantic query cache.
+    # The embedding is cached persistently, so semantic_search() re-reads it without an API call.
+    query_embedding = None
+    if not no_cache:
+        embed_result = generate_embedding(query)
+        if embed_result.get("success"):
+            query_embedding = np.array(embed_result["embedding"], dtype=np.float32)
+            query_embedding /= np.linalg.norm(query_embedding) + 1e-12
+            if corpus is None:
+                signature, _ = get_embedding_fingerprint()
+            else:
+                signature = tokenized[1]
+            options = (entry_type, limit, bm25_weight, semantic_weight, min_score, semantic_only, signature)
+            cached = _cached_query(query_embedding, options)
+            if cached is not None:
+                return cached
 
     # Semantic-only search
     if semantic_only:
@@ -251,51 +738,63 @@ def hybrid_search(
                 "bm25_score": None,
                 "semantic_score": r["similarity"]
             } for r in sem_results.get("results", [])]
+            if query_embedding is not None:
+                _cache_query(query, query_embedding, options, results)
         return results
 
     # Full hybrid search
+    # Steps 1 and 2 are independent: the semantic search (query embedding round-trip)
+    # runs on a worker thread while BM25 scores on this one
+    # Step 2: Semantic search on candidates (HNSW index for large corpora)
+    sem_future = _semantic_executor().submit(
+        _semantic_candidates, query, query_embedding, entry_type, limit * 3, 0.2
+    )
+
     # Step 1: BM25 search (get more candidates than needed)
-    bm25_results = bm25_search(query, all_entries, limit=limit * 3)
-    bm25_scores = {r["id"]: r["bm25_score"] for r in bm25_results}
-
-    # Step 2: Semantic search on candidates
-    sem_results = semantic_search(query, entry_type=entry_type, limit=limit * 3, threshold=0.2)
-    semantic_scores = {}
-    if sem_results.get("success"):
-        semantic_scores = {r["id"]: r["similarity"] for r in sem_results.get("results", [])}
-
-    # Step 3: Combine scores
-    all_ids = set(bm25_scores.keys()) | set(semantic_scores.keys())
-    combined = []
-
-    for entry_id in all_ids:
-        bm25 = bm25_scores.get(entry_id, 0)
-        semantic = semantic_scores.get(entry_id, 0)
-
-        # Combined score
-        combined_score = (bm25_weight * bm25) + (semantic_weight * semantic)
-
-        if combined_score >= min_score:
-            # Find the entry data
-            entry_data = next((e for e in all_entries if e["id"] == entry_id), None)
-            if entry_data:
-                combined.append({
-                    "id": entry_id,
-                    "type": entry_data["type"],
-                    "content": entry_data["content"],
-                    "score": round(combined_score, 4),
-                    "bm25_score": round(bm25, 4) if bm25 > 0 else None,
-                    "semantic_score": round(semantic, 4) if semantic > 0 else None,
-                    "importance": entry_data.get("importance")
-                })
-
-    # Sort by combined score
-    combined.sort(key=lambda x: x["score"], reverse=True)
-
-    results["results"] = combined[:limit]
-    results["total_candidates"] = len(all_ids)
+    # Best first: the dict keeps bm25_rank() order for the fusion below
+    bm25_scores = {entry_id: score for entry_id, score, _ in bm25_rank(query, corpus, limit * 3, tokenized)}
+
+    sem_candidates = sem_future.result()
+    semantic_scores = sem_candidates or {}
+
+    # Step 3: Combine by Reciprocal Rank Fusion. Ranks need no score normalization;
+    # scores are scaled so a result ranked first by both searches scores 1.0
+    rrf = {}
+    semantic_ranked = sorted(semantic_scores, key=semantic_scores.get, reverse=True)
+    for weight, ranked_ids in ((bm25_weight, bm25_scores), (semantic_weight, semantic_ranked)):
+        for rank, entry_id in enumerate(ranked_ids):
+            rrf[entry_id] = rrf.get(entry_id, 0) + weight / (RRF_K + rank + 1)
+    best_possible = (bm25_weight + semantic_weight) / (RRF_K + 1) or 1
+
+    # Semantic matches must also pass the corpus filters (active, type)
+    corpus_ids = {entry_id for entry_id, _ in corpus}
+    passing = []
+    for entry_id, fused in rrf.items():
+        combined_score = fused / best_possible
+        if combined_score >= min_score and entry_id in corpus_ids:
+            passing.append((entry_id, combined_score,
+                            bm25_scores.get(entry_id, 0), semantic_scores.get(entry_id, 0)))
+
+    # Load the entry data for the candidates that made the cut
+    entries_by_id = get_entries_by_ids([entry_id for entry_id, _, _, _ in passing])
+    combined = [{
+        "id": entry_id,
+        "type": entries_by_id[entry_id]["type"],
+        "content": entries_by_id[entry_id]["content"],
+        "score": round(combined_score, 4),
+        "bm25_score": round(bm25, 4) if bm25 > 0 else None,
+        "semantic_score": round(semantic, 4) if semantic > 0 else None,
+        "importance": entries_by_id[entry_id].get("importance")
+    } for entry_id, combined_score, bm25, semantic in passing if entry_id in entries_by_id]
+
+    # Top results by combined score
+    results["results"] = heapq.nlargest(limit, combined, key=lambda x: x["score"])
+    results["total_candidates"] = len(rrf)
     results["above_threshold"] = len(combined)
 
+    if query_embedding is not None and sem_candidates is not None:
+        _cache_query(query, query_embedding, options, results)
+
     return results
 
 
@@ -305,15 +804,17 @@ def main():
     parser.add_argument('--type', help='Filter by memory type')
     parser.add_argument('--limit', type=int, default=10, help='Maximum results')
     parser.add_argument('--bm25-weight', type=float, default=0.7,
-                       help='Weight for BM25 keyword scores (0-1)')
+                       help='Weight for the BM25 keyword ranking (0-1)')
     parser.add_argument('--semantic-weight', type=float, default=0.3,
-                       help='Weight for semantic scores (0-1)')
+                       help='Weight for the semantic ranking (0-1)')
     parser.add_argument('--min-score', type=float, default=0.1,
                        help='Minimum combined score threshold')
     parser.add_argument('--semantic-only', action='store_true',
                        help='Only use semantic/vector search')
     parser.add_argument('--keyword-only', action='store_true',
                        help='Only use keyword/BM25 search')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Skip the semantic query cache')
 
     args = parser.parse_args()
 
@@ -330,7 +831,8 @@ def main():
         semantic_weight=sem_w,
         min_score=args.min_score,
         semantic_only=args.semantic_only,
-        keyword_only=args.keyword_only
+        keyword_only=args.keyword_only,
+        no_cache=args.no_cache
     )
 
     if result.get('success'):
@@ -340,7 +842,7 @@ def main():
         print(f"ERROR {result.get('error')}")
         sys.exit(1)
 
-    print(json.dumps(result, indent=2, default=str))
+    print_json(result)
 
 
 if __name__ == "__main__":
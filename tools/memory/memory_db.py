@@ -11,16 +11,25 @@ Usage:
     python tools/memory/memory_db.py --action add --type fact --content "User prefers GPT for images"
     python tools/memory/memory_db.py --action add --type preference --content "Dark mode enabled" --source user
     python tools/memory/memory_db.py --action search --query "image generation preferences"
-    python tools/memory/memory_db.py --action list [--type fact|preference|event|insight]
+    python tools/memory/memory_db.py --action list [--type fact|preference|event|insight] [--tag img]
     python tools/memory/memory_db.py --action get --id 5
     python tools/memory/memory_db.py --action delete --id 5
     python tools/memory/memory_db.py --action stats
     python tools/memory/memory_db.py --action recent --hours 24
+    python tools/memory/memory_db.py --action vacuum   # rebuild an older database at PAGE_SIZE
+
+    Scripts writing many entries can share one transaction (one commit, one WAL sync):
+        with memory_db.bulk():
+            for text in texts:
+                memory_db.add_entry(text)
 
 Dependencies:
     - sqlite3 (stdlib)
     - json (stdlib)
     - openai (for embeddings, optional)
+    - lz4 (optional, compresses large daily log text)
+    - sqlite-vec (optional, vector index for vector_search)
+    - orjson (optional, faster JSON output)
 
 Output:
     JSON result with success status and data
@@ -31,10 +40,36 @@ import sys
 import json
 import sqlite3
 import argparse
+import atexit
+import contextlib
+import functools
 import hashlib
-from datetime import datetime, timedelta
+import struct
+import threading
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple, Union, Callable
+
+# LZ4 frame compression for large log text (optional)
+try:
+    import lz4.frame
+    HAS_LZ4 = True
+except ImportError:
+    HAS_LZ4 = False
+
+# orjson writes large listings several times faster; stdlib json is the fallback
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# sqlite-vec: k-NN over embeddings inside SQLite (optional)
+try:
+    import sqlite_vec
+    HAS_SQLITE_VEC = True
+except ImportError:
+    HAS_SQLITE_VEC = False
 
 # Database path
 DB_PATH = Path(__file__).parent.parent.parent / "data" / "memory.db"
@@ -45,13 +80,243 @@ VALID_TYPES = ['fact', 'preference', 'event', 'insight', 'task', 'relationship']
 # Valid sources
 VALID_SOURCES = ['user', 'inferred', 'session', 'external', 'system']
 
+# Fields update_entry() may change
+UPDATABLE_FIELDS = frozenset({
+    'content', 'type', 'source', 'confidence', 'importance', 'tags', 'context', 'expires_at', 'is_active'
+})
+
+# memory_entries columns added after the original schema: (name, definition)
+ADDED_COLUMNS = [
+    ('embedding_normalized', 'INTEGER DEFAULT 0'),
+    ('embedding_q8', 'BLOB'),
+    ('embedding_dtype', "TEXT DEFAULT 'float32'"),
+]
+
+# Connection tuning: map up to 1 GiB of the file, keep up to 64 MiB of pages cached,
+# trim the WAL back to 32 MiB after checkpoints, wait up to 5 s for a competing writer
+MMAP_SIZE = 1 << 30
+CACHE_SIZE_KIB = 65536
+JOURNAL_SIZE_LIMIT = 32 << 20
+BUSY_TIMEOUT_MS = 5000
+
+# 32 KiB pages keep a row's embedding BLOBs (6 KiB float32 or 3 KiB float16, + 1.5 KiB int8) on the row's own
+# page instead of overflow pages (4 KiB pages spill anything over ~1 KiB). Applies when a
+# database is created; existing ones are converted by vacuum_database() (--action vacuum)
+PAGE_SIZE = 32768
+
+# Dimensions of the memory_vec table (text-embedding-3-small); other sizes are not indexed
+VEC_DIMENSIONS = 1536
+_VEC_STRUCT = struct.Struct(f'{VEC_DIMENSIONS}f')
+_VEC_STRUCT_F16 = struct.Struct(f'{VEC_DIMENSIONS}e')
+# int8 layout written by embed_memory.embedding_to_bytes_q8(): float32 scale, then one int8 per dimension
+_VEC_STRUCT_Q8 = struct.Struct(f'<f{VEC_DIMENSIONS}b')
+
+# Compressed column values start with this marker; anything else is stored as plain text
+LZ4_MAGIC = b'\x04LZ4'
+# Smaller values are not worth a compression frame
+COMPRESS_MIN_BYTES = 512
+
+# Stored in PRAGMA user_version; bumped when existing values must be migrated
+# (1: content_hash moved from a SHA-256 prefix to BLAKE2b-64)
+SCHEMA_VERSION = 1
+
+# embedding_cache rows kept; past this the least recently used are evicted
+# (~6 KiB per 1536-dim row)
+EMBEDDING_CACHE_MAX_ROWS = 100_000
+
+# Prepared statements kept per connection (sqlite3's LRU statement cache)
+CACHED_STATEMENTS = 256
+
+# memory_entries columns returned to callers: embedding BLOBs never leave SQLite,
+# only whether the row has one
+COLS_NO_EMBED = (
+    'id, type, content, content_hash, source, confidence, importance, created_at, updated_at, '
+    'last_accessed, access_count, embedding IS NOT NULL AS has_embedding, embedding_model, '
+    'tags, context, expires_at, is_active'
+)
+
+# Hot statements as module constants so every call sends the identical SQL
+# text and hits the connection's statement cache
+# Served by the UNIQUE content_hash index
+SQL_FIND_BY_HASH = 'SELECT id, content FROM memory_entries WHERE content_hash = ?'
+SQL_ENTRY_EXISTS = 'SELECT 1 FROM memory_entries WHERE id = ?'
+SQL_ADD_TAG = 'INSERT OR IGNORE INTO memory_tags (tag, memory_id) VALUES (?, ?)'
+SQL_DROP_TAGS = 'DELETE FROM memory_tags WHERE memory_id = ?'
+# Insert-or-detect-duplicate in one statement: returns the new row, or nothing on a duplicate
+SQL_INSERT_ENTRY = f'''
+    INSERT INTO memory_entries
+    (type, content, content_hash, source, confidence, importance, tags, context, expires_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(content_hash) DO NOTHING
+    RETURNING {COLS_NO_EMBED}
+'''
+SQL_SELECT_ENTRY = f'SELECT {COLS_NO_EMBED} FROM memory_entries WHERE id = ?'
+SQL_LOG_ACCESS = 'INSERT INTO memory_access_log (memory_id, access_type) VALUES (?, ?)'
+SQL_LOG_READ = "INSERT INTO memory_access_log (memory_id, access_type, accessed_at) VALUES (?, 'read', ?)"
+SQL_TOUCH_ENTRIES = '''
+    UPDATE memory_entries
+    SET last_accessed = ?, access_count = access_count + ?
+    WHERE id = ?
+'''
+SQL_LOG_SEARCH = 'INSERT INTO memory_access_log (memory_id, access_type, query) VALUES (?, ?, ?)'
+SQL_STORE_EMBEDDING = '''
+    UPDATE memory_entries
+    SET embedding = ?, embedding_model = ?, embedding_normalized = ?, embedding_q8 = ?,
+        embedding_dtype = ?, updated_at = CURRENT_TIMESTAMP
+    WHERE id = ?
+'''
+
+# Per-thread (db path, connection), see get_connection()
+_local = threading.local()
+
+# Database paths whose schema this process has already created / migrated
+_schema_ready = set()
+# ... and of those, the ones with the memory_fts full-text index (needs FTS5 with trigram)
+_fts_ready = set()
+# ... and the ones with the memory_vec vector index (needs sqlite-vec)
+_vec_ready = set()
+_schema_lock = threading.Lock()
+
+# Per database path: (embedding fingerprint, active embedded entries at that fingerprint)
+_embedded_counts: Dict[Path, Tuple[str, int]] = {}
+
+# get_entry() reads waiting to be written, per database path: [(entry id, access time)].
+# Flushed every ACCESS_FLUSH_EVERY reads, before stats / hard deletes, and at exit
+ACCESS_FLUSH_EVERY = 64
+_access_buffer: Dict[Path, List[Tuple[int, str]]] = {}
+_access_lock = threading.Lock()
+
+
+class _ThreadConnection(sqlite3.Connection):
+    """A connection shared by every caller on one thread; close() only ends this caller's use."""
+
+    # Whether the sqlite-vec extension is loaded on this connection
+    vec_loaded = False
+
+    def close(self):
+        # Discard uncommitted changes, as closing a private connection would,
+        # unless they belong to an enclosing bulk() block
+        if self.in_transaction and not _in_bulk():
+            self.rollback()
+
 
 def get_connection():
-    """Get database connection, creating tables if needed."""
+    """
+    Get this thread's database connection.
+
+    The connection is opened (and tables created) on first use per thread and
+    reused afterwards; callers may still close() it when done.
+    """
+    cached = getattr(_local, 'conn', None)
+    if cached is not None and cached[0] == DB_PATH:
+        return cached[1]
+    if cached is not None:
+        # DB_PATH changed since this thread connected
+        close_connection()
+
+    conn = _open_connection()
+    _local.conn = (DB_PATH, conn)
+    return conn
+
+
+def close_connection():
+    """Really close this thread's cached connection, if any."""
+    cached = getattr(_local, 'conn', None)
+    if cached is not None:
+        _local.conn = None
+        try:
+            # Let SQLite refresh query-planner statistics the session showed were stale
+            cached[1].execute('PRAGMA optimize')
+        except sqlite3.Error:
+            pass
+        sqlite3.Connection.close(cached[1])
+
+
+atexit.register(close_connection)
+
+
+def _in_bulk() -> bool:
+    """Whether this thread is inside a bulk() block."""
+    return getattr(_local, 'bulk_depth', 0) > 0
+
+
+def _commit(conn: sqlite3.Connection) -> None:
+    """Commit, unless an enclosing bulk() block will commit everything at once."""
+    if not _in_bulk():
+        conn.commit()
+
+
+@contextlib.contextmanager
+def bulk():
+    """
+    Run every write on this thread inside the block as a single transaction.
+
+    add_entry(), update_entry(), store_embedding() and the other writers skip
+    their own commits; the block commits once on exit, or rolls everything
+    back if it raises. Nested blocks join the outermost one.
+    """
+    conn = get_connection()
+    if _in_bulk():
+        _local.bulk_depth += 1
+        try:
+            yield conn
+        finally:
+            _local.bulk_depth -= 1
+        return
+
+    if conn.in_transaction:
+        conn.commit()
+    conn.execute('BEGIN IMMEDIATE')
+    _local.bulk_depth = 1
+    try:
+        yield conn
+    except BaseException:
+        _local.bulk_depth = 0
+        conn.rollback()
+        raise
+    _local.bulk_depth = 0
+    conn.commit()
+
+
+def _open_connection() -> sqlite3.Connection:
+    """Open a new connection, creating tables on the first one per process."""
     DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(str(DB_PATH))
+    conn = sqlite3.connect(str(DB_PATH), factory=_ThreadConnection, cached_statements=CACHED_STATEMENTS)
     conn.row_factory = sqlite3.Row
 
+    # Only takes effect on a new, empty database, so it must precede anything that writes
+    conn.execute(f'PRAGMA page_size={PAGE_SIZE}')
+
+    # WAL lets readers run alongside the writer; NORMAL skips the per-commit fsync
+    conn.execute(f'PRAGMA busy_timeout={BUSY_TIMEOUT_MS}')
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute(f'PRAGMA journal_size_limit={JOURNAL_SIZE_LIMIT}')
+    # Read pages straight from the OS page cache, keep a larger private cache
+    # and keep temporary tables / sort spills in memory
+    conn.execute(f'PRAGMA mmap_size={MMAP_SIZE}')
+    conn.execute(f'PRAGMA cache_size=-{CACHE_SIZE_KIB}')
+    conn.execute('PRAGMA temp_store=MEMORY')
+
+    if HAS_SQLITE_VEC:
+        try:
+            conn.enable_load_extension(True)
+            sqlite_vec.load(conn)
+            conn.enable_load_extension(False)
+            conn.vec_loaded = True
+        except (AttributeError, sqlite3.Error):
+            # Python built without extension loading, or the extension failed to load
+            pass
+
+    with _schema_lock:
+        if DB_PATH not in _schema_ready:
+            _init_schema(conn)
+            _schema_ready.add(DB_PATH)
+    return conn
+
+
+def _init_schema(conn: sqlite3.Connection) -> None:
+    """Create tables and indexes, and add any missing columns."""
     cursor = conn.cursor()
 
     # Main memory entries table
@@ -70,6 +335,9 @@ def get_connection():
             access_count INTEGER DEFAULT 0,
             embedding BLOB,
             embedding_model TEXT,
+            embedding_normalized INTEGER DEFAULT 0,
+            embedding_q8 BLOB,
+            embedding_dtype TEXT DEFAULT 'float32',
             tags TEXT,
             context TEXT,
             expires_at DATETIME,
@@ -77,6 +345,12 @@ def get_connection():
         )
     ''')
 
+    # Add columns introduced after a database was first created
+    existing_columns = {row['name'] for row in cursor.execute('PRAGMA table_info(memory_entries)')}
+    for column, definition in ADDED_COLUMNS:
+        if column not in existing_columns:
+            cursor.execute(f'ALTER TABLE memory_entries ADD COLUMN {column} {definition}')
+
     # Daily logs table (syncs with memory/logs/*.md files)
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS daily_logs (
@@ -104,33 +378,343 @@ def get_connection():
         )
     ''')
 
+    # Embeddings keyed by hash of (model, text) so identical text is only embedded once
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS embedding_cache (
+            hash TEXT PRIMARY KEY,
+            model TEXT NOT NULL,
+            embedding BLOB NOT NULL,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            last_used DATETIME
+        )
+    ''')
+    if 'last_used' not in {row['name'] for row in cursor.execute('PRAGMA table_info(embedding_cache)')}:
+        cursor.execute('ALTER TABLE embedding_cache ADD COLUMN last_used DATETIME')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_embedding_cache_lru ON embedding_cache(last_used)')
+
+    # Rehash rows written under an older content_hash scheme so duplicates of them are
+    # still caught (OR IGNORE: rows that were never deduplicated keep their old hash)
+    if cursor.execute('PRAGMA user_version').fetchone()[0] < SCHEMA_VERSION:
+        rows = cursor.execute('SELECT id, content FROM memory_entries').fetchall()
+        cursor.executemany('UPDATE OR IGNORE memory_entries SET content_hash = ? WHERE id = ?',
+                           [(compute_content_hash(row['content']), row['id']) for row in rows])
+        cursor.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+    # Superseded duplicate-lookup table: add_entry()'s insert detects duplicates itself
+    # and the UNIQUE content_hash index finds the entry they collided with
+    cursor.execute('DROP TABLE IF EXISTS content_dedup')
+
+    # Tags one row per (tag, entry), so a tag filter is an index seek rather than a
+    # LIKE scan over the JSON tags column (which stays as the source of truth)
+    tags_exist = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'memory_tags'"
+    ).fetchone()
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS memory_tags (
+            tag TEXT NOT NULL,
+            memory_id INTEGER NOT NULL,
+            PRIMARY KEY (tag, memory_id)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_memory_tags_entry ON memory_tags(memory_id)')
+    if not tags_exist:
+        rows = cursor.execute('SELECT id, tags FROM memory_entries WHERE tags IS NOT NULL').fetchall()
+        cursor.executemany(SQL_ADD_TAG, [(tag, row['id']) for row in rows for tag in _parse_tags(row['tags'])])
+
     # Indexes for performance
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_memory_type ON memory_entries(type)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_memory_source ON memory_entries(source)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_memory_created ON memory_entries(created_at)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_memory_active ON memory_entries(is_active)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_memory_importance ON memory_entries(importance)')
+    # Composite indexes in list_entries() order, so LIMITed listings stream from the index
+    # instead of sorting every match. expires_at rides along so every list_entries() filter
+    # is answered from the index: the COUNT is index-only, and table rows (whose expires_at
+    # sits behind the embedding BLOBs) are read only for the page actually returned.
+    # These supersede idx_active_type and the idx_memory_list* indexes without expires_at
+    for index in ('idx_active_type', 'idx_memory_list', 'idx_memory_list_type', 'idx_memory_list_source'):
+        cursor.execute(f'DROP INDEX IF EXISTS {index}')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_list_covering
+        ON memory_entries(is_active, importance DESC, created_at DESC, expires_at)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_list_covering_type
+        ON memory_entries(is_active, type, importance DESC, created_at DESC, expires_at)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_list_covering_source
+        ON memory_entries(is_active, source, importance DESC, created_at DESC, expires_at)
+    ''')
+    # get_recent(): active entries by creation time, as a range scan already in output order
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_memory_recent ON memory_entries(is_active, created_at)')
+    # Entries still waiting for an embedding (get_entries_without_embeddings)
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_memory_no_embed ON memory_entries(is_active, importance DESC, created_at DESC)
+        WHERE embedding IS NULL
+    ''')
+    # Entries with embeddings (count_embedded()), counted from the index alone
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_memory_embedded ON memory_entries(is_active, type)
+        WHERE embedding IS NOT NULL
+    ''')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_daily_logs_date ON daily_logs(date)')
 
+    _init_embedding_version(cursor)
+    if _init_fts(cursor):
+        _fts_ready.add(DB_PATH)
+    if getattr(conn, 'vec_loaded', False) and _init_vec(cursor):
+        _vec_ready.add(DB_PATH)
+
     conn.commit()
-    return conn
+
+
+def _init_embedding_version(cursor: sqlite3.Cursor) -> None:
+    """
+    Create the counter behind get_embedding_fingerprint().
+
+    Triggers bump it whenever a row with an embedding is added, removed,
+    re-embedded, (de)activated or retyped; the random token tells apart
+    databases whose counters happen to match.
+    """
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS embedding_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            token TEXT NOT NULL,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    cursor.execute("INSERT OR IGNORE INTO embedding_version (id, token) VALUES (1, lower(hex(randomblob(8))))")
+    bump = 'UPDATE embedding_version SET version = version + 1 WHERE id = 1;'
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS embedding_version_insert AFTER INSERT ON memory_entries
+        WHEN new.embedding IS NOT NULL BEGIN {bump} END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS embedding_version_delete AFTER DELETE ON memory_entries
+        WHEN old.embedding IS NOT NULL BEGIN {bump} END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS embedding_version_update
+        AFTER UPDATE OF embedding, embedding_dtype, is_active, type ON memory_entries
+        WHEN old.embedding IS NOT NULL OR new.embedding IS NOT NULL BEGIN {bump} END
+    ''')
+
+
+def _init_fts(cursor: sqlite3.Cursor) -> bool:
+    """
+    Create the full-text index used by search_entries().
+
+    An external-content FTS5 table over (content, tags, context) with the
+    trigram tokenizer, so MATCH keeps LIKE '%q%' substring semantics.
+    Triggers keep it in sync. Returns False if this SQLite lacks FTS5/trigram.
+    """
+    exists = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'memory_fts'"
+    ).fetchone()
+    try:
+        cursor.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS memory_fts USING fts5(
+                content, tags, context,
+                content='memory_entries', content_rowid='id', tokenize='trigram'
+            )
+        ''')
+    except sqlite3.OperationalError:
+        return False
+
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS memory_fts_insert AFTER INSERT ON memory_entries BEGIN
+            INSERT INTO memory_fts(rowid, content, tags, context)
+            VALUES (new.id, new.content, new.tags, new.context);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS memory_fts_delete AFTER DELETE ON memory_entries BEGIN
+            INSERT INTO memory_fts(memory_fts, rowid, content, tags, context)
+            VALUES ('delete', old.id, old.content, old.tags, old.context);
+        END
+    ''')
+    # Only text changes touch the index (not access counts or embeddings)
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS memory_fts_update AFTER UPDATE OF content, tags, context ON memory_entries BEGIN
+            INSERT INTO memory_fts(memory_fts, rowid, content, tags, context)
+            VALUES ('delete', old.id, old.content, old.tags, old.context);
+            INSERT INTO memory_fts(rowid, content, tags, context)
+            VALUES (new.id, new.content, new.tags, new.context);
+        END
+    ''')
+
+    if not exists:
+        # Index the rows written before the table existed
+        cursor.execute("INSERT INTO memory_fts(memory_fts) VALUES ('rebuild')")
+    return True
+
+
+def _pack(text: Optional[str]) -> Optional[Union[str, bytes]]:
+    """Value to store for a large text column: LZ4-compressed when lz4 is installed."""
+    if text is None or not HAS_LZ4:
+        return text
+    data = text.encode('utf-8')
+    if len(data) < COMPRESS_MIN_BYTES:
+        return text
+    return LZ4_MAGIC + lz4.frame.compress(data)
+
+
+def _unpack(value: Optional[Union[str, bytes]]) -> Optional[str]:
+    """Inverse of _pack(); plain (legacy or small) values pass through."""
+    if not isinstance(value, bytes) or not value.startswith(LZ4_MAGIC):
+        return value
+    if not HAS_LZ4:
+        raise RuntimeError("lz4 package not installed; needed to read compressed log text")
+    return lz4.frame.decompress(value[len(LZ4_MAGIC):]).decode('utf-8')
+
+
+def _init_vec(cursor: sqlite3.Cursor) -> bool:
+    """
+    Create the memory_vec index used by vector_search().
+
+    A sqlite-vec vec0 table keyed by entry id, cosine distance. Existing
+    embeddings are copied in when the table is first created. A trigger
+    queues every embedding change in vec_pending, so rows written by a
+    process without sqlite-vec are indexed by the next vector_search().
+    """
+    exists = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'memory_vec'"
+    ).fetchone()
+    pending_exists = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'vec_pending'"
+    ).fetchone()
+    try:
+        cursor.execute(f'''
+            CREATE VIRTUAL TABLE IF NOT EXISTS memory_vec USING vec0(
+                embedding float[{VEC_DIMENSIONS}] distance_metric=cosine
+            )
+        ''')
+    except sqlite3.OperationalError:
+        return False
+
+    cursor.execute('CREATE TABLE IF NOT EXISTS vec_pending (id INTEGER PRIMARY KEY)')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS memory_vec_pending AFTER UPDATE OF embedding ON memory_entries BEGIN
+            INSERT OR IGNORE INTO vec_pending (id) VALUES (new.id);
+        END
+    ''')
+
+    if not exists or not pending_exists:
+        # New index, or one built before vec_pending existed (and so possibly
+        # missing rows): fill it from every stored embedding
+        cursor.execute('DELETE FROM memory_vec')
+        cursor.execute('DELETE FROM vec_pending')
+        rows = cursor.execute(
+            'SELECT id, embedding, embedding_dtype FROM memory_entries WHERE embedding IS NOT NULL'
+        ).fetchall()
+        cursor.executemany('INSERT INTO memory_vec (rowid, embedding) VALUES (?, ?)', [
+            (row[0], blob) for row in rows if (blob := _vec_blob(row[1], row[2])) is not None
+        ])
+    return True
+
+
+def _has_vec(conn: sqlite3.Connection) -> bool:
+    return getattr(conn, 'vec_loaded', False) and DB_PATH in _vec_ready
+
+
+def _vec_blob(embedding: Optional[bytes], dtype: Optional[str]) -> Optional[bytes]:
+    """
+    float32 bytes memory_vec holds for a stored embedding, or None if it cannot be indexed.
+
+    float16 rows are widened and int8-only rows dequantized to the float32
+    the index holds; other dimensionalities are not indexed.
+    """
+    if embedding is None:
+        return None
+    if dtype == 'float16':
+        if len(embedding) != _VEC_STRUCT_F16.size:
+            return None
+        return _VEC_STRUCT.pack(*_VEC_STRUCT_F16.unpack(embedding))
+    if dtype == 'int8':
+        if len(embedding) != _VEC_STRUCT_Q8.size:
+            return None
+        scale, *values = _VEC_STRUCT_Q8.unpack(embedding)
+        return _VEC_STRUCT.pack(*(value * scale / 127 for value in values))
+    if len(embedding) != _VEC_STRUCT.size:
+        return None
+    return embedding
+
+
+def _index_vectors(cursor: sqlite3.Cursor, pairs: List[Tuple[int, bytes]], dtype: str = 'float32') -> None:
+    """Mirror (entry id, embedding bytes) stored as `dtype` into memory_vec, clearing them from vec_pending."""
+    ids = [(entry_id,) for entry_id, _ in pairs]
+    # vec0 tables have no upsert
+    cursor.executemany('DELETE FROM memory_vec WHERE rowid = ?', ids)
+    cursor.executemany('INSERT INTO memory_vec (rowid, embedding) VALUES (?, ?)', [
+        (entry_id, blob) for entry_id, embedding in pairs if (blob := _vec_blob(embedding, dtype)) is not None
+    ])
+    cursor.executemany('DELETE FROM vec_pending WHERE id = ?', ids)
+
+
+def _sync_vec(conn: sqlite3.Connection) -> None:
+    """Index the embeddings queued in vec_pending (changed by a process without sqlite-vec)."""
+    cursor = conn.cursor()
+    rows = cursor.execute('''
+        SELECT p.id, m.embedding, m.embedding_dtype FROM vec_pending p
+        LEFT JOIN memory_entries m ON m.id = p.id
+    ''').fetchall()
+    # Grouped by layout; rows whose embedding was cleared or deleted are only unindexed
+    by_dtype: Dict[Optional[str], List[Tuple[int, Optional[bytes]]]] = {}
+    for entry_id, embedding, dtype in rows:
+        by_dtype.setdefault(dtype, []).append((entry_id, embedding))
+    for dtype, pairs in by_dtype.items():
+        _index_vectors(cursor, pairs, dtype)
+    _commit(conn)
 
 
 def row_to_dict(row) -> Optional[Dict]:
-    """Convert sqlite3.Row to dictionary."""
+    """Convert sqlite3.Row to dictionary, with tags decoded to a list."""
     if row is None:
         return None
     d = dict(row)
-    # Don't include raw embedding blob in output
-    if 'embedding' in d and d['embedding']:
-        d['has_embedding'] = True
-        del d['embedding']
+    if 'raw_log' in d:
+        d['raw_log'] = _unpack(d['raw_log'])
+    if d.get('tags'):
+        d['tags'] = _parse_tags(d['tags'])
     return d
 
 
+def _fetch_dicts(cursor: sqlite3.Cursor) -> List[Dict]:
+    """
+    Remaining rows of a cursor as dicts keyed by column name, tags decoded to lists.
+
+    Set cursor.row_factory = None before executing so rows arrive as plain
+    tuples and are zipped once, instead of going through sqlite3.Row.
+    """
+    columns = [column[0] for column in cursor.description]
+    rows = cursor.fetchall()
+    if 'tags' not in columns:
+        return [dict(zip(columns, row)) for row in rows]
+    i = columns.index('tags')
+    return [dict(zip(columns, row), tags=_parse_tags(row[i]) if row[i] else None) for row in rows]
+
+
 def compute_content_hash(content: str) -> str:
-    """Compute hash of content for deduplication."""
-    return hashlib.sha256(content.strip().lower().encode()).hexdigest()[:16]
+    """
+    Compute hash of content for deduplication.
+
+    A 64-bit BLAKE2b digest (16 hex chars): only a dedup key, so no need
+    for SHA-256, and BLAKE2b is faster on large bodies.
+    """
+    return hashlib.blake2b(content.strip().lower().encode(), digest_size=8).hexdigest()
+
+
+def _parse_tags(tags: Any) -> List[str]:
+    """Tags as a list of strings, from a list, its JSON encoding or a comma-separated string."""
+    if isinstance(tags, str):
+        try:
+            tags = orjson.loads(tags) if HAS_ORJSON else json.loads(tags)
+        except ValueError:
+            tags = tags.split(',')
+    if not isinstance(tags, list):
+        return []
+    return [str(tag).strip() for tag in tags if str(tag).strip()]
 
 
 def add_entry(
@@ -170,76 +754,127 @@ def add_entry(
     conn = get_connection()
     cursor = conn.cursor()
 
-    # Check for duplicate
-    cursor.execute('SELECT id, content FROM memory_entries WHERE content_hash = ?', (content_hash,))
-    existing = cursor.fetchone()
-    if existing:
-        conn.close()
+    tags_json = json.dumps(tags) if tags else None
+
+    cursor.execute(SQL_INSERT_ENTRY, (entry_type, content, content_hash, source, confidence, importance, tags_json, context, expires_at))
+    entry = row_to_dict(cursor.fetchone())
+
+    if entry is None:
+        # content_hash conflict: nothing was inserted, look up the entry that holds it
+        _commit(conn)
+        cursor.execute(SQL_FIND_BY_HASH, (content_hash,))
+        existing = cursor.fetchone()
         return {
             "success": False,
             "error": "Duplicate content already exists",
-            "existing_id": existing['id'],
-            "existing_content": existing['content']
+            "existing_id": existing['id'] if existing else None,
+            "existing_content": existing['content'] if existing else None
         }
 
-    tags_json = json.dumps(tags) if tags else None
-
-    cursor.execute('''
-        INSERT INTO memory_entries
-        (type, content, content_hash, source, confidence, importance, tags, context, expires_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (entry_type, content, content_hash, source, confidence, importance, tags_json, context, expires_at))
-
-    entry_id = cursor.lastrowid
-    conn.commit()
-
-    # Fetch the created entry
-    cursor.execute('SELECT * FROM memory_entries WHERE id = ?', (entry_id,))
-    entry = row_to_dict(cursor.fetchone())
-
-    conn.close()
+    entry_id = entry['id']
+    cursor.executemany(SQL_ADD_TAG, [(tag, entry_id) for tag in _parse_tags(tags)])
+    _commit(conn)
 
     return {"success": True, "entry": entry, "message": f"Memory entry created with ID {entry_id}"}
 
 
 def get_entry(entry_id: int) -> Dict[str, Any]:
-    """Get a single memory entry by ID and record access."""
+    """Get a single memory entry by ID and record access (buffered, see flush_access_log())."""
     conn = get_connection()
     cursor = conn.cursor()
 
-    cursor.execute('SELECT * FROM memory_entries WHERE id = ?', (entry_id,))
+    cursor.execute(SQL_SELECT_ENTRY, (entry_id,))
     entry = row_to_dict(cursor.fetchone())
 
     if not entry:
-        conn.close()
         return {"success": False, "error": f"Memory entry {entry_id} not found"}
 
-    # Update access tracking
-    cursor.execute('''
-        UPDATE memory_entries
-        SET last_accessed = CURRENT_TIMESTAMP, access_count = access_count + 1
-        WHERE id = ?
-    ''', (entry_id,))
-
-    # Log access
-    cursor.execute(
-        'INSERT INTO memory_access_log (memory_id, access_type) VALUES (?, ?)',
-        (entry_id, 'read')
-    )
-
-    conn.commit()
-    conn.close()
+    # Same format as CURRENT_TIMESTAMP, taken now rather than at flush time
+    accessed_at = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+    with _access_lock:
+        pending = _access_buffer.setdefault(DB_PATH, [])
+        pending.append((entry_id, accessed_at))
+        full = len(pending) >= ACCESS_FLUSH_EVERY
+    if full:
+        flush_access_log()
 
     return {"success": True, "entry": entry}
 
 
+def flush_access_log() -> int:
+    """
+    Write buffered get_entry() reads: one log row each, and one access_count /
+    last_accessed update per entry, in a single transaction per database.
+
+    Returns:
+        Number of reads written
+    """
+    with _access_lock:
+        pending = dict(_access_buffer)
+        _access_buffer.clear()
+
+    written = 0
+    for path, reads in pending.items():
+        touches: Dict[int, List] = {}
+        for entry_id, accessed_at in reads:
+            touch = touches.setdefault(entry_id, [accessed_at, 0])
+            touch[0] = max(touch[0], accessed_at)
+            touch[1] += 1
+
+        # Reads made before DB_PATH changed go to their own database
+        conn = get_connection() if path == DB_PATH else sqlite3.connect(str(path), timeout=BUSY_TIMEOUT_MS / 1000)
+        try:
+            conn.executemany(SQL_LOG_READ, reads)
+            conn.executemany(SQL_TOUCH_ENTRIES, [(last, count, entry_id) for entry_id, (last, count) in touches.items()])
+            if path == DB_PATH:
+                _commit(conn)
+            else:
+                conn.commit()
+        finally:
+            if path != DB_PATH:
+                conn.close()
+        written += len(reads)
+    return written
+
+
+atexit.register(flush_access_log)
+
+
+@functools.lru_cache(maxsize=None)
+def _list_queries(has_type: bool, has_source: bool, has_tag: bool, active_only: bool) -> Tuple[str, str]:
+    """(SELECT, COUNT) statements for one combination of list_entries() filters."""
+    conditions = []
+    if has_type:
+        conditions.append('type = ?')
+    if has_source:
+        conditions.append('source = ?')
+    if has_tag:
+        conditions.append('id IN (SELECT memory_id FROM memory_tags WHERE tag = ?)')
+    if active_only:
+        conditions.append('is_active = 1')
+        conditions.append('(expires_at IS NULL OR expires_at > datetime("now"))')
+    conditions.append('importance >= ?')
+    where_clause = ' AND '.join(conditions)
+
+    return (
+        f'''
+        SELECT {COLS_NO_EMBED} FROM memory_entries
+        WHERE {where_clause}
+        ORDER BY importance DESC, created_at DESC
+        LIMIT ? OFFSET ?
+        ''',
+        f'SELECT COUNT(*) as count FROM memory_entries WHERE {where_clause}'
+    )
+
+
 def list_entries(
     entry_type: Optional[str] = None,
     source: Optional[str] = None,
     active_only: bool = True,
     limit: int = 100,
     offset: int = 0,
-    min_importance: int = 1
+    min_importance: int = 1,
+    tag: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     List memory entries with optional filters.
@@ -247,6 +882,7 @@ def list_entries(
     Args:
         entry_type: Filter by type
         source: Filter by source
+        tag: Only entries carrying this exact tag
         active_only: Only show active entries
         limit: Max results
         offset: Pagination offset
@@ -255,49 +891,25 @@ def list_entries(
     Returns:
         dict with entries array
     """
+    if entry_type and entry_type not in VALID_TYPES:
+        return {"success": False, "error": f"Invalid type. Must be one of: {VALID_TYPES}"}
+    if source and source not in VALID_SOURCES:
+        return {"success": False, "error": f"Invalid source. Must be one of: {VALID_SOURCES}"}
+
     conn = get_connection()
     cursor = conn.cursor()
+    cursor.row_factory = None
 
-    conditions = []
-    params = []
-
-    if entry_type:
-        if entry_type not in VALID_TYPES:
-            conn.close()
-            return {"success": False, "error": f"Invalid type. Must be one of: {VALID_TYPES}"}
-        conditions.append('type = ?')
-        params.append(entry_type)
-
-    if source:
-        if source not in VALID_SOURCES:
-            conn.close()
-            return {"success": False, "error": f"Invalid source. Must be one of: {VALID_SOURCES}"}
-        conditions.append('source = ?')
-        params.append(source)
-
-    if active_only:
-        conditions.append('is_active = 1')
-        conditions.append('(expires_at IS NULL OR expires_at > datetime("now"))')
-
-    conditions.append('importance >= ?')
-    params.append(min_importance)
+    select_sql, count_sql = _list_queries(bool(entry_type), bool(source), bool(tag), active_only)
+    params = [p for p in (entry_type, source, tag) if p] + [min_importance]
 
-    where_clause = ' AND '.join(conditions) if conditions else '1=1'
-
-    cursor.execute(f'''
-        SELECT * FROM memory_entries
-        WHERE {where_clause}
-        ORDER BY importance DESC, created_at DESC
-        LIMIT ? OFFSET ?
-    ''', params + [limit, offset])
+    cursor.execute(select_sql, params + [limit, offset])
 
-    entries = [row_to_dict(row) for row in cursor.fetchall()]
+    entries = _fetch_dicts(cursor)
 
     # Get total count
-    cursor.execute(f'SELECT COUNT(*) as count FROM memory_entries WHERE {where_clause}', params)
-    total = cursor.fetchone()['count']
-
-    conn.close()
+    cursor.execute(count_sql, params)
+    total = cursor.fetchone()[0]
 
     return {"success": True, "entries": entries, "total": total, "limit": limit, "offset": offset}
 
@@ -321,13 +933,25 @@ def search_entries(
     """
     conn = get_connection()
     cursor = conn.cursor()
-
-    # Simple LIKE search (for basic text matching)
-    search_pattern = f'%{query}%'
-
-    if entry_type:
-        cursor.execute('''
-            SELECT * FROM memory_entries
+    cursor.row_factory = None
+
+    if DB_PATH in _fts_ready and len(query) >= 3:
+        # Substring match through the trigram index, as one quoted FTS5 phrase
+        phrase = '"' + query.replace('"', '""') + '"'
+        type_filter = 'AND type = ?' if entry_type else ''
+        cursor.execute(f'''
+            SELECT {COLS_NO_EMBED} FROM memory_entries
+            WHERE id IN (SELECT rowid FROM memory_fts WHERE memory_fts MATCH ?)
+            AND is_active = 1
+            {type_filter}
+            ORDER BY importance DESC, created_at DESC
+            LIMIT ?
+        ''', [phrase] + ([entry_type] if entry_type else []) + [limit])
+    elif entry_type:
+        # Simple LIKE search (queries too short for trigrams, or no FTS5)
+        search_pattern = f'%{query}%'
+        cursor.execute(f'''
+            SELECT {COLS_NO_EMBED} FROM memory_entries
             WHERE is_active = 1
             AND type = ?
             AND (content LIKE ? OR tags LIKE ? OR context LIKE ?)
@@ -335,29 +959,31 @@ def search_entries(
             LIMIT ?
         ''', (entry_type, search_pattern, search_pattern, search_pattern, limit))
     else:
-        cursor.execute('''
-            SELECT * FROM memory_entries
+        search_pattern = f'%{query}%'
+        cursor.execute(f'''
+            SELECT {COLS_NO_EMBED} FROM memory_entries
             WHERE is_active = 1
             AND (content LIKE ? OR tags LIKE ? OR context LIKE ?)
             ORDER BY importance DESC, created_at DESC
             LIMIT ?
         ''', (search_pattern, search_pattern, search_pattern, limit))
 
-    entries = [row_to_dict(row) for row in cursor.fetchall()]
+    entries = _fetch_dicts(cursor)
 
-    # Log search
-    for entry in entries:
-        cursor.execute(
-            'INSERT INTO memory_access_log (memory_id, access_type, query) VALUES (?, ?, ?)',
-            (entry['id'], 'search', query)
-        )
-
-    conn.commit()
-    conn.close()
+    # Log search: one statement and one transaction for all hits
+    cursor.executemany(SQL_LOG_SEARCH, [(entry['id'], 'search', query) for entry in entries])
+    _commit(conn)
 
     return {"success": True, "entries": entries, "query": query, "count": len(entries)}
 
 
+@functools.lru_cache(maxsize=64)
+def _update_query(fields: Tuple[str, ...]) -> str:
+    """UPDATE statement for one ordered combination of update_entry() fields."""
+    assignments = ['content_hash = ?, content = ?' if field == 'content' else f'{field} = ?' for field in fields]
+    return f'UPDATE memory_entries SET {", ".join(assignments)}, updated_at = CURRENT_TIMESTAMP WHERE id = ?'
+
+
 def update_entry(entry_id: int, **kwargs) -> Dict[str, Any]:
     """
     Update a memory entry.
@@ -369,59 +995,46 @@ def update_entry(entry_id: int, **kwargs) -> Dict[str, Any]:
     Returns:
         dict with updated entry
     """
-    allowed_fields = ['content', 'type', 'source', 'confidence', 'importance', 'tags', 'context', 'expires_at', 'is_active']
-
     conn = get_connection()
     cursor = conn.cursor()
 
-    cursor.execute('SELECT * FROM memory_entries WHERE id = ?', (entry_id,))
+    cursor.execute(SQL_ENTRY_EXISTS, (entry_id,))
     if not cursor.fetchone():
-        conn.close()
         return {"success": False, "error": f"Memory entry {entry_id} not found"}
 
-    updates = []
-    values = []
-
-    for field, value in kwargs.items():
-        if field in allowed_fields:
-            if field == 'type' and value not in VALID_TYPES:
-                conn.close()
-                return {"success": False, "error": f"Invalid type. Must be one of: {VALID_TYPES}"}
-            if field == 'source' and value not in VALID_SOURCES:
-                conn.close()
-                return {"success": False, "error": f"Invalid source. Must be one of: {VALID_SOURCES}"}
-            if field == 'tags' and isinstance(value, list):
-                value = json.dumps(value)
-            if field == 'content':
-                # Update content hash too
-                updates.append('content_hash = ?')
-                values.append(compute_content_hash(value))
-            updates.append(f'{field} = ?')
-            values.append(value)
-
-    if not updates:
-        conn.close()
+    fields = tuple(field for field in kwargs if field in UPDATABLE_FIELDS)
+    if not fields:
         return {"success": False, "error": "No valid fields to update"}
 
-    updates.append('updated_at = CURRENT_TIMESTAMP')
+    values = []
+    for field in fields:
+        value = kwargs[field]
+        if field == 'type' and value not in VALID_TYPES:
+            return {"success": False, "error": f"Invalid type. Must be one of: {VALID_TYPES}"}
+        if field == 'source' and value not in VALID_SOURCES:
+            return {"success": False, "error": f"Invalid source. Must be one of: {VALID_SOURCES}"}
+        if field == 'tags' and isinstance(value, list):
+            value = json.dumps(value)
+        if field == 'content':
+            # Update content hash too
+            values.append(compute_content_hash(value))
+        values.append(value)
     values.append(entry_id)
 
-    cursor.execute(f'UPDATE memory_entries SET {", ".join(updates)} WHERE id = ?', values)
-    conn.commit()
+    cursor.execute(_update_query(fields), values)
+    if 'tags' in kwargs:
+        cursor.execute(SQL_DROP_TAGS, (entry_id,))
+        cursor.executemany(SQL_ADD_TAG, [(tag, entry_id) for tag in _parse_tags(kwargs['tags'])])
+    _commit(conn)
 
     # Log update
-    cursor.execute(
-        'INSERT INTO memory_access_log (memory_id, access_type) VALUES (?, ?)',
-        (entry_id, 'update')
-    )
-    conn.commit()
+    cursor.execute(SQL_LOG_ACCESS, (entry_id, 'update'))
+    _commit(conn)
 
     # Fetch updated entry
-    cursor.execute('SELECT * FROM memory_entries WHERE id = ?', (entry_id,))
+    cursor.execute(SQL_SELECT_ENTRY, (entry_id,))
     entry = row_to_dict(cursor.fetchone())
 
-    conn.close()
-
     return {"success": True, "entry": entry, "message": f"Memory entry {entry_id} updated"}
 
 
@@ -439,21 +1052,23 @@ def delete_entry(entry_id: int, soft_delete: bool = True) -> Dict[str, Any]:
     conn = get_connection()
     cursor = conn.cursor()
 
-    cursor.execute('SELECT * FROM memory_entries WHERE id = ?', (entry_id,))
+    cursor.execute(SQL_ENTRY_EXISTS, (entry_id,))
     if not cursor.fetchone():
-        conn.close()
         return {"success": False, "error": f"Memory entry {entry_id} not found"}
 
     if soft_delete:
         cursor.execute('UPDATE memory_entries SET is_active = 0, updated_at = CURRENT_TIMESTAMP WHERE id = ?', (entry_id,))
         message = f"Memory entry {entry_id} marked as inactive"
     else:
+        flush_access_log()
         cursor.execute('DELETE FROM memory_access_log WHERE memory_id = ?', (entry_id,))
         cursor.execute('DELETE FROM memory_entries WHERE id = ?', (entry_id,))
+        cursor.execute(SQL_DROP_TAGS, (entry_id,))
+        if _has_vec(conn):
+            cursor.execute('DELETE FROM memory_vec WHERE rowid = ?', (entry_id,))
         message = f"Memory entry {entry_id} permanently deleted"
 
-    conn.commit()
-    conn.close()
+    _commit(conn)
 
     return {"success": True, "message": message}
 
@@ -462,64 +1077,63 @@ def get_recent(hours: int = 24, entry_type: Optional[str] = None) -> Dict[str, A
     """Get memory entries from the last N hours."""
     conn = get_connection()
     cursor = conn.cursor()
+    cursor.row_factory = None
 
-    cutoff = datetime.now() - timedelta(hours=hours)
+    # Cutoff computed by SQLite in created_at's own format (UTC 'YYYY-MM-DD HH:MM:SS'),
+    # so the comparison is a range scan of idx_memory_recent
+    cutoff = f'-{hours} hours'
 
     if entry_type:
-        cursor.execute('''
-            SELECT * FROM memory_entries
-            WHERE is_active = 1 AND type = ? AND created_at >= ?
+        cursor.execute(f'''
+            SELECT {COLS_NO_EMBED} FROM memory_entries
+            WHERE is_active = 1 AND type = ? AND created_at >= datetime('now', ?)
             ORDER BY created_at DESC
-        ''', (entry_type, cutoff.isoformat()))
+        ''', (entry_type, cutoff))
     else:
-        cursor.execute('''
-            SELECT * FROM memory_entries
-            WHERE is_active = 1 AND created_at >= ?
+        cursor.execute(f'''
+            SELECT {COLS_NO_EMBED} FROM memory_entries
+            WHERE is_active = 1 AND created_at >= datetime('now', ?)
             ORDER BY created_at DESC
-        ''', (cutoff.isoformat(),))
-
-    entries = [row_to_dict(row) for row in cursor.fetchall()]
+        ''', (cutoff,))
 
-    conn.close()
+    entries = _fetch_dicts(cursor)
 
     return {"success": True, "entries": entries, "count": len(entries), "hours": hours}
 
 
 def get_stats() -> Dict[str, Any]:
     """Get memory statistics."""
+    flush_access_log()
     conn = get_connection()
     cursor = conn.cursor()
 
-    # Count by type
-    cursor.execute('''
-        SELECT type, COUNT(*) as count
-        FROM memory_entries
-        WHERE is_active = 1
-        GROUP BY type
-    ''')
-    by_type = {row['type']: row['count'] for row in cursor.fetchall()}
-
-    # Count by source
+    # Counts by type, source, active flag and embedding in a single scan,
+    # reduced into the individual totals below
+    by_type: Dict[str, int] = {}
+    by_source: Dict[str, int] = {}
+    total_active = total_inactive = with_embeddings = 0
     cursor.execute('''
-        SELECT source, COUNT(*) as count
+        SELECT type, source, is_active, embedding IS NOT NULL AS has_embedding, COUNT(*) as count
         FROM memory_entries
-        WHERE is_active = 1
-        GROUP BY source
+        GROUP BY type, source, is_active, has_embedding
     ''')
-    by_source = {row['source']: row['count'] for row in cursor.fetchall()}
-
-    # Total counts
-    cursor.execute('SELECT COUNT(*) as total FROM memory_entries WHERE is_active = 1')
-    total_active = cursor.fetchone()['total']
+    for row in cursor.fetchall():
+        count = row['count']
+        if row['is_active'] == 0:
+            total_inactive += count
+        elif row['is_active'] == 1:
+            total_active += count
+            by_type[row['type']] = by_type.get(row['type'], 0) + count
+            by_source[row['source']] = by_source.get(row['source'], 0) + count
+            if row['has_embedding']:
+                with_embeddings += count
 
-    cursor.execute('SELECT COUNT(*) as total FROM memory_entries WHERE is_active = 0')
-    total_inactive = cursor.fetchone()['total']
-
-    # Entries with embeddings
-    cursor.execute('SELECT COUNT(*) as count FROM memory_entries WHERE embedding IS NOT NULL AND is_active = 1')
-    with_embeddings = cursor.fetchone()['count']
+    # Daily log count
+    cursor.execute('SELECT COUNT(*) as count FROM daily_logs')
+    daily_log_count = cursor.fetchone()['count']
 
     # Most accessed
+    cursor.row_factory = None
     cursor.execute('''
         SELECT id, content, access_count
         FROM memory_entries
@@ -527,13 +1141,7 @@ def get_stats() -> Dict[str, Any]:
         ORDER BY access_count DESC
         LIMIT 5
     ''')
-    most_accessed = [row_to_dict(row) for row in cursor.fetchall()]
-
-    # Daily log count
-    cursor.execute('SELECT COUNT(*) as count FROM daily_logs')
-    daily_log_count = cursor.fetchone()['count']
-
-    conn.close()
+    most_accessed = _fetch_dicts(cursor)
 
     return {
         "success": True,
@@ -556,7 +1164,7 @@ def add_daily_log(date: str, summary: str, raw_log: str, key_events: Optional[Li
     Args:
         date: Date string (YYYY-MM-DD)
         summary: Summary of the day
-        raw_log: Full log content
+        raw_log: Full log content (LZ4-compressed in the database when large and lz4 is installed)
         key_events: List of key events
 
     Returns:
@@ -567,7 +1175,7 @@ def add_daily_log(date: str, summary: str, raw_log: str, key_events: Optional[Li
 
     key_events_json = json.dumps(key_events) if key_events else None
 
-    # Upsert
+    # Upsert, returning the stored row instead of reading it back
     cursor.execute('''
         INSERT INTO daily_logs (date, summary, raw_log, key_events, entry_count)
         VALUES (?, ?, ?, ?, ?)
@@ -577,14 +1185,11 @@ def add_daily_log(date: str, summary: str, raw_log: str, key_events: Optional[Li
             key_events = excluded.key_events,
             entry_count = entry_count + 1,
             updated_at = CURRENT_TIMESTAMP
-    ''', (date, summary, raw_log, key_events_json, 1))
-
-    conn.commit()
-
-    cursor.execute('SELECT * FROM daily_logs WHERE date = ?', (date,))
+        RETURNING *
+    ''', (date, summary, _pack(raw_log), key_events_json, 1))
     log = row_to_dict(cursor.fetchone())
 
-    conn.close()
+    _commit(conn)
 
     return {"success": True, "log": log, "message": f"Daily log for {date} saved"}
 
@@ -597,15 +1202,20 @@ def get_daily_log(date: str) -> Dict[str, Any]:
     cursor.execute('SELECT * FROM daily_logs WHERE date = ?', (date,))
     log = row_to_dict(cursor.fetchone())
 
-    conn.close()
-
     if not log:
         return {"success": False, "error": f"No daily log found for {date}"}
 
     return {"success": True, "log": log}
 
 
-def store_embedding(entry_id: int, embedding: bytes, model: str = 'text-embedding-3-small') -> Dict[str, Any]:
+def store_embedding(
+    entry_id: int,
+    embedding: bytes,
+    model: str = 'text-embedding-3-small',
+    normalized: bool = False,
+    embedding_q8: Optional[bytes] = None,
+    dtype: str = 'float32'
+) -> Dict[str, Any]:
     """
     Store an embedding for a memory entry.
     Called by embed_memory.py after generating embeddings.
@@ -614,6 +1224,9 @@ def store_embedding(entry_id: int, embedding: bytes, model: str = 'text-embeddin
         entry_id: Memory entry ID
         embedding: Embedding bytes
         model: Model used to generate embedding
+        normalized: Whether the embedding is L2-normalized
+        embedding_q8: Optional int8-quantized copy of the embedding
+        dtype: Layout of `embedding`: 'float32', 'float16', or 'int8' for a quantized-only row
 
     Returns:
         dict with success status
@@ -621,22 +1234,213 @@ def store_embedding(entry_id: int, embedding: bytes, model: str = 'text-embeddin
     conn = get_connection()
     cursor = conn.cursor()
 
-    cursor.execute('''
-        UPDATE memory_entries
-        SET embedding = ?, embedding_model = ?, updated_at = CURRENT_TIMESTAMP
-        WHERE id = ?
-    ''', (embedding, model, entry_id))
+    cursor.execute(SQL_STORE_EMBEDDING, (embedding, model, int(normalized), embedding_q8, dtype, entry_id))
+    if _has_vec(conn):
+        _index_vectors(cursor, [(entry_id, embedding)], dtype)
 
-    conn.commit()
-    conn.close()
+    _commit(conn)
 
     return {"success": True, "message": f"Embedding stored for entry {entry_id}"}
 
 
+def store_embeddings_bulk(
+    pairs: List[Tuple[int, bytes]],
+    model: str = 'text-embedding-3-small',
+    normalized: bool = False,
+    quantized: Optional[List[Optional[bytes]]] = None,
+    dtype: str = 'float32'
+) -> Dict[str, Any]:
+    """
+    Store embeddings for many entries in a single transaction.
+
+    Args:
+        pairs: List of (entry_id, embedding bytes)
+        model: Model used to generate the embeddings
+        normalized: Whether the embeddings are L2-normalized
+        quantized: Optional int8-quantized copies, parallel to pairs
+        dtype: Layout of the embedding bytes: 'float32', 'float16' or 'int8'
+
+    Returns:
+        dict with success status and number of rows stored
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    cursor.executemany(SQL_STORE_EMBEDDING, [
+        (embedding, model, int(normalized), q8, dtype, entry_id)
+        for (entry_id, embedding), q8 in zip(pairs, quantized or [None] * len(pairs))
+    ])
+    stored = cursor.rowcount
+    if _has_vec(conn):
+        _index_vectors(cursor, pairs, dtype)
+
+    _commit(conn)
+
+    return {"success": True, "stored": stored, "message": f"Stored {stored} embeddings"}
+
+
+def get_cached_embeddings(hashes: List[str], model: str = 'text-embedding-3-small') -> Dict[str, bytes]:
+    """
+    Look up cached embeddings by text hash, marking the hits as recently used.
+
+    Args:
+        hashes: Cache keys to look up
+        model: Model the embeddings must come from
+
+    Returns:
+        dict mapping each found hash to its embedding bytes
+    """
+    if not hashes:
+        return {}
+
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    found = {}
+    # Stay well under SQLite's bound-parameter limit
+    for start in range(0, len(hashes), 500):
+        chunk = hashes[start:start + 500]
+        placeholders = ','.join('?' * len(chunk))
+        cursor.execute(
+            f'SELECT hash, embedding FROM embedding_cache WHERE model = ? AND hash IN ({placeholders})',
+            [model] + chunk
+        )
+        found.update((row['hash'], row['embedding']) for row in cursor.fetchall())
+
+    if found:
+        cursor.executemany("UPDATE embedding_cache SET last_used = datetime('now') WHERE hash = ?",
+                           [(key,) for key in found])
+        _commit(conn)
+    return found
+
+
+def cache_embeddings(items: List[Tuple[str, bytes]], model: str = 'text-embedding-3-small') -> Dict[str, Any]:
+    """
+    Save embeddings to the cache in a single transaction.
+
+    Once the cache holds more than EMBEDDING_CACHE_MAX_ROWS, the least
+    recently used rows are evicted.
+
+    Args:
+        items: List of (hash, embedding bytes)
+        model: Model used to generate the embeddings
+
+    Returns:
+        dict with success status
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    cursor.executemany(
+        "INSERT OR REPLACE INTO embedding_cache (hash, model, embedding, last_used) VALUES (?, ?, ?, datetime('now'))",
+        [(key, model, embedding) for key, embedding in items]
+    )
+
+    excess = cursor.execute('SELECT count(*) FROM embedding_cache').fetchone()[0] - EMBEDDING_CACHE_MAX_ROWS
+    if excess > 0:
+        cursor.execute('''
+            DELETE FROM embedding_cache WHERE hash IN (
+                SELECT hash FROM embedding_cache ORDER BY last_used LIMIT ?
+            )
+        ''', (excess,))
+
+    _commit(conn)
+
+    return {"success": True, "message": f"Cached {len(items)} embeddings"}
+
+
+def get_embedding_fingerprint() -> Tuple[str, int]:
+    """
+    Fingerprint and count of the active entries that have embeddings.
+
+    The fingerprint is the embedding_version counter, a single-row read, so
+    caches built from the embeddings can check they are current without
+    scanning the table; the count is only recomputed when it changes.
+    """
+    conn = get_connection()
+    token, version = conn.execute('SELECT token, version FROM embedding_version WHERE id = 1').fetchone()
+    cached = _embedded_counts.get(DB_PATH)
+    if cached is None or cached[0] != f'{token}:{version}':
+        # Version and count from one statement, so both describe the same snapshot
+        token, version, count = conn.execute('''
+            SELECT token, version,
+                   (SELECT count(*) FROM memory_entries WHERE is_active = 1 AND embedding IS NOT NULL)
+            FROM embedding_version WHERE id = 1
+        ''').fetchone()
+        cached = _embedded_counts[DB_PATH] = (f'{token}:{version}', count)
+    return cached
+
+
+def count_embedded(entry_type: Optional[str] = None) -> int:
+    """Number of active entries with embeddings (of one type), read from idx_memory_embedded."""
+    conn = get_connection()
+    if entry_type:
+        return conn.execute(
+            'SELECT count(*) FROM memory_entries WHERE is_active = 1 AND type = ? AND embedding IS NOT NULL',
+            (entry_type,)
+        ).fetchone()[0]
+    return conn.execute(
+        'SELECT count(*) FROM memory_entries WHERE is_active = 1 AND embedding IS NOT NULL'
+    ).fetchone()[0]
+
+
+def vector_search(
+    query_embedding,
+    k: int,
+    entry_type: Optional[str] = None
+) -> Optional[List[Tuple[int, float]]]:
+    """
+    Nearest active entries to a query embedding, found inside SQLite by sqlite-vec.
+
+    Embeddings still queued in vec_pending are indexed first, so every
+    stored embedding (float32, float16 or int8) is searched.
+
+    Args:
+        query_embedding: float32 bytes or a sequence of floats
+        k: Number of neighbours
+        entry_type: Optional type filter
+
+    Returns:
+        List of (entry id, cosine similarity) best first, or None when the
+        memory_vec index is not available
+    """
+    conn = get_connection()
+    if not _has_vec(conn):
+        return None
+    if k <= 0:
+        return []
+
+    if not isinstance(query_embedding, bytes):
+        query_embedding = struct.pack(f'{len(query_embedding)}f', *query_embedding)
+    if len(query_embedding) != VEC_DIMENSIONS * 4:
+        return None
+    if conn.execute('SELECT 1 FROM vec_pending LIMIT 1').fetchone():
+        _sync_vec(conn)
+
+    # Inactive entries stay in memory_vec until hard-deleted, so ask for extra neighbours
+    # when filtering and cut back to k after the join
+    knn = k * 4 if entry_type else k * 2
+    type_filter = 'AND m.type = ?' if entry_type else ''
+    rows = conn.execute(f'''
+        WITH knn AS (
+            SELECT rowid, distance FROM memory_vec
+            WHERE embedding MATCH ? AND k = ?
+        )
+        SELECT knn.rowid AS id, knn.distance AS distance
+        FROM knn JOIN memory_entries m ON m.id = knn.rowid
+        WHERE m.is_active = 1 AND m.embedding IS NOT NULL {type_filter}
+        ORDER BY knn.distance
+        LIMIT ?
+    ''', [query_embedding, knn] + ([entry_type] if entry_type else []) + [k]).fetchall()
+
+    return [(row['id'], 1.0 - row['distance']) for row in rows]
+
+
 def get_entries_without_embeddings(limit: int = 50) -> Dict[str, Any]:
     """Get entries that don't have embeddings yet."""
     conn = get_connection()
     cursor = conn.cursor()
+    cursor.row_factory = None
 
     cursor.execute('''
         SELECT id, content, type
@@ -646,18 +1450,77 @@ def get_entries_without_embeddings(limit: int = 50) -> Dict[str, Any]:
         LIMIT ?
     ''', (limit,))
 
-    entries = [row_to_dict(row) for row in cursor.fetchall()]
-
-    conn.close()
+    entries = _fetch_dicts(cursor)
 
     return {"success": True, "entries": entries, "count": len(entries)}
 
 
+def vacuum_database() -> Dict[str, Any]:
+    """
+    Rebuild the database file, converting it to PAGE_SIZE pages.
+
+    The page size of a WAL database cannot change, so this leaves WAL for
+    the VACUUM and re-enables it afterwards. Needs exclusive access: run it
+    while nothing else has the database open.
+
+    Returns:
+        dict with the page size before and after
+    """
+    flush_access_log()
+    conn = get_connection()
+    before = conn.execute('PRAGMA page_size').fetchone()[0]
+
+    conn.execute('PRAGMA journal_mode=DELETE')
+    conn.execute(f'PRAGMA page_size={PAGE_SIZE}')
+    conn.execute('VACUUM')
+    conn.execute('PRAGMA journal_mode=WAL')
+    after = conn.execute('PRAGMA page_size').fetchone()[0]
+
+    return {
+        "success": True,
+        "page_size_before": before,
+        "page_size": after,
+        "message": f"Database rebuilt with {after}-byte pages"
+    }
+
+
+def replace_file(path: Path, write: Callable[[Any], Any]) -> None:
+    """
+    Write a file through write(fileobj) to a temporary name, then rename it over path.
+
+    Readers never see a partly written file, and ones that already have the
+    old file open or memory-mapped keep reading the old contents.
+    """
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp, 'wb') as f:
+            write(f)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def print_json(obj: Any) -> None:
+    """Print obj as indented JSON, encoded by orjson straight to stdout's buffer when installed."""
+    buffer = getattr(sys.stdout, 'buffer', None)
+    if not HAS_ORJSON or buffer is None:
+        print(json.dumps(obj, indent=2, default=str))
+        return
+    data = orjson.dumps(
+        obj, default=str,
+        option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE
+    )
+    # Text already printed is still in the TextIOWrapper's buffer
+    sys.stdout.flush()
+    buffer.write(data)
+    buffer.flush()
+
+
 def main():
     parser = argparse.ArgumentParser(description='Memory Database Manager')
     parser.add_argument('--action', required=True,
                        choices=['add', 'get', 'list', 'search', 'update', 'delete',
-                               'recent', 'stats', 'add-log', 'get-log', 'needs-embedding'],
+                               'recent', 'stats', 'add-log', 'get-log', 'needs-embedding', 'vacuum'],
                        help='Action to perform')
     parser.add_argument('--id', type=int, help='Entry ID')
     parser.add_argument('--content', help='Memory content')
@@ -666,6 +1529,7 @@ def main():
     parser.add_argument('--confidence', type=float, default=1.0, help='Confidence score 0-1')
     parser.add_argument('--importance', type=int, default=5, help='Importance level 1-10')
     parser.add_argument('--tags', help='Comma-separated tags')
+    parser.add_argument('--tag', help='Only list entries with this tag')
     parser.add_argument('--context', help='Context about when/why this was learned')
     parser.add_argument('--query', help='Search query')
     parser.add_argument('--hours', type=int, default=24, help='Hours for recent entries')
@@ -706,7 +1570,8 @@ def main():
             entry_type=args.type,
             source=args.source,
             limit=args.limit,
-            offset=args.offset
+            offset=args.offset,
+            tag=args.tag
         )
 
     elif args.action == 'search':
@@ -765,6 +1630,9 @@ def main():
     elif args.action == 'needs-embedding':
         result = get_entries_without_embeddings(limit=args.limit)
 
+    elif args.action == 'vacuum':
+        result = vacuum_database()
+
     if result:
         if result.get('success'):
             print(f"OK {result.get('message', 'Success')}")
@@ -772,7 +1640,7 @@ def main():
             print(f"ERROR {result.get('error')}")
             sys.exit(1)
 
-        print(json.dumps(result, indent=2, default=str))
+        print_json(result)
 
 
 if __name__ == "__main__":
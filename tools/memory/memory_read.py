@@ -21,24 +21,42 @@ Dependencies:
     - pathlib (stdlib)
     - json (stdlib)
     - datetime (stdlib)
+    - orjson (optional, faster JSON output)
 
 Output:
     Combined memory context ready for LLM injection
 """
 
 import os
+import re
 import sys
 import json
+import mmap
 import argparse
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Optional, List, Dict, Any
 
+# orjson serializes large contexts several times faster; stdlib json is the fallback
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 # Paths
 MEMORY_DIR = Path(__file__).parent.parent.parent / "memory"
 MEMORY_FILE = MEMORY_DIR / "MEMORY.md"
 LOGS_DIR = MEMORY_DIR / "logs"
 
+# "## Heading" lines in MEMORY.md
+_SECTION_RE = re.compile(r'(?m)^## (.+)$')
+
+# Bullet lines ("- " or "* ", optionally indented) in a daily log
+_KEY_EVENT_RE = re.compile(rb'(?m)^[ \t]*[-*] (.*\S)[ \t\r]*$')
+
 # Import memory_db functions
 sys.path.insert(0, str(Path(__file__).parent))
 try:
@@ -69,22 +87,15 @@ def read_memory_file() -> Dict[str, Any]:
 
     content = MEMORY_FILE.read_text(encoding='utf-8')
 
-    # Parse sections (simple parsing)
+    # Parse sections: split yields [preamble, heading, body, heading, body, ...]
+    parts = _SECTION_RE.split(content)
     sections = {}
-    current_section = "preamble"
-    current_content = []
-
-    for line in content.split('\n'):
-        if line.startswith('## '):
-            if current_content:
-                sections[current_section] = '\n'.join(current_content).strip()
-            current_section = line[3:].strip().lower().replace(' ', '_')
-            current_content = []
-        else:
-            current_content.append(line)
-
-    if current_content:
-        sections[current_section] = '\n'.join(current_content).strip()
+    if parts[0]:
+        sections["preamble"] = parts[0].strip()
+    sections.update(zip(
+        (h.strip().lower().replace(' ', '_') for h in parts[1::2]),
+        (b.strip() for b in parts[2::2])
+    ))
 
     return {
         "success": True,
@@ -95,19 +106,59 @@ def read_memory_file() -> Dict[str, Any]:
     }
 
 
-def read_daily_log(date: str) -> Dict[str, Any]:
+@functools.lru_cache(maxsize=32)
+def _parse_log_file(path: str, mtime_ns: int, include_content: bool):
+    """
+    Scan a log file for key events without splitting it into lines.
+
+    Cached by (path, mtime), so an unchanged log is parsed once per process.
+
+    Returns:
+        (content or None, key_events tuple)
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return ('' if include_content else None), ()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            key_events = tuple(m.group(1).decode('utf-8') for m in _KEY_EVENT_RE.finditer(mm))
+            content = mm[:].decode('utf-8') if include_content else None
+    if content and '\r' in content:
+        # Match text-mode reads (universal newlines)
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+    return content, key_events
+
+
+def list_log_dates() -> set:
+    """Dates (YYYY-MM-DD) that have a log file, from one directory read."""
+    try:
+        with os.scandir(LOGS_DIR) as it:
+            return {e.name[:-3] for e in it if e.name.endswith('.md')}
+    except FileNotFoundError:
+        return set()
+
+
+def read_daily_log(
+    date: str,
+    include_content: bool = True,
+    available: Optional[set] = None
+) -> Dict[str, Any]:
     """
     Read a daily log file.
 
     Args:
         date: Date string (YYYY-MM-DD)
+        include_content: Decode and return the full log text; key events
+            are extracted either way
+        available: Optional result of list_log_dates(); replaces the
+            per-file existence check
 
     Returns:
         dict with content and metadata
     """
     log_file = LOGS_DIR / f"{date}.md"
 
-    if not log_file.exists():
+    has_file = date in available if available is not None else log_file.exists()
+    if not has_file:
         # Try SQLite
         db_result = get_daily_log(date)
         if db_result.get('success'):
@@ -125,14 +176,9 @@ def read_daily_log(date: str) -> Dict[str, Any]:
             "error": f"No log found for {date}"
         }
 
-    content = log_file.read_text(encoding='utf-8')
-
     # Extract key events (lines starting with - or *)
-    key_events = []
-    for line in content.split('\n'):
-        line = line.strip()
-        if line.startswith('- ') or line.startswith('* '):
-            key_events.append(line[2:])
+    stat = log_file.stat()
+    content, key_events = _parse_log_file(str(log_file), stat.st_mtime_ns, include_content)
 
     return {
         "success": True,
@@ -140,8 +186,8 @@ def read_daily_log(date: str) -> Dict[str, Any]:
         "source": "file",
         "path": str(log_file),
         "content": content,
-        "key_events": key_events,
-        "last_modified": datetime.fromtimestamp(log_file.stat().st_mtime).isoformat()
+        "key_events": list(key_events),
+        "last_modified": datetime.fromtimestamp(stat.st_mtime).isoformat()
     }
 
 
@@ -149,21 +195,24 @@ def read_recent_logs(days: int = 2) -> List[Dict[str, Any]]:
     """
     Read the most recent daily logs.
 
+    Days are read concurrently; each file read or SQLite lookup is
+    blocking I/O, so the threads overlap their waits.
+
     Args:
         days: Number of days to include (default: 2 for today + yesterday)
 
     Returns:
-        List of log results
+        List of log results, most recent first
     """
-    logs = []
-    today = datetime.now().date()
+    if days <= 0:
+        return []
 
-    for i in range(days):
-        date = (today - timedelta(days=i)).isoformat()
-        log = read_daily_log(date)
-        logs.append(log)
+    today = datetime.now().date()
+    dates = [(today - timedelta(days=i)).isoformat() for i in range(days)]
+    read = functools.partial(read_daily_log, available=list_log_dates())
 
-    return logs
+    with ThreadPoolExecutor(max_workers=min(8, days)) as executor:
+        return list(executor.map(read, dates))
 
 
 def read_db_entries(
@@ -289,9 +338,38 @@ def format_as_markdown(memory_context: Dict[str, Any]) -> str:
     return '\n'.join(parts)
 
 
+def format_as_summary(memory_context: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Condense memory context to counts and section names.
+
+    Args:
+        memory_context: Result from load_all_memory()
+
+    Returns:
+        Summary dict (the --format summary output)
+    """
+    summary = memory_context.get('summary', {})
+    return {
+        "success": True,
+        "loaded_at": memory_context.get('loaded_at'),
+        "memory_file_loaded": (memory_context.get('memory_file') or {}).get('success', False),
+        "memory_sections": summary.get('memory_sections', []),
+        "logs_loaded": summary.get('logs_loaded', 0),
+        "log_dates": summary.get('log_dates', []),
+        "db_entries_loaded": summary.get('db_entries_loaded', 0)
+    }
+
+
+def _dumps(obj: Any) -> str:
+    """Serialize to indented JSON, via orjson when installed."""
+    if HAS_ORJSON:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(obj, indent=2, default=str)
+
+
 def format_as_json(memory_context: Dict[str, Any]) -> str:
     """Format memory context as JSON."""
-    return json.dumps(memory_context, indent=2, default=str)
+    return _dumps(memory_context)
 
 
 def main():
@@ -335,16 +413,7 @@ def main():
         print(format_as_json(context))
 
     elif args.format == 'summary':
-        summary = context.get('summary', {})
-        print(json.dumps({
-            "success": True,
-            "loaded_at": context.get('loaded_at'),
-            "memory_file_loaded": context.get('memory_file', {}).get('success', False),
-            "memory_sections": summary.get('memory_sections', []),
-            "logs_loaded": summary.get('logs_loaded', 0),
-            "log_dates": summary.get('log_dates', []),
-            "db_entries_loaded": summary.get('db_entries_loaded', 0)
-        }, indent=2))
+        print(_dumps(format_as_summary(context)))
 
 
 if __name__ == "__main__":
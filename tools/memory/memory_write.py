@@ -3,7 +3,8 @@ Tool: Memory Writer
 Purpose: Append to daily logs and add entries to SQLite database
 
 This tool handles the "write" side of persistent memory:
-- Append events/notes to today's daily log (memory/logs/YYYY-MM-DD.md)
+- Append events/notes to today's daily log (memory/logs/YYYY-MM-DD.md),
+  optionally buffered and written in one append per flush
 - Add structured entries to SQLite for searchability
 - Sync between markdown files and database
 
@@ -25,27 +26,61 @@ Output:
 """
 
 import os
+import re
 import sys
 import json
+import mmap
+import atexit
+import contextlib
 import argparse
+import threading
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 
 # Paths
 MEMORY_DIR = Path(__file__).parent.parent.parent / "memory"
 MEMORY_FILE = MEMORY_DIR / "MEMORY.md"
 LOGS_DIR = MEMORY_DIR / "logs"
 
+# End of a MEMORY.md section, and its last-updated stamp
+_SECTION_END = re.compile(r'(?m)^(?:## |[^\S\n]*\n(?=## )|[^\S\n]*---[^\S\n]*$)')
+_LAST_UPDATED = re.compile(r'(?m)^\*Last updated:.*$')
+
+# Bullet lines of a daily log ('- ' or '* ', surrounding whitespace ignored),
+# matched on the raw bytes as memory_read does
+_LOG_EVENT = re.compile(rb'(?m)^[ \t]*[-*] (.*\S)[ \t\r]*$')
+
+# Top of a new daily log file
+_LOG_HEADER = """# Daily Log: {date}
+
+> Session log for {long_date}
+
+---
+
+## Events & Notes
+
+"""
+
+# (date, logs dir, path) of the last daily log resolved; its directories exist
+_today_log: Optional[Tuple[str, Path, Path]] = None
+
+# Deferred daily-log lines, per log file; flushed past LOG_FLUSH_BYTES and at exit
+LOG_FLUSH_BYTES = 64 * 1024
+_log_buffer: Dict[Path, List[str]] = {}
+_log_buffered_bytes = 0
+_log_lock = threading.Lock()
+
 # Import memory_db functions
 sys.path.insert(0, str(Path(__file__).parent))
 try:
-    from memory_db import add_entry, add_daily_log as db_add_daily_log
+    from memory_db import add_entry, add_daily_log as db_add_daily_log, bulk
 except ImportError:
     def add_entry(**kwargs):
         return {"success": False, "error": "memory_db not available"}
     def db_add_daily_log(**kwargs):
         return {"success": False, "error": "memory_db not available"}
+    bulk = contextlib.nullcontext
 
 
 def ensure_directories():
@@ -54,17 +89,78 @@ def ensure_directories():
     LOGS_DIR.mkdir(parents=True, exist_ok=True)
 
 
-def get_today_log_path() -> Path:
-    """Get path to today's daily log file."""
-    today = datetime.now().strftime('%Y-%m-%d')
+def get_today_log_path(now: Optional[datetime] = None) -> Path:
+    """Get path to today's daily log file (or the log for `now`'s date)."""
+    today = (now or datetime.now()).date().isoformat()
     return LOGS_DIR / f"{today}.md"
 
 
+def _log_path_for(today: str) -> Path:
+    """Daily log path for a date, resolved (and its directories created) once per day."""
+    global _today_log
+    if _today_log is None or _today_log[:2] != (today, LOGS_DIR):
+        ensure_directories()
+        _today_log = (today, LOGS_DIR, LOGS_DIR / f"{today}.md")
+    return _today_log[2]
+
+
+def _log_header(date: str) -> str:
+    """Header written at the top of a new daily log file."""
+    day = datetime.strptime(date, '%Y-%m-%d')
+    return _LOG_HEADER.format(date=date, long_date=day.strftime('%A, %B %d, %Y'))
+
+
+def _write_log_lines(log_path: Path, lines: List[str]) -> None:
+    """
+    Append lines to a daily log (with its header if new) in a single write.
+
+    O_APPEND makes each write land whole at the end of the file, so
+    concurrent writers never interleave inside an entry; O_EXCL decides
+    which of them creates the file and writes its header.
+    """
+    data = ''.join(lines)
+    try:
+        fd = os.open(log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT | os.O_EXCL, 0o644)
+        data = _log_header(log_path.stem) + data
+    except FileExistsError:
+        fd = os.open(log_path, os.O_WRONLY | os.O_APPEND)
+    data = data.encode('utf-8')
+
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+def flush_daily_log() -> int:
+    """
+    Write deferred daily-log lines: one append per log file.
+
+    Returns:
+        Number of lines written
+    """
+    global _log_buffered_bytes
+    with _log_lock:
+        pending = dict(_log_buffer)
+        _log_buffer.clear()
+        _log_buffered_bytes = 0
+
+    for log_path, lines in pending.items():
+        _write_log_lines(log_path, lines)
+    return sum(len(lines) for lines in pending.values())
+
+
+atexit.register(flush_daily_log)
+
+
 def append_to_daily_log(
     content: str,
     entry_type: str = 'note',
     timestamp: bool = True,
-    category: Optional[str] = None
+    category: Optional[str] = None,
+    defer: bool = False
 ) -> Dict[str, Any]:
     """
     Append an entry to today's daily log file.
@@ -74,40 +170,40 @@ def append_to_daily_log(
         entry_type: Type of entry (note, event, insight, task, etc.)
         timestamp: Whether to include timestamp
         category: Optional category tag
+        defer: Buffer the line and write it with others on flush_daily_log()
+            (called once LOG_FLUSH_BYTES are pending, and at exit)
 
     Returns:
         dict with success status
     """
-    ensure_directories()
-    log_path = get_today_log_path()
-    today = datetime.now().strftime('%Y-%m-%d')
-
-    # Create file with header if it doesn't exist
-    if not log_path.exists():
-        header = f"""# Daily Log: {today}
-
-> Session log for {datetime.now().strftime('%A, %B %d, %Y')}
-
----
-
-## Events & Notes
-
-"""
-        log_path.write_text(header, encoding='utf-8')
-
-    # Format the entry
-    time_str = datetime.now().strftime('%H:%M') if timestamp else ''
-    type_prefix = f"[{entry_type}]" if entry_type != 'note' else ''
-    category_tag = f" #{category}" if category else ''
-
-    if timestamp:
-        entry_line = f"- {time_str} {type_prefix} {content}{category_tag}\n"
+    global _log_buffered_bytes
+    # One clock read per entry, so the date and time always agree
+    now = datetime.now()
+    today = now.date().isoformat()
+    log_path = _log_path_for(today)
+
+    # Format the entry; a timestamped, untagged note (the usual case) is one f-string
+    if timestamp and entry_type == 'note' and not category:
+        entry_line = f"- {now.hour:02d}:{now.minute:02d}  {content}\n"
     else:
-        entry_line = f"- {type_prefix} {content}{category_tag}\n"
+        time_str = f"{now.hour:02d}:{now.minute:02d}" if timestamp else ''
+        type_prefix = f"[{entry_type}]" if entry_type != 'note' else ''
+        category_tag = f" #{category}" if category else ''
 
-    # Append to file
-    with open(log_path, 'a', encoding='utf-8') as f:
-        f.write(entry_line)
+        if timestamp:
+            entry_line = f"- {time_str} {type_prefix} {content}{category_tag}\n"
+        else:
+            entry_line = f"- {type_prefix} {content}{category_tag}\n"
+
+    if defer:
+        with _log_lock:
+            _log_buffer.setdefault(log_path, []).append(entry_line)
+            _log_buffered_bytes += len(entry_line)
+            full = _log_buffered_bytes >= LOG_FLUSH_BYTES
+        if full:
+            flush_daily_log()
+    else:
+        _write_log_lines(log_path, [entry_line])
 
     return {
         "success": True,
@@ -126,7 +222,8 @@ def write_to_memory(
     tags: Optional[List[str]] = None,
     context: Optional[str] = None,
     log_to_file: bool = True,
-    add_to_db: bool = True
+    add_to_db: bool = True,
+    defer_log: bool = False
 ) -> Dict[str, Any]:
     """
     Write to both daily log and SQLite database.
@@ -140,6 +237,7 @@ def write_to_memory(
         context: Optional context
         log_to_file: Whether to append to daily log
         add_to_db: Whether to add to SQLite
+        defer_log: Buffer the daily-log line (see append_to_daily_log)
 
     Returns:
         dict with results from both operations
@@ -155,7 +253,8 @@ def write_to_memory(
         log_result = append_to_daily_log(
             content=content,
             entry_type=entry_type,
-            category=tags[0] if tags else None
+            category=tags[0] if tags else None,
+            defer=defer_log
         )
         results["log_result"] = log_result
         if not log_result.get('success'):
@@ -179,6 +278,28 @@ def write_to_memory(
     return results
 
 
+def write_to_memory_batch(items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Write many memories with one database transaction and one log append.
+
+    Args:
+        items: Keyword arguments for write_to_memory(), one dict per memory
+
+    Returns:
+        dict with per-item results, in order
+    """
+    with bulk():
+        results = [write_to_memory(**dict(item, defer_log=True)) for item in items]
+    flush_daily_log()
+
+    return {
+        "success": all(r["success"] for r in results),
+        "count": len(results),
+        "results": results,
+        "message": f"Wrote {len(results)} memories"
+    }
+
+
 def append_to_memory_file(
     content: str,
     section: str = 'key_facts'
@@ -197,51 +318,27 @@ def append_to_memory_file(
     if not MEMORY_FILE.exists():
         return {"success": False, "error": "MEMORY.md does not exist"}
 
-    full_content = MEMORY_FILE.read_text(encoding='utf-8')
+    text = MEMORY_FILE.read_text(encoding='utf-8')
 
-    # Find the section and append
+    # Locate the section header, then the first line that ends the section:
+    # the next '## ' header, the blank line right before it, or a '---' rule
     section_header = f"## {section.replace('_', ' ').title()}"
-    lines = full_content.split('\n')
-    new_lines = []
-    found_section = False
-    inserted = False
-
-    for i, line in enumerate(lines):
-        new_lines.append(line)
-
-        # Found our section
-        if line.strip().lower() == section_header.lower():
-            found_section = True
-            continue
-
-        # We're in our section, look for the next section or end
-        if found_section and not inserted:
-            # Check if this is a new section or blank line before next section
-            if line.startswith('## ') or (line.strip() == '' and i + 1 < len(lines) and lines[i + 1].startswith('## ')):
-                # Insert before this line
-                new_lines.insert(-1, f"- {content}")
-                inserted = True
-            elif line.strip() == '---':
-                # Insert before horizontal rule
-                new_lines.insert(-1, f"- {content}")
-                inserted = True
-
-    # If we found the section but didn't insert (section is at end)
-    if found_section and not inserted:
-        new_lines.append(f"- {content}")
-        inserted = True
-
-    if not found_section:
+    header = re.search(rf'(?mi)^[^\S\n]*{re.escape(section_header)}[^\S\n]*$', text)
+    if not header:
         return {"success": False, "error": f"Section '{section}' not found in MEMORY.md"}
 
+    boundary = _SECTION_END.search(text, header.end() + 1)
+    if boundary:
+        text = f"{text[:boundary.start()]}- {content}\n{text[boundary.start():]}"
+    else:
+        # Section runs to the end of the file
+        text = f"{text}\n- {content}"
+
     # Update the last modified line
-    for i, line in enumerate(new_lines):
-        if line.startswith('*Last updated:'):
-            new_lines[i] = f"*Last updated: {datetime.now().strftime('%Y-%m-%d')}*"
-            break
+    text = _LAST_UPDATED.sub(f"*Last updated: {datetime.now().strftime('%Y-%m-%d')}*", text, count=1)
 
     # Write back
-    MEMORY_FILE.write_text('\n'.join(new_lines), encoding='utf-8')
+    MEMORY_FILE.write_text(text, encoding='utf-8')
 
     return {
         "success": True,
@@ -267,17 +364,24 @@ def sync_log_to_db(date: Optional[str] = None) -> Dict[str, Any]:
 
     log_path = LOGS_DIR / f"{date}.md"
 
+    # Include lines still buffered by this process
+    flush_daily_log()
     if not log_path.exists():
         return {"success": False, "error": f"No log file for {date}"}
 
-    content = log_path.read_text(encoding='utf-8')
-
-    # Extract key events (lines starting with - or *)
-    key_events = []
-    for line in content.split('\n'):
-        line = line.strip()
-        if line.startswith('- ') or line.startswith('* '):
-            key_events.append(line[2:])
+    # Scan the mapped file instead of a bytes copy; only the text stored as
+    # raw_log is decoded
+    with open(log_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            content, key_events = '', []
+        else:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                # Extract key events (lines starting with - or *)
+                key_events = [m.group(1).decode('utf-8') for m in _LOG_EVENT.finditer(mm)]
+                content = str(mm, 'utf-8')
+    if '\r' in content:
+        # Match text-mode reads (universal newlines)
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
 
     # Create summary (first non-header, non-empty line or first event)
     summary = key_events[0] if key_events else f"Log for {date}"
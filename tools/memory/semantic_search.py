@@ -5,6 +5,8 @@ Purpose: Search memory entries by semantic similarity using vector embeddings
 This implements Moltbot-style semantic memory search:
 - Generate embedding for query
 - Find most similar memories using cosine similarity
+  (a k-NN query inside SQLite when the sqlite-vec index is loaded, otherwise
+  one matrix-vector product over a cached, L2-normalized embedding matrix)
 - Return ranked results with similarity scores
 
 Usage:
@@ -12,10 +14,15 @@ Usage:
     python tools/memory/semantic_search.py --query "what tools do I use" --limit 10
     python tools/memory/semantic_search.py --query "meeting notes" --type event
     python tools/memory/semantic_search.py --query "learned behavior" --threshold 0.7
+    python tools/memory/semantic_search.py --query "preferences" --quantized
+    python tools/memory/semantic_search.py --query "preferences" --binary
+    python tools/memory/semantic_search.py --query "images" --query "meetings"  # One embedding call
 
 Dependencies:
     - openai (for query embedding)
     - numpy (for cosine similarity)
+    - numba (optional, JIT-compiled scoring via similarity.py)
+    - sqlite-vec (optional, k-NN inside SQLite via memory_db.vector_search)
     - sqlite3 (stdlib)
 
 Env Vars:
@@ -31,6 +38,8 @@ import json
 import argparse
 import struct
 import math
+import heapq
+import operator
 from pathlib import Path
 from typing import Optional, List, Dict, Any, Tuple
 from dotenv import load_dotenv
@@ -41,17 +50,253 @@ load_dotenv()
 # Import from sibling modules
 sys.path.insert(0, str(Path(__file__).parent))
 try:
-    from embed_memory import generate_embedding, bytes_to_embedding, get_openai_client
-    from memory_db import get_connection
+    from embed_memory import (
+        generate_embedding,
+        generate_query_embeddings,
+        bytes_to_embedding_q8,
+        decode_embedding,
+        embedding_to_bytes_q8,
+        normalize_embedding,
+        get_openai_client
+    )
+    import memory_db
+    from memory_db import (
+        count_embedded, get_connection, get_embedding_fingerprint, print_json, replace_file, vector_search
+    )
 except ImportError as e:
     print(f"Error importing modules: {e}", file=sys.stderr)
     sys.exit(1)
 
+# Vectorized scoring (Numba/NumPy); falls back to pure-Python cosine
+try:
+    import numpy as np
+    from similarity import (
+        binarize, cosine_scores, dot_scores, embeddings_to_matrix, hamming_distances, q8_scores,
+        quantize_rows, quantized_to_matrix
+    )
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+
+# In-process copy of the embedding matrix: (fingerprint, ids, types, unit-length float32 rows)
+_MATRIX_CACHE: Optional[Tuple[str, Any, Any, Any]] = None
+
+# Sign-bit codes of the cached matrix: (matrix they were computed from, codes)
+_BINARY_CACHE: Optional[Tuple[Any, Any]] = None
+
+# int8 copy of the cached matrix: (matrix it was quantized from, scales, int8 rows)
+_Q8_CACHE: Optional[Tuple[Any, Any, Any]] = None
+
+# Pure-Python dot product for the no-NumPy path: math.sumprod (3.12+) runs the
+# loop in C with a single rounding; map(operator.mul) avoids a generator frame per element
+_sumprod = getattr(math, 'sumprod', None) or (lambda a, b: sum(map(operator.mul, a, b)))
+
+# Binary search reranks this many candidates per requested result with exact scores
+BINARY_RERANK_FACTOR = 10
+
+
+def _matrix_dir() -> Path:
+    """On-disk copy of the embedding matrix, next to the memory database."""
+    return memory_db.DB_PATH.parent / "memory_embeddings"
+
+
+def _load_matrix(fingerprint: str):
+    """Memory-map the persisted matrix if it was built for this fingerprint."""
+    base = _matrix_dir()
+    try:
+        meta = (base / "meta.json").read_text()
+        if json.loads(meta).get("fingerprint") != fingerprint:
+            return None
+        ids = np.load(base / "ids.npy", allow_pickle=False)
+        types = np.load(base / "types.npy", allow_pickle=False)
+        # Pages of the matrix are read on demand and shared through the OS page cache
+        matrix = np.load(base / "matrix.npy", mmap_mode='r', allow_pickle=False)
+        # _save_matrix() removes meta.json before replacing any array, so an unchanged
+        # meta.json means the arrays all belong to it
+        if (base / "meta.json").read_text() != meta:
+            return None
+    except (OSError, ValueError):
+        return None
+    return ids, types, matrix
+
+
+def _save_matrix(fingerprint: str, ids, types, matrix) -> None:
+    base = _matrix_dir()
+    try:
+        base.mkdir(parents=True, exist_ok=True)
+        (base / "meta.json").unlink(missing_ok=True)
+        scales, q8 = quantize_rows(matrix)
+        for name, array in (("ids", ids), ("types", types), ("matrix", matrix),
+                            ("scales_q8", scales), ("matrix_q8", q8)):
+            replace_file(base / f"{name}.npy", lambda f, array=array: np.save(f, array))
+        # Written last: the arrays only count once their metadata is in place
+        meta = json.dumps({"fingerprint": fingerprint, "count": len(ids)}).encode()
+        replace_file(base / "meta.json", lambda f: f.write(meta))
+        # Superseded single-file cache (not memory-mappable)
+        (base.parent / "memory_embeddings.npz").unlink(missing_ok=True)
+    except OSError:
+        pass
+
+
+def get_embedding_matrix():
+    """
+    All active embeddings as one L2-normalized float32 matrix (needs NumPy).
+
+    The matrix is kept in memory and as .npy files next to the database,
+    memory-mapped by later processes, and rebuilt only when
+    get_embedding_fingerprint() changes, so a query does not decode every
+    stored BLOB.
+
+    Returns:
+        (ids, types, matrix): (N,) int64 ids, (N,) entry types, (N, D) float32 rows
+    """
+    global _MATRIX_CACHE
+    fingerprint, _ = get_embedding_fingerprint()
+    if _MATRIX_CACHE is not None and _MATRIX_CACHE[0] == fingerprint:
+        return _MATRIX_CACHE[1:]
+
+    loaded = _load_matrix(fingerprint)
+    if loaded is not None:
+        _MATRIX_CACHE = (fingerprint, *loaded)
+        return loaded
+
+    conn = get_connection()
+    rows = conn.execute('''
+        SELECT id, type, embedding, embedding_dtype FROM memory_entries
+        WHERE is_active = 1 AND embedding IS NOT NULL
+        ORDER BY id
+    ''').fetchall()
+    conn.close()
+
+    ids = np.array([row['id'] for row in rows], dtype=np.int64)
+    types = np.array([row['type'] or '' for row in rows], dtype=str)
+    if rows:
+        matrix = embeddings_to_matrix(decode_embedding(row['embedding'], row['embedding_dtype']) for row in rows)
+        # Older rows may predate normalization on write
+        matrix /= np.linalg.norm(matrix, axis=1, keepdims=True) + 1e-12
+    else:
+        matrix = np.empty((0, 0), dtype=np.float32)
+
+    _save_matrix(fingerprint, ids, types, matrix)
+    _MATRIX_CACHE = (fingerprint, ids, types, matrix)
+    return ids, types, matrix
+
+
+def _quantized_matrix(matrix):
+    """
+    int8 rows and per-row scales for the cached matrix.
+
+    Memory-mapped from the copy _save_matrix() wrote alongside it when
+    that copy is current, otherwise quantized once per matrix.
+    """
+    global _Q8_CACHE
+    if _Q8_CACHE is None or _Q8_CACHE[0] is not matrix:
+        base = _matrix_dir()
+        try:
+            meta = (base / "meta.json").read_text()
+            if _MATRIX_CACHE is None or json.loads(meta).get("fingerprint") != _MATRIX_CACHE[0]:
+                raise ValueError("int8 matrix is stale")
+            scales = np.load(base / "scales_q8.npy", allow_pickle=False)
+            q8 = np.load(base / "matrix_q8.npy", mmap_mode='r', allow_pickle=False)
+            if (base / "meta.json").read_text() != meta:
+                raise ValueError("int8 matrix was rewritten while loading")
+        except (OSError, ValueError):
+            scales, q8 = quantize_rows(matrix)
+        _Q8_CACHE = (matrix, scales, q8)
+    return _Q8_CACHE[1:]
+
+
+def _binary_codes(matrix):
+    """Sign-bit codes for the cached matrix, computed once per matrix."""
+    global _BINARY_CACHE
+    if _BINARY_CACHE is None or _BINARY_CACHE[0] is not matrix:
+        _BINARY_CACHE = (matrix, binarize(matrix))
+    return _BINARY_CACHE[1]
+
+
+def top_matches(query_embedding, entry_type: Optional[str], limit: int, threshold: float,
+                binary: bool = False, exclude_id: Optional[int] = None, quantized: bool = False):
+    """
+    Best-scoring active entries from the cached embedding matrix.
+
+    Args:
+        query_embedding: Query vector
+        entry_type: Optional type filter
+        limit: Maximum matches
+        threshold: Minimum similarity
+        binary: Pick candidates by Hamming distance over sign bits, then
+            rerank only those with exact scores (approximate; reads 32x less)
+        exclude_id: Entry to leave out (e.g. the source of find_similar())
+        quantized: Score the int8 copy of the matrix (reads 4x less;
+            similarities are approximate to about 1e-2)
+
+    Returns:
+        (matches, searched, above): (id, similarity) pairs best first,
+        the number of entries searched, and how many scored met the threshold
+    """
+    ids, types, matrix = get_embedding_matrix()
+    codes = _binary_codes(matrix) if binary else None
+    if quantized:
+        scales, matrix = _quantized_matrix(matrix)
+    if entry_type or exclude_id is not None:
+        mask = types == entry_type if entry_type else np.ones(len(ids), dtype=bool)
+        if exclude_id is not None:
+            mask &= ids != exclude_id
+        ids, matrix = ids[mask], matrix[mask]
+        codes = codes[mask] if binary else None
+        scales = scales[mask] if quantized else None
+    if len(ids) == 0:
+        return [], 0, 0
+    searched = len(ids)
+
+    if binary and searched > limit * BINARY_RERANK_FACTOR:
+        distances = hamming_distances(binarize(query_embedding), codes)
+        candidates = np.argpartition(distances, limit * BINARY_RERANK_FACTOR - 1)[:limit * BINARY_RERANK_FACTOR]
+        ids, matrix = ids[candidates], matrix[candidates]
+        scales = scales[candidates] if quantized else None
+
+    if quantized:
+        query_scale, query_q = bytes_to_embedding_q8(embedding_to_bytes_q8(normalize_embedding(query_embedding)))
+        sims = q8_scores(query_scale, query_q, scales, matrix)
+    else:
+        sims = dot_scores(query_embedding, matrix)
+    above = np.flatnonzero(sims >= threshold)
+    if len(above) > limit:
+        # Partial selection of the top `limit`, then sort just those
+        above = above[np.argpartition(-sims[above], limit - 1)[:limit]] if limit > 0 else above[:0]
+    order = above[np.argsort(-sims[above], kind='stable')]
+    return [(int(ids[i]), float(sims[i])) for i in order], searched, int(np.count_nonzero(sims >= threshold))
+
+
+def _vec_matches(query_embedding, entry_type: Optional[str], limit: int, threshold: float,
+                 exclude_id: Optional[int] = None):
+    """
+    Top matches from the sqlite-vec index, or None when it is not available.
+
+    The neighbours are ranked by the extension's C kernel, so no embedding
+    crosses into Python. Returns (matches, searched, above) like
+    top_matches(); `above` counts only the neighbours fetched.
+    """
+    if HAS_NUMPY:
+        query_embedding = np.asarray(query_embedding, dtype=np.float32).tobytes()
+    hits = vector_search(query_embedding, limit + (exclude_id is not None), entry_type)
+    if hits is None:
+        return None
+    hits = [(entry_id, sim) for entry_id, sim in hits if entry_id != exclude_id][:limit]
+    matches = [(entry_id, sim) for entry_id, sim in hits if sim >= threshold]
+    # Every embedded entry is in the index, so all of them were searched
+    searched = count_embedded(entry_type) - (exclude_id is not None)
+    return matches, searched, len(matches)
+
 
 def cosine_similarity(vec1: List[float], vec2: List[float]) -> float:
     """
     Calculate cosine similarity between two vectors.
 
+    Uses a single NumPy dot product when available (lists or ndarrays);
+    otherwise C-level loops from the math module (sumprod, hypot).
+
     Args:
         vec1: First vector
         vec2: Second vector
@@ -62,19 +307,97 @@ def cosine_similarity(vec1: List[float], vec2: List[float]) -> float:
     if len(vec1) != len(vec2):
         raise ValueError("Vectors must have same length")
 
-    dot_product = sum(a * b for a, b in zip(vec1, vec2))
-    magnitude1 = math.sqrt(sum(a * a for a in vec1))
-    magnitude2 = math.sqrt(sum(b * b for b in vec2))
+    if HAS_NUMPY:
+        v1 = np.asarray(vec1, dtype=np.float32)
+        v2 = np.asarray(vec2, dtype=np.float32)
+        denom = float(np.linalg.norm(v1) * np.linalg.norm(v2))
+        return float(np.dot(v1, v2) / denom) if denom > 0 else 0.0
+
+    dot_product = _sumprod(vec1, vec2)
+    magnitude1 = math.hypot(*vec1)
+    magnitude2 = math.hypot(*vec2)
 
     if magnitude1 == 0 or magnitude2 == 0:
         return 0.0
 
-    return dot_product / (magnitude1 * magnitude2)
+    return float(dot_product / (magnitude1 * magnitude2))
+
+
+def score_entries(query_embedding, entries: List[Dict[str, Any]], quantized: bool = False) -> List[float]:
+    """
+    Score every entry's embedding against a query embedding.
+
+    Args:
+        query_embedding: Query vector
+        entries: Entries from get_all_embeddings()
+        quantized: Entries hold int8 BLOBs (get_all_embeddings(quantized=True))
+
+    Returns:
+        Cosine similarities, in entry order
+    """
+    if quantized and entries:
+        query_scale, query_q = bytes_to_embedding_q8(embedding_to_bytes_q8(normalize_embedding(query_embedding)))
+        scales, matrix = quantized_to_matrix(e['embedding'] for e in entries)
+        return q8_scores(query_scale, query_q, scales, matrix).tolist()
+    if HAS_NUMPY and entries:
+        matrix = embeddings_to_matrix(e['embedding'] for e in entries)
+        # Unit-length rows reduce cosine to a single matrix-vector product
+        if all(e.get('embedding_normalized') for e in entries):
+            return dot_scores(query_embedding, matrix).tolist()
+        return cosine_scores(query_embedding, matrix).tolist()
+    return [cosine_similarity(query_embedding, e['embedding']) for e in entries]
+
+
+def _score_vectors(query_embedding, vectors: List[Any], normalized: bool) -> List[float]:
+    """Cosine similarities of the query against each vector (score_entries() without the dicts)."""
+    if not vectors:
+        return []
+    if HAS_NUMPY:
+        matrix = embeddings_to_matrix(vectors)
+        if normalized:
+            return dot_scores(query_embedding, matrix).tolist()
+        return cosine_scores(query_embedding, matrix).tolist()
+    if normalized:
+        # Unit-length rows: one dot product each, the query norm computed once
+        query_norm = math.hypot(*query_embedding)
+        if query_norm == 0:
+            return [0.0] * len(vectors)
+        return [float(_sumprod(query_embedding, v)) / query_norm for v in vectors]
+    return [cosine_similarity(query_embedding, v) for v in vectors]
+
+
+def _embedding_rows(entry_type: Optional[str] = None) -> Tuple[List[int], List[Any], bool]:
+    """
+    Ids and decoded embeddings of active entries, most important first.
+
+    Rows arrive as plain tuples (no sqlite3.Row or dict per entry); the
+    exact scans score these and load full rows only for their winners.
+
+    Returns:
+        (ids, vectors, normalized): whether every vector is unit-length
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    cursor.execute(f'''
+        SELECT id, embedding, embedding_dtype, embedding_normalized FROM memory_entries
+        WHERE embedding IS NOT NULL AND is_active = 1 {'AND type = ?' if entry_type else ''}
+        ORDER BY importance DESC
+    ''', [entry_type] if entry_type else [])
+    rows = cursor.fetchall()
+    conn.close()
+
+    ids = [row[0] for row in rows]
+    vectors = [decode_embedding(row[1], row[2]) for row in rows]
+    return ids, vectors, all(row[3] for row in rows)
 
 
 def get_all_embeddings(
     entry_type: Optional[str] = None,
-    active_only: bool = True
+    active_only: bool = True,
+    quantized: bool = False,
+    metadata: bool = True,
+    max_rows: Optional[int] = None
 ) -> List[Dict[str, Any]]:
     """
     Get all memory entries with embeddings.
@@ -82,6 +405,12 @@ def get_all_embeddings(
     Args:
         entry_type: Optional type filter
         active_only: Only get active entries
+        quantized: Read the int8 BLOBs instead of float32; these are
+            returned undecoded for score_entries(quantized=True)
+        metadata: Include content, source, tags, etc.; without it only what
+            scoring needs is read (id, importance and the embedding)
+        max_rows: Only the most important max_rows entries (for callers that
+            bound their candidates by importance)
 
     Returns:
         List of entries with their embeddings
@@ -89,7 +418,12 @@ def get_all_embeddings(
     conn = get_connection()
     cursor = conn.cursor()
 
-    conditions = ['embedding IS NOT NULL']
+    # int8-only rows keep their quantized form in the embedding column
+    if quantized:
+        column = "CASE WHEN embedding_dtype = 'int8' THEN embedding ELSE embedding_q8 END"
+    else:
+        column = 'embedding'
+    conditions = [f'{column} IS NOT NULL']
     params = []
 
     if active_only:
@@ -100,32 +434,45 @@ def get_all_embeddings(
         params.append(entry_type)
 
     where_clause = ' AND '.join(conditions)
+    limit_clause = ''
+    if max_rows is not None:
+        limit_clause = 'LIMIT ?'
+        params.append(max_rows)
 
+    extra = ', type, content, source, created_at, tags' if metadata else ''
     cursor.execute(f'''
-        SELECT id, type, content, source, importance, embedding, created_at, tags
+        SELECT id, importance, {column} AS embedding, embedding_normalized, embedding_dtype{extra}
         FROM memory_entries
         WHERE {where_clause}
         ORDER BY importance DESC
+        {limit_clause}
     ''', params)
 
     entries = []
     for row in cursor.fetchall():
         entry = dict(row)
         # Convert embedding bytes to list
-        if entry['embedding']:
-            entry['embedding'] = bytes_to_embedding(entry['embedding'])
+        if not quantized and entry['embedding'] is not None:
+            entry['embedding'] = decode_embedding(entry['embedding'], entry['embedding_dtype'])
         entries.append(entry)
 
     conn.close()
     return entries
 
 
+def _query_text(query: str) -> str:
+    """Query as embedded: surrounding and repeated whitespace collapsed."""
+    return ' '.join(query.split())
+
+
 def semantic_search(
     query: str,
     entry_type: Optional[str] = None,
     limit: int = 10,
     threshold: float = 0.5,
-    client=None
+    client=None,
+    quantized: bool = False,
+    binary: bool = False
 ) -> Dict[str, Any]:
     """
     Search memories by semantic similarity.
@@ -136,63 +483,161 @@ def semantic_search(
         limit: Maximum results to return
         threshold: Minimum similarity threshold (0-1)
         client: Optional OpenAI client
+        quantized: Score against int8 embeddings (needs NumPy; ~4x less data)
+        binary: Shortlist by 1-bit sign codes, then rerank exactly (needs NumPy)
 
     Returns:
         dict with ranked results
     """
-    # Generate query embedding
-    embed_result = generate_embedding(query, client)
+    # Generate query embedding; whitespace variants of a query share a cache entry
+    embed_result = generate_embedding(_query_text(query), client)
     if not embed_result.get('success'):
         return embed_result
 
-    query_embedding = embed_result['embedding']
+    return _search_embedding(
+        query, embed_result['embedding'], embed_result['usage']['total_tokens'],
+        entry_type, limit, threshold, quantized, binary
+    )
 
-    # Get all entries with embeddings
-    entries = get_all_embeddings(entry_type=entry_type)
 
-    if not entries:
-        return {
-            "success": True,
-            "query": query,
-            "results": [],
-            "message": "No entries with embeddings found"
-        }
+def semantic_search_many(
+    queries: List[str],
+    entry_type: Optional[str] = None,
+    limit: int = 10,
+    threshold: float = 0.5,
+    client=None,
+    quantized: bool = False,
+    binary: bool = False
+) -> Dict[str, Any]:
+    """
+    Run several semantic searches, embedding all uncached queries in one API call.
 
-    # Calculate similarities
-    scored_entries = []
-    for entry in entries:
-        if entry.get('embedding'):
-            similarity = cosine_similarity(query_embedding, entry['embedding'])
-            if similarity >= threshold:
-                scored_entries.append({
-                    "id": entry['id'],
-                    "type": entry['type'],
-                    "content": entry['content'],
-                    "source": entry['source'],
-                    "importance": entry['importance'],
-                    "similarity": round(similarity, 4),
-                    "created_at": entry['created_at'],
-                    "tags": json.loads(entry['tags']) if entry['tags'] else None
-                })
-
-    # Sort by similarity (descending)
-    scored_entries.sort(key=lambda x: x['similarity'], reverse=True)
-
-    # Limit results
-    results = scored_entries[:limit]
+    Args:
+        queries: Search queries
+        entry_type, limit, threshold, client, quantized, binary: As for semantic_search()
+
+    Returns:
+        dict with one semantic_search()-shaped result per query, in order
+    """
+    embed_result = generate_query_embeddings([_query_text(query) for query in queries], client)
+    if not embed_result.get('success'):
+        return embed_result
+
+    # Tokens are billed once for the whole batch
+    searches = [
+        _search_embedding(query, embedding, 0, entry_type, limit, threshold, quantized, binary)
+        for query, embedding in zip(queries, embed_result['embeddings'])
+    ]
+    return {
+        "success": True,
+        "searches": searches,
+        "cached_queries": embed_result['cached'],
+        "tokens_used": embed_result['usage']['total_tokens']
+    }
+
+
+def _search_embedding(
+    query: str,
+    query_embedding,
+    tokens_used: int,
+    entry_type: Optional[str],
+    limit: int,
+    threshold: float,
+    quantized: bool,
+    binary: bool
+) -> Dict[str, Any]:
+    """Body of semantic_search() for an already-embedded query."""
+    # Exact k-NN inside SQLite; the quantized / binary modes are explicit requests
+    # for those approximate scans
+    vec = None if quantized or binary else _vec_matches(query_embedding, entry_type, limit, threshold)
+
+    if vec is not None or HAS_NUMPY:
+        # Score the cached matrix (or its int8 copy) and load metadata only for the winners
+        matches, total_searched, above_threshold = vec or top_matches(
+            query_embedding, entry_type, limit, threshold, binary=binary, quantized=quantized
+        )
+        if not total_searched:
+            return {
+                "success": True,
+                "query": query,
+                "results": [],
+                "message": "No entries with embeddings found"
+            }
+        results = _entries_for_matches(matches)
+    else:
+        # Score (id, embedding) tuples; content / tags are read only for the winners
+        ids, vectors, normalized = _embedding_rows(entry_type)
+
+        if not ids:
+            return {
+                "success": True,
+                "query": query,
+                "results": [],
+                "message": "No entries with embeddings found"
+            }
+
+        # Calculate similarities, then build result rows only for the top `limit`
+        scored = [(entry_id, similarity)
+                  for entry_id, similarity in zip(ids, _score_vectors(query_embedding, vectors, normalized))
+                  if similarity >= threshold]
+        results = _entries_for_matches(_top_scored(scored, limit))
+        total_searched, above_threshold = len(ids), len(scored)
 
     return {
         "success": True,
         "query": query,
         "results": results,
-        "total_searched": len(entries),
-        "above_threshold": len(scored_entries),
+        "total_searched": total_searched,
+        "above_threshold": above_threshold,
         "returned": len(results),
         "threshold": threshold,
-        "tokens_used": embed_result['usage']['total_tokens']
+        "tokens_used": tokens_used
     }
 
 
+def _result_row(entry: Dict[str, Any], similarity: float) -> Dict[str, Any]:
+    return {
+        "id": entry['id'],
+        "type": entry['type'],
+        "content": entry['content'],
+        "source": entry['source'],
+        "importance": entry['importance'],
+        "similarity": round(similarity, 4),
+        "created_at": entry['created_at'],
+        "tags": json.loads(entry['tags']) if entry['tags'] else None
+    }
+
+
+def _top_scored(scored: List[Tuple[int, float]], limit: int) -> List[Tuple[int, float]]:
+    """
+    Best `limit` (entry id, similarity) pairs, in O(N log limit) rather than a full sort.
+
+    Ranked by the rounded similarity that is reported; ties keep their
+    input order, as the stable sort did.
+    """
+    return heapq.nlargest(limit, scored, key=lambda pair: round(pair[1], 4))
+
+
+def _entries_for_matches(matches: List[Tuple[int, float]]) -> List[Dict[str, Any]]:
+    """Result rows for (id, similarity) matches, fetching only those entries."""
+    if not matches:
+        return []
+    conn = get_connection()
+    placeholders = ','.join('?' * len(matches))
+    rows = conn.execute(f'''
+        SELECT id, type, content, source, importance, created_at, tags
+        FROM memory_entries
+        WHERE id IN ({placeholders})
+    ''', [entry_id for entry_id, _ in matches]).fetchall()
+    conn.close()
+
+    by_id = {row['id']: dict(row) for row in rows}
+    results = [_result_row(by_id[entry_id], sim) for entry_id, sim in matches if entry_id in by_id]
+    # Equal scores rank the more important entry first, as the full scan did
+    results.sort(key=lambda r: (-r['similarity'], -(r['importance'] or 0), r['id']))
+    return results
+
+
 def find_similar(
     entry_id: int,
     limit: int = 5,
@@ -213,7 +658,7 @@ def find_similar(
     cursor = conn.cursor()
 
     # Get source entry embedding
-    cursor.execute('SELECT content, embedding FROM memory_entries WHERE id = ?', (entry_id,))
+    cursor.execute('SELECT content, embedding, embedding_dtype FROM memory_entries WHERE id = ?', (entry_id,))
     row = cursor.fetchone()
 
     if not row:
@@ -224,45 +669,55 @@ def find_similar(
         conn.close()
         return {"success": False, "error": f"Entry {entry_id} has no embedding"}
 
-    source_embedding = bytes_to_embedding(row['embedding'])
+    source_embedding = decode_embedding(row['embedding'], row['embedding_dtype'])
     source_content = row['content']
     conn.close()
 
-    # Get all other entries
-    entries = get_all_embeddings()
+    vec = _vec_matches(source_embedding, None, limit, threshold, exclude_id=entry_id)
+    if vec is not None or HAS_NUMPY:
+        # k-NN in SQLite or one product against the cached matrix, metadata only for the winners
+        matches, searched, _ = vec or top_matches(source_embedding, None, limit, threshold, exclude_id=entry_id)
+        similar = [{key: r[key] for key in ('id', 'type', 'content', 'similarity')}
+                   for r in _entries_for_matches(matches)]
+        return {
+            "success": True,
+            "source_id": entry_id,
+            "source_content": source_content,
+            "similar_entries": similar,
+            "total_compared": searched
+        }
+
+    # Get all entries (ids and embeddings only; content is read for the winners)
+    ids, vectors, normalized = _embedding_rows()
 
     # Calculate similarities (excluding source)
-    scored = []
-    for entry in entries:
-        if entry['id'] != entry_id and entry.get('embedding'):
-            similarity = cosine_similarity(source_embedding, entry['embedding'])
-            if similarity >= threshold:
-                scored.append({
-                    "id": entry['id'],
-                    "type": entry['type'],
-                    "content": entry['content'],
-                    "similarity": round(similarity, 4)
-                })
-
-    scored.sort(key=lambda x: x['similarity'], reverse=True)
+    scored = [(other_id, similarity)
+              for other_id, similarity in zip(ids, _score_vectors(source_embedding, vectors, normalized))
+              if other_id != entry_id and similarity >= threshold]
+    similar = [{key: r[key] for key in ('id', 'type', 'content', 'similarity')}
+               for r in _entries_for_matches(_top_scored(scored, limit))]
 
     return {
         "success": True,
         "source_id": entry_id,
         "source_content": source_content,
-        "similar_entries": scored[:limit],
-        "total_compared": len(entries) - 1
+        "similar_entries": similar,
+        "total_compared": len(ids) - 1
     }
 
 
 def main():
     parser = argparse.ArgumentParser(description='Semantic Memory Search')
-    parser.add_argument('--query', help='Search query')
+    parser.add_argument('--query', action='append', help='Search query (repeat to run several with one embedding call)')
     parser.add_argument('--type', help='Filter by memory type')
     parser.add_argument('--limit', type=int, default=10, help='Maximum results')
     parser.add_argument('--threshold', type=float, default=0.5,
                        help='Minimum similarity threshold (0-1)')
     parser.add_argument('--similar-to', type=int, help='Find entries similar to this ID')
+    parser.add_argument('--quantized', action='store_true',
+                       help='Score against int8-quantized embeddings')
+    parser.add_argument('--binary', action='store_true',
+                       help='Shortlist with binary (sign-bit) codes, then rerank exactly')
 
     args = parser.parse_args()
 
@@ -275,12 +730,24 @@ def main():
             threshold=args.threshold
         )
 
+    elif args.query and len(args.query) > 1:
+        result = semantic_search_many(
+            queries=args.query,
+            entry_type=args.type,
+            limit=args.limit,
+            threshold=args.threshold,
+            quantized=args.quantized,
+            binary=args.binary
+        )
+
     elif args.query:
         result = semantic_search(
-            query=args.query,
+            query=args.query[0],
             entry_type=args.type,
             limit=args.limit,
-            threshold=args.threshold
+            threshold=args.threshold,
+            quantized=args.quantized,
+            binary=args.binary
         )
 
     else:
@@ -289,13 +756,16 @@ def main():
 
     if result:
         if result.get('success'):
-            count = len(result.get('results', result.get('similar_entries', [])))
+            if 'searches' in result:
+                count = sum(len(search.get('results', [])) for search in result['searches'])
+            else:
+                count = len(result.get('results', result.get('similar_entries', [])))
             print(f"OK Found {count} results")
         else:
             print(f"ERROR {result.get('error')}")
             sys.exit(1)
 
-        print(json.dumps(result, indent=2, default=str))
+        print_json(result)
 
 
 if __name__ == "__main__":
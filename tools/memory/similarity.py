@@ -0,0 +1,225 @@
+"""
+Tool: Vector Similarity Kernels
+Purpose: Score a query embedding against many stored embeddings at once
+
+Used by semantic_search.py in place of per-row Python cosine similarity:
+- Stored BLOBs are stacked into one contiguous (N, D) float32 matrix
+- A Numba-compiled kernel computes all N cosine scores in parallel
+- Falls back to a NumPy matrix-vector product when Numba is not installed
+- Rows already at unit length skip the norms entirely (dot_scores)
+- int8-quantized rows score with an integer dot product (quantize_rows, q8_scores)
+- 1-bit sign codes rank rows by Hamming distance (binarize, hamming_distances)
+
+Dependencies:
+    - numpy
+    - numba (optional, JIT-compiled kernel)
+"""
+
+import math
+from typing import Iterable, Tuple
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+# Bits set in each byte value, for NumPy builds without np.bitwise_count (< 2.0)
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def embeddings_to_matrix(embeddings: Iterable) -> np.ndarray:
+    """
+    Stack embeddings (bytes or arrays) into a C-contiguous float32 matrix.
+
+    Args:
+        embeddings: Embedding BLOBs or vectors, all of the same dimension
+
+    Returns:
+        (N, D) float32 array
+    """
+    rows = [np.frombuffer(e, dtype=np.float32) if isinstance(e, (bytes, memoryview)) else e
+            for e in embeddings]
+    return np.ascontiguousarray(np.stack(rows), dtype=np.float32)
+
+
+if HAS_NUMBA:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _cosine_kernel(query, mat, out):
+        qn = 0.0
+        for j in range(query.shape[0]):
+            qn += query[j] * query[j]
+        for i in prange(mat.shape[0]):
+            s = 0.0
+            mn = 0.0
+            for j in range(mat.shape[1]):
+                s += query[j] * mat[i, j]
+                mn += mat[i, j] * mat[i, j]
+            denom = math.sqrt(qn * mn)
+            out[i] = s / denom if denom > 0.0 else 0.0
+
+
+def cosine_scores(query, mat: np.ndarray) -> np.ndarray:
+    """
+    Cosine similarity between a query vector and every row of a matrix.
+
+    Args:
+        query: Query vector of length D
+        mat: (N, D) float32 matrix, e.g. from embeddings_to_matrix()
+
+    Returns:
+        float32 array of N similarity scores (0 for zero-length vectors)
+    """
+    query = np.ascontiguousarray(query, dtype=np.float32)
+    mat = np.ascontiguousarray(mat, dtype=np.float32)
+
+    if len(mat) == 0:
+        return np.empty(0, dtype=np.float32)
+
+    if HAS_NUMBA:
+        out = np.empty(mat.shape[0], dtype=np.float32)
+        _cosine_kernel(query, mat, out)
+        return out
+
+    denom = np.linalg.norm(mat, axis=1) * np.linalg.norm(query)
+    dots = mat @ query
+    return np.divide(dots, denom, out=np.zeros_like(dots), where=denom > 0)
+
+
+def dot_scores(query, mat: np.ndarray) -> np.ndarray:
+    """
+    Cosine similarity against rows that are already L2-normalized.
+
+    Only the query is normalized; the scores are a single matrix-vector
+    product.
+
+    Args:
+        query: Query vector of length D
+        mat: (N, D) float32 matrix of unit-length rows
+
+    Returns:
+        float32 array of N similarity scores
+    """
+    query = np.asarray(query, dtype=np.float32)
+    q_norm = query / (np.linalg.norm(query) + 1e-12)
+    return np.asarray(mat, dtype=np.float32) @ q_norm
+
+
+def quantized_to_matrix(blobs: Iterable[bytes]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Stack int8 embedding BLOBs (float32 scale + int8 values) into arrays.
+
+    Args:
+        blobs: BLOBs as written by embed_memory.embedding_to_bytes_q8()
+
+    Returns:
+        (scales, matrix): (N,) float32 scales and (N, D) int8 matrix
+    """
+    blobs = list(blobs)
+    if not blobs:
+        return np.empty(0, dtype=np.float32), np.empty((0, 0), dtype=np.int8)
+    # Decode every row in one pass: a record of (scale, D int8 values) per BLOB
+    record = np.dtype([('scale', '<f4'), ('q', np.int8, (len(blobs[0]) - 4,))])
+    rows = np.frombuffer(b''.join(blobs), dtype=record)
+    return rows['scale'].astype(np.float32), np.ascontiguousarray(rows['q'])
+
+
+def quantize_rows(mat) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Quantize every row of a float matrix to int8 with a per-row scale.
+
+    Same scheme as embed_memory.embedding_to_bytes_q8(): each row is
+    divided by its largest absolute component and mapped onto -127..127.
+
+    Args:
+        mat: (N, D) float matrix
+
+    Returns:
+        (scales, matrix): (N,) float32 scales and (N, D) int8 matrix
+    """
+    mat = np.asarray(mat, dtype=np.float32)
+    if mat.size == 0:
+        return np.zeros(len(mat), dtype=np.float32), np.zeros(mat.shape, dtype=np.int8)
+    scales = np.abs(mat).max(axis=1)
+    safe = np.where(scales > 0, scales, 1.0)
+    q = np.round(mat / safe[:, None] * 127).astype(np.int8)
+    return scales.astype(np.float32), q
+
+
+if HAS_NUMBA:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _q8_kernel(query, mat, out):
+        for i in prange(mat.shape[0]):
+            s = 0
+            for j in range(mat.shape[1]):
+                s += np.int32(query[j]) * np.int32(mat[i, j])
+            out[i] = s
+
+# Rows widened to int32 at a time by the NumPy fallback of q8_scores()
+_Q8_BLOCK_ROWS = 4096
+
+
+def q8_scores(query_scale: float, query_q: np.ndarray, scales: np.ndarray, mat: np.ndarray) -> np.ndarray:
+    """
+    Dot products between an int8 query and int8 rows, rescaled to floats.
+
+    For L2-normalized vectors this is their cosine similarity, within the
+    quantization error. Products accumulate in int32; the int8 rows are
+    read as-is (Numba) or widened one block at a time, never as a whole.
+
+    Args:
+        query_scale: Per-vector scale of the query
+        query_q: int8 query vector of length D
+        scales: (N,) per-row scales
+        mat: (N, D) int8 matrix
+
+    Returns:
+        float32 array of N similarity scores
+    """
+    query_q = np.ascontiguousarray(query_q, dtype=np.int8)
+    if HAS_NUMBA and len(mat):
+        dots = np.empty(mat.shape[0], dtype=np.int32)
+        _q8_kernel(query_q, np.ascontiguousarray(mat), dots)
+    else:
+        wide = query_q.astype(np.int32)
+        dots = np.empty(len(mat), dtype=np.int32)
+        for start in range(0, len(mat), _Q8_BLOCK_ROWS):
+            dots[start:start + _Q8_BLOCK_ROWS] = mat[start:start + _Q8_BLOCK_ROWS].astype(np.int32) @ wide
+    return (dots * scales * np.float32(query_scale / 127 ** 2)).astype(np.float32)
+
+
+def binarize(mat) -> np.ndarray:
+    """
+    Pack the sign of every component into bits (32x smaller than float32).
+
+    Args:
+        mat: (N, D) or (D,) float matrix / vector
+
+    Returns:
+        (N, ceil(D / 8)) or (ceil(D / 8),) uint8 codes
+    """
+    return np.packbits(np.asarray(mat) > 0, axis=-1)
+
+
+def hamming_distances(query_bits: np.ndarray, codes: np.ndarray) -> np.ndarray:
+    """
+    Number of differing sign bits between a query code and every row code.
+
+    A smaller distance means a smaller angle between the original vectors.
+
+    Args:
+        query_bits: Code of the query, from binarize()
+        codes: (N, W) codes from binarize()
+
+    Returns:
+        int32 array of N distances
+    """
+    diff = np.bitwise_xor(codes, query_bits)
+    if hasattr(np, 'bitwise_count'):
+        # Count 64 bits at a time when the row width allows it
+        if diff.shape[-1] % 8 == 0:
+            diff = np.ascontiguousarray(diff).view(np.uint64)
+        return np.bitwise_count(diff).sum(axis=-1, dtype=np.int32)
+    return _POPCOUNT[diff].sum(axis=-1, dtype=np.int32)